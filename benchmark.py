@@ -0,0 +1,499 @@
+# File:         benchmark.py
+# Description:  Timing benchmarks for the hot paths of proj3.py
+#
+# Usage:        python benchmark.py [clues|load|render|generate] [size ...]
+#               python benchmark.py suite [size ...] [--json FILE] [--baseline FILE] [--tolerance F]
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import proj3
+
+# Board sizes (interior rows and columns) timed when none are given
+DEFAULT_SIZES   = [64, 256, 1024, 4096]
+
+# Fraction of the interior locations that hold a mine
+MINE_DENSITY    = 0.15
+
+# Seed used so every run times the same boards
+BENCHMARK_SEED  = 2019
+
+# Generated board sizes and board files timed by the suite when no sizes
+# are given
+SUITE_SIZES     = [10, 64, 256, 1024, 4096]
+SUITE_FILES     = ["board1.txt", "board2.txt", "board3.txt", "board4.txt", "board5.txt"]
+
+# Each case of the suite is timed for at least SUITE_ROUNDS rounds of at
+# least SUITE_MIN_SECONDS each, and the fastest round is kept. Once a case
+# has taken SUITE_MAX_SECONDS, no more rounds are started
+SUITE_ROUNDS      = 5
+SUITE_MIN_SECONDS = 0.05
+SUITE_MAX_SECONDS = 2.0
+
+# Mine density of the boards flood filled by the suite, low enough that
+# most fields are in one island. Boards with more fields than
+# FLOOD_MAX_FIELDS are not flood filled, as it would take minutes
+FLOOD_DENSITY     = 0.05
+FLOOD_MAX_FIELDS  = 1 << 21
+
+# A case is a regression when it takes more than (1 + tolerance) times as
+# long as in the baseline, and at least BASELINE_NOISE seconds longer
+DEFAULT_TOLERANCE = 0.25
+BASELINE_NOISE    = 1e-5
+
+# Version of the JSON written by the suite
+SUITE_VERSION     = 1
+
+
+##############################################################################
+# randomBoard()   used to build a bordered board of random mines
+# Input:          numRows; integer number of interior rows
+#                 numCols; integer number of interior columns
+#                 seed; integer seed for the random number generator
+# Output:         board; the Board that holds the game
+def randomBoard(numRows, numCols, seed=BENCHMARK_SEED):
+    return proj3.generateBoard(numRows, numCols, density=MINE_DENSITY, seed=seed)
+
+##############################################################################
+# timeCall()      used to time a single call of a function
+# Input:          function; the function to call
+#                 args; the arguments passed to it
+# Output:         seconds; float - the wall clock time the call took
+def timeCall(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+##############################################################################
+# perCellClues()  finds every clue the old way, calling numOfMinesAround()
+#                 once for every interior location
+# Input:          board; the Board that holds the game
+# Output:         clues; a 2-D grid of ints holding the number of mines
+#                        around each location
+def perCellClues(board):
+    clues = [[0] * board.numCols for row in range(board.numRows)]
+    for row in range(1, board.numRows - 1):
+        for col in range(1, board.numCols - 1):
+            clues[row][col] = proj3.numOfMinesAround(row, col, board)
+    return clues
+
+##############################################################################
+# benchmarkClues()  compares createClueGrid() against perCellClues()
+# Input:            sizes; list of board sizes to time
+# Output:           None; prints one line of timings per size
+def benchmarkClues(sizes):
+    backend = "numpy" if proj3.numpy is not None else "pure python"
+    print("clue grid (" + backend + ")")
+    print("{:>6s} {:>12s} {:>12s} {:>9s}".format("size", "per-cell s", "grid s", "speedup"))
+
+    for size in sizes:
+        board = randomBoard(size, size)
+        perCell = timeCall(perCellClues, board)
+        grid = timeCall(proj3.createClueGrid, board)
+        print("{:6d} {:12.4f} {:12.4f} {:8.1f}x".format(size, perCell, grid, perCell / grid))
+
+##############################################################################
+# benchmarkLoad()   times createBoard() on board files written to a
+#                   temporary directory and reports the throughput
+# Input:            sizes; list of board sizes to time
+# Output:           None; prints one line of timings per size
+def benchmarkLoad(sizes):
+    print("board loading")
+    print("{:>6s} {:>10s} {:>10s} {:>10s}".format("size", "MB", "seconds", "MB/s"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            fileName = os.path.join(directory, "board" + str(size) + ".txt")
+            proj3.writeBoard(randomBoard(size, size), fileName)
+            megabytes = os.path.getsize(fileName) / 1e6
+
+            seconds = timeCall(proj3.createBoard, fileName)
+            os.remove(fileName)
+            print("{:6d} {:10.2f} {:10.4f} {:10.1f}".format(size, megabytes, seconds, megabytes / seconds))
+
+##############################################################################
+# printPerCell()  prints the board the old way, with one print() call for
+#                 every field, to compare against prettyPrintBoard()
+# Input:          board; the Board to print
+# Output:         None; prints the board in a pretty way
+def printPerCell(board):
+
+    print() # empty line
+
+    # if enough columns, print a "tens column" line above, and a line for
+    # each higher digit (hundreds, thousands, ...) above that
+    place = 1
+    while board.numCols-2 >= place * 10:
+        place *= 10
+    while place >= 10:
+        # empty space for the columns with fewer digits
+        print("{:{}s}".format("", 7 + 2 * (place - 1)), end="")
+        for i in range(place, board.numCols-1 ):
+            print( str(i // place % 10), end =" ")
+        print()
+        place //= 10
+
+    # create and print top numbered line
+    print("       ", end="")
+    # only go from 1 to len - 1, so we don't number the borders
+    for i in range(1, board.numCols-1 ):
+        # only print the last digit (so 15 --> 5)
+        print(str(i % 10), end = " ")
+    print()
+
+    # create the border row
+    borderRow = "     "
+    for cell in board.getRow(0):
+        borderRow += cell + " "
+
+    # print the top border row
+    print(borderRow)
+
+    # print all the interior rows
+    for row in range(1, board.numRows - 1):
+        # print the row label
+        print("{:3d}  ".format(row), end="")
+
+        # print the row contents
+        for cell in board.getRow(row):
+            if cell == proj3.FLAG:
+                # this will print the flag in black and green
+                print("\033[1;30;42m" + "F" + "\033[0m", end =" ")
+            elif cell == proj3.DETONATED_MINE:
+                # this will print the detonated Mine in white and red
+                print("\033[1;37;41m" + "X" + "\033[0m", end =" ")
+            else:
+                print(cell, end = " ")
+        print()
+
+    # print the bottom border row and an empty line
+    print(borderRow, "\n")
+
+##############################################################################
+# timeFrames()    used to time printing a board to the null device
+# Input:          board; the Board to print
+#                 render; the function used to print the board
+# Output:         seconds; float - the time it took to print the board
+def timeFrames(board, render):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return timeCall(render, board)
+
+##############################################################################
+# benchmarkRender()   compares the time to print one frame the old way,
+#                     with prettyPrintBoard(), and with a BoardRenderer
+#                     after a single field has changed
+# Input:              sizes; list of board sizes to time
+# Output:             None; prints one line of timings per board
+def benchmarkRender(sizes):
+    print("frame rendering")
+    print("{:>10s} {:>12s} {:>12s} {:>14s}".format("board", "per-cell s", "buffered s", "incremental s"))
+
+    boards = [("board4.txt", proj3.createBoard("board4.txt"))]
+    boards += [(str(size), randomBoard(size, size)) for size in sizes]
+
+    for name, board in boards:
+        perCell  = timeFrames(board, printPerCell)
+        buffered = timeFrames(board, proj3.prettyPrintBoard)
+
+        # draw once, change one field, and time the redraw
+        renderer = proj3.BoardRenderer()
+        timeFrames(board, renderer.draw)
+        board.setCell(1, 1, proj3.FLAG)
+        incremental = timeFrames(board, renderer.draw)
+
+        print("{:>10s} {:12.5f} {:12.5f} {:14.5f}".format(name, perCell, buffered, incremental))
+
+##############################################################################
+# benchmarkGenerate() times generateBoard() and writeBoard()
+# Input:              sizes; list of board sizes to time
+# Output:             None; prints one line of timings per size
+def benchmarkGenerate(sizes):
+    print("board generation")
+    print("{:>6s} {:>12s} {:>10s}".format("size", "generate s", "write s"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            fileName = os.path.join(directory, "board.txt")
+
+            start = time.perf_counter()
+            board = randomBoard(size, size)
+            generate = time.perf_counter() - start
+
+            write = timeCall(proj3.writeBoard, board, fileName)
+            os.remove(fileName)
+            print("{:6d} {:12.4f} {:10.4f}".format(size, generate, write))
+
+##############################################################################
+# timeCase()      used to time one case of the suite. Cheap calls are
+#                 timed many at a time, so the clock is not what is timed
+# Input:          function; the function to time
+#                 setup; function returning the arguments of each call,
+#                        called outside of the timing, or None to call
+#                        the function with no arguments
+# Output:         seconds; float - the fastest time of a single call
+def timeCase(function, setup=None):
+    best   = None
+    spent  = 0.0
+    rounds = 0
+    while rounds < SUITE_ROUNDS and (rounds == 0 or spent < SUITE_MAX_SECONDS):
+        calls = 0
+        total = 0.0
+        while total < SUITE_MIN_SECONDS:
+            if setup is None:
+                # double the calls timed together until they take long
+                # enough
+                number = max(calls, 1)
+                start  = time.perf_counter()
+                for count in range(number):
+                    function()
+                total += time.perf_counter() - start
+                calls += number
+            else:
+                args  = setup()
+                total += timeCall(function, *args)
+                calls += 1
+
+            if total >= SUITE_MAX_SECONDS:
+                break
+
+        seconds = total / calls
+        best    = seconds if best is None else min(best, seconds)
+        spent  += total
+        rounds += 1
+
+    return best
+
+##############################################################################
+# firstEmpty()    used to find the field a flood fill starts from: the
+#                 empty field nearest the start of the middle row
+# Input:          board; the Board to search
+# Output:         (row, col) of the field, or None if there is none
+def firstEmpty(board):
+    rows = range(1, board.numRows - 1)
+    for row in sorted(rows, key=lambda row: abs(row - board.numRows // 2)):
+        for col in range(1, board.numCols - 1):
+            if not board.isMine(row, col) and board.getClue(row, col) == 0:
+                return row, col
+    return None
+
+##############################################################################
+# nearEndGame()   used to set up a game on a view of a board with every
+#                 mine flagged but one, the last move left to win it
+# Input:          board; the Board to play on
+# Output:         (game, row, col) of the game and its last mine, or None
+#                 if the board has no mines
+def nearEndGame(board):
+    game = proj3.Game(board.share())
+    last = None
+    for row in range(board.numRows):
+        bits = board.getMineBits(row)
+        while bits:
+            col  = (bits & -bits).bit_length() - 1
+            bits &= bits - 1
+            if last is not None:
+                game.flag(*last)
+            last = (row, col)
+
+    return None if last is None else (game,) + last
+
+##############################################################################
+# playLastFlag()  used to flag the last mine of a game and check that it is
+#                 won, then take the flag away and check again, so the game
+#                 is left as it was for the next call
+# Input:          game; the Game set up by nearEndGame()
+#                 row; integer row of its last mine
+#                 col; integer column of its last mine
+# Output:         None
+def playLastFlag(game, row, col):
+    game.flag(row, col)
+    proj3.checkGameComplete(game.board, game.minesLeft)
+    game.flag(row, col)
+    proj3.checkGameComplete(game.board, game.minesLeft)
+
+##############################################################################
+# timeBoard()     used to time every case of the suite on one board
+# Input:          fileName; the board file to time
+#                 flood; the Board to flood fill, or None to skip it
+# Output:         results; a dict from each case to its seconds, or None
+#                          for a case that was skipped
+def timeBoard(fileName, flood):
+    board   = proj3.createBoard(fileName)
+    endGame = nearEndGame(board)
+
+    results = {}
+    results["load"]    = timeCase(lambda: proj3.createBoard(fileName))
+    results["view"]    = timeCase(board.share)
+    results["recount"] = timeCase(board.recount)
+    results["clues"]   = timeCase(lambda: proj3.createClueGrid(board))
+    results["endgame"] = None if endGame is None else timeCase(lambda: playLastFlag(*endGame))
+    results["render"]  = timeCase(lambda: timeFrames(board, proj3.prettyPrintBoard))
+
+    # each flood fill starts on a new view of the board, made before the
+    # timing starts
+    start = firstEmpty(flood) if flood is not None else None
+    if start is None:
+        results["reveal"] = None
+    else:
+        results["reveal"] = timeCase(lambda shared: proj3.revealIsland(shared, *start), lambda: (flood.share(),))
+
+    return results
+
+##############################################################################
+# runSuite()      used to time every case of the suite on the board files
+#                 and on generated boards of each size
+# Input:          sizes; list of generated board sizes to time
+#                 report; function called with the name of each board and
+#                         its results once they are timed
+# Output:         results; a dict from each board name to its results
+def runSuite(sizes, report):
+    results = {}
+
+    for fileName in SUITE_FILES:
+        flood = proj3.createBoard(fileName)
+        results[fileName] = timeBoard(fileName, flood)
+        report(fileName, results[fileName])
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            fileName = os.path.join(directory, "board" + str(size) + ".txt")
+            proj3.writeBoard(randomBoard(size, size), fileName)
+
+            flood = None
+            if (size + 2) * (size + 2) <= FLOOD_MAX_FIELDS:
+                flood = proj3.generateBoard(size, size, density=FLOOD_DENSITY, seed=BENCHMARK_SEED)
+
+            name = str(size) + "x" + str(size)
+            results[name] = timeBoard(fileName, flood)
+            os.remove(fileName)
+            report(name, results[name])
+
+    return results
+
+# Cases of the suite, in the order they are printed
+SUITE_CASES = ["load", "view", "recount", "clues", "reveal", "endgame", "render"]
+
+##############################################################################
+# printSuiteHeader()  prints the heading of the suite's table
+# Input:              None
+# Output:             None
+def printSuiteHeader():
+    print("suite (seconds per call)")
+    print("{:>11s}".format("board") + "".join("{:>12s}".format(case) for case in SUITE_CASES))
+
+##############################################################################
+# printSuiteRow() prints the results of one board as a row of the table
+# Input:          name; the name of the board
+#                 results; a dict from each case to its seconds or None
+# Output:         None
+def printSuiteRow(name, results):
+    cells = ["{:>12s}".format("-") if results[case] is None else "{:12.3e}".format(results[case])
+             for case in SUITE_CASES]
+    print("{:>11s}".format(name) + "".join(cells), flush=True)
+
+##############################################################################
+# compareBaseline()   used to compare the suite's results against the
+#                     results of an earlier run
+# Input:              results; a dict from each board name to its results
+#                     baseline; the dict loaded from the earlier run's JSON
+#                     tolerance; float - how much slower a case can get
+# Output:             regressions; a list of (board, case, old seconds,
+#                                  new seconds) of the cases that got
+#                                  slower than the tolerance
+def compareBaseline(results, baseline, tolerance):
+    regressions = []
+    for name, cases in results.items():
+        oldCases = baseline["results"].get(name, {})
+        for case, seconds in cases.items():
+            oldSeconds = oldCases.get(case)
+            if seconds is None or oldSeconds is None:
+                continue
+            if seconds > oldSeconds * (1 + tolerance) and seconds - oldSeconds > BASELINE_NOISE:
+                regressions.append((name, case, oldSeconds, seconds))
+
+    return regressions
+
+##############################################################################
+# benchmarkSuite()    times every case of the suite, prints them as a table,
+#                     and writes them as JSON and compares them against a
+#                     baseline if asked to
+# Input:              sizes; list of generated board sizes to time
+#                     jsonFile; file name to write the results to as JSON,
+#                               "-" for the screen, or None
+#                     baselineFile; file name of the JSON of an earlier run
+#                                   to compare against, or None
+#                     tolerance; float - how much slower a case can get
+#                                before it is reported
+# Output:             isSlower; a boolean that is True if any case got
+#                               slower than the baseline
+def benchmarkSuite(sizes, jsonFile=None, baselineFile=None, tolerance=DEFAULT_TOLERANCE):
+    printSuiteHeader()
+    results = runSuite(sizes, printSuiteRow)
+
+    document = {"version": SUITE_VERSION,
+                "python": platform.python_version(),
+                "numpy": proj3.numpy is not None,
+                "results": results}
+    if jsonFile == "-":
+        print(json.dumps(document, indent=2))
+    elif jsonFile is not None:
+        with open(jsonFile, "w") as outFile:
+            json.dump(document, outFile, indent=2)
+
+    if baselineFile is None:
+        return False
+
+    with open(baselineFile) as inFile:
+        baseline = json.load(inFile)
+    regressions = compareBaseline(results, baseline, tolerance)
+
+    print()
+    if not regressions:
+        print("no case is more than {:.0%} slower than {}".format(tolerance, baselineFile))
+    for name, case, oldSeconds, seconds in regressions:
+        print("slower: {} {} {:.3e} -> {:.3e} s ({:+.0%})".format(name, case, oldSeconds, seconds,
+                                                                 seconds / oldSeconds - 1))
+    return bool(regressions)
+
+# Benchmarks that can be picked from the command line, in the order they
+# are run when none is picked. The suite is only run when picked
+BENCHMARKS = {"clues": benchmarkClues,
+              "load":  benchmarkLoad,
+              "render": benchmarkRender,
+              "generate": benchmarkGenerate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the hot paths of proj3.py.")
+    parser.add_argument("benchmark", nargs="?", choices=list(BENCHMARKS) + ["suite"],
+                        help="benchmark to run (all but the suite if not given)")
+    parser.add_argument("sizes", nargs="*", type=int,
+                        help="board sizes to time")
+    parser.add_argument("--json", metavar="FILE",
+                        help="with suite, write the results to FILE as JSON (- for the screen)")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="with suite, compare the results to the JSON of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="with --baseline, how much slower a case can get, such as 0.25")
+    args = parser.parse_args()
+
+    if (args.json or args.baseline) and args.benchmark != "suite":
+        parser.error("--json and --baseline need the suite")
+
+    if args.benchmark == "suite":
+        isSlower = benchmarkSuite(args.sizes or SUITE_SIZES, args.json, args.baseline, args.tolerance)
+        sys.exit(1 if isSlower else 0)
+
+    names = [args.benchmark] if args.benchmark else list(BENCHMARKS)
+    sizes = args.sizes or DEFAULT_SIZES
+    for name in names:
+        BENCHMARKS[name](sizes)
+        print()
+
+if __name__ == "__main__":
+    main()
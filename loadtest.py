@@ -0,0 +1,192 @@
+# File:         loadtest.py
+# Description:  Plays many games at once against server.py and reports how
+#               long the moves took to be answered
+#
+# Usage:        python loadtest.py [--sessions N] [--moves N] [--size ROWSxCOLS] [--mines N]
+#                                  [--host HOST] [--port N | --unix PATH] [--spawn] [--seed S]
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+import proj3
+import server
+
+# Size and number of mines of the boards played when none are given
+DEFAULT_SIZE    = (16, 30)
+DEFAULT_MINES   = 40
+
+# Seconds to keep trying to connect to a server started with --spawn
+SPAWN_TIMEOUT   = 10
+
+
+##############################################################################
+# request()       used to send one request and wait for its reply
+# Input:          reader; the asyncio.StreamReader of the connection
+#                 writer; the asyncio.StreamWriter of the connection
+#                 message; the dict to send
+# Output:         reply; the dict sent back
+async def request(reader, writer, message):
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+    reply = json.loads(await reader.readline())
+    if "error" in reply:
+        raise RuntimeError("the server replied: " + reply["error"])
+    return reply
+
+##############################################################################
+# connect()       used to open a connection to the server
+# Input:          address; a (host, port, path) tuple, where path is the
+#                          Unix socket to use, or None for TCP
+# Output:         reader, writer; the streams of the connection
+async def connect(address):
+    host, port, path = address
+    if path is not None:
+        return await asyncio.open_unix_connection(path, limit=server.LINE_LIMIT)
+    return await asyncio.open_connection(host, port, limit=server.LINE_LIMIT)
+
+##############################################################################
+# playSession()   used to play one session: moves are played on hidden
+#                 fields picked at random, mostly reveals with some flags,
+#                 and a new game is started each time one ends
+# Input:          address; where the server is, as for connect()
+#                 numMoves; integer number of moves to play
+#                 size; (rows, columns) of the boards
+#                 mines; integer number of mines on each board
+#                 seed; integer seed for the boards and the moves
+#                 latencies; list each move's time in seconds is added to
+# Output:         None
+async def playSession(address, numMoves, size, mines, seed, latencies):
+    rng = random.Random(seed)
+    reader, writer = await connect(address)
+    numRows, numCols = size
+
+    try:
+        played = 0
+        while played < numMoves:
+            await request(reader, writer, {"op": "new", "generate": [numRows, numCols],
+                                           "mines": mines, "seed": rng.getrandbits(32)})
+
+            # the fields still hidden, in the order they will be played
+            hidden = [(row, col) for row in range(1, numRows + 1) for col in range(1, numCols + 1)]
+            rng.shuffle(hidden)
+            shown = set()
+
+            status = proj3.PLAYING
+            while status == proj3.PLAYING and hidden and played < numMoves:
+                row, col = hidden.pop()
+                if (row, col) in shown:
+                    continue
+                op = "flag" if rng.random() < 0.1 else "reveal"
+
+                start = time.perf_counter()
+                reply = await request(reader, writer, {"op": op, "row": row, "col": col})
+                latencies.append(time.perf_counter() - start)
+                played += 1
+
+                status = reply["status"]
+                shown.update((cellRow, cellCol) for cellRow, cellCol, cell in reply["cells"])
+    finally:
+        writer.close()
+
+##############################################################################
+# spawnServer()   used to start server.py in its own process, and wait
+#                 until it takes connections
+# Input:          address; where the server should listen, as for connect()
+# Output:         process; the asyncio subprocess running the server
+async def spawnServer(address):
+    host, port, path = address
+    where = ["--unix", path] if path is not None else ["--host", host, "--port", str(port)]
+    process = await asyncio.create_subprocess_exec(sys.executable, server.__file__, *where)
+
+    deadline = time.monotonic() + SPAWN_TIMEOUT
+    while True:
+        try:
+            reader, writer = await connect(address)
+            writer.close()
+            return process
+        except OSError:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise
+            await asyncio.sleep(0.05)
+
+##############################################################################
+# percentile()    used to find a percentile of a sorted list
+# Input:          values; a sorted list of numbers
+#                 fraction; float from 0 to 1
+# Output:         the value below which that fraction of the values lie
+def percentile(values, fraction):
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+##############################################################################
+# loadTest()      used to play every session at once
+# Input:          address; where the server is, as for connect()
+#                 sessions; integer number of sessions to play
+#                 numMoves; integer number of moves each session plays
+#                 size; (rows, columns) of the boards
+#                 mines; integer number of mines on each board
+#                 seed; integer seed for the whole run
+#                 spawn; a boolean that is True to start the server first
+# Output:         latencies; a sorted list of each move's time in seconds
+#                 seconds; float - the time all the sessions took
+async def loadTest(address, sessions, numMoves, size, mines, seed, spawn):
+    process = await spawnServer(address) if spawn else None
+
+    try:
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*[playSession(address, numMoves, size, mines, str(seed) + ":" + str(index), latencies)
+                               for index in range(sessions)])
+        seconds = time.perf_counter() - start
+    finally:
+        if process is not None:
+            process.terminate()
+            await process.wait()
+
+    latencies.sort()
+    return latencies, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many games at once against server.py and time the moves.")
+    parser.add_argument("--sessions", type=int, default=1000,
+                        help="number of sessions played at once")
+    parser.add_argument("--moves", type=int, default=50,
+                        help="number of moves each session plays")
+    parser.add_argument("--size", metavar="ROWSxCOLS", type=proj3.readSize, default=DEFAULT_SIZE,
+                        help="size of the boards")
+    parser.add_argument("--mines", type=int, default=DEFAULT_MINES,
+                        help="number of mines on each board")
+    parser.add_argument("--host", default=server.DEFAULT_HOST,
+                        help="address of the server")
+    parser.add_argument("--port", type=int, default=server.DEFAULT_PORT,
+                        help="TCP port of the server")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="connect to a Unix socket at PATH instead of TCP")
+    parser.add_argument("--spawn", action="store_true",
+                        help="start server.py for the test, and stop it after")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the whole run")
+    args = parser.parse_args()
+
+    if args.sessions < 1 or args.moves < 1:
+        parser.error("--sessions and --moves must be at least 1")
+    if not 0 <= args.mines <= args.size[0] * args.size[1]:
+        parser.error("can not place " + str(args.mines) + " mines on a " + str(args.size[0]) + "x" + str(args.size[1]) + " board")
+
+    address = (args.host, args.port, args.unix)
+    latencies, seconds = asyncio.run(loadTest(address, args.sessions, args.moves, args.size, args.mines,
+                                              args.seed, args.spawn))
+
+    count = len(latencies)
+    print("\t Played", count, "moves in", args.sessions, "sessions in", "{:.3f}".format(seconds), "seconds",
+          "({:,.0f} moves/sec)".format(count / seconds))
+    print("\t Move latency: p50 {:.2f} ms, p99 {:.2f} ms, max {:.2f} ms".format(
+        1000 * percentile(latencies, 0.50), 1000 * percentile(latencies, 0.99), 1000 * latencies[-1]))
+
+if __name__ == "__main__":
+    main()
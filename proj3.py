@@ -1,3 +1,36 @@
+import argparse
+import hashlib
+import io
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque, namedtuple
+
+# NumPy is optional; it is only used to speed up building the clue grid
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# lzma is left out of some Python builds; it is only used to compress
+# binary board files
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+# int.bit_count() is only in Python 3.10 and later; counting the ones
+# of the binary digits gives the same number on older versions
+countBits = getattr(int, "bit_count", lambda value: bin(value).count("1"))
+
 # Constants used in printing output
 INTRO              = "\t This program allows you to play Minesweeper. \n \t The object of the game is to flag every mine, \n \t using clues about the number of neighboring \n \t mines in each field. To win the game, flag \n \t all of the mines (and don't incorrectly flag \n \t any non-mine fields).   Good luck!"
 
@@ -5,6 +38,7 @@ FILE_INPUT         = "Enter the file to load the board from: "
 ERROR_MSG_POSITION = "That number is not allowed.  Please try again!"
 ERROR_MSG_CHOICE   = "That's not a valid action."
 INPUT_CHOICE_MSG   = "Enter 'r' to reveal the space, or \n enter 'f' to mark the space with a flag: "
+UNDO_CHOICE_MSG    = "Enter 'r' to reveal a space, 'f' to mark a space with a flag, \n 'u' to undo the last move, or 'y' to redo it: "
 
 LOSE_MSG           = "You detonated a mine!  Game Over!"
 
@@ -20,94 +54,2143 @@ CLUES              = ["1", "2", "3", "4", "5", "6", "7", "8"]
 # Used to find the end of the line when creating the initial board
 END_OF_LINE        = 2
 
+# Flags are printed in black and green, and detonated mines in white and red
+COLORED_FLAG           = "\033[1;30;42m" + FLAG + "\033[0m"
+COLORED_DETONATED_MINE = "\033[1;37;41m" + DETONATED_MINE + "\033[0m"
+
+# Terminal codes used to redraw only the fields that changed. MOVE_CURSOR
+# takes a line and a column, both counted from 1
+CLEAR_SCREEN       = "\033[H\033[2J"
+CLEAR_BELOW        = "\033[J"
+MOVE_CURSOR        = "\033[{};{}H"
+
+# Outcomes of a move, as returned by Game.reveal() and Game.flag()
+FLAG_PLACED        = "flag placed"
+FLAG_REMOVED       = "flag removed"
+ALREADY_REVEALED   = "already revealed"
+MUST_UNFLAG        = "must unflag"
+DETONATED          = "detonated"
+REVEALED           = "revealed"
+NO_CHANGE          = "no change"
+
+# Status of a game, as returned by Game.state()
+PLAYING            = "playing"
+WON                = "won"
+LOST               = "lost"
+
+# Result of a single move, and a summary of the whole game. The mines
+# left, and the safe fields left, are None while a MappedBoard is still
+# counting its mines
+MoveResult         = namedtuple("MoveResult", ["row", "col", "outcome", "minesLeft"])
+GameState          = namedtuple("GameState", ["status", "minesLeft", "hiddenSafe"])
+
+# What undoing a move puts back: the fields it changed with the value each
+# one had, and the state of the game before it
+MoveDelta          = namedtuple("MoveDelta", ["indices", "values", "numFlags", "isDetonated", "lastMove"])
+
+# Mines a generated board places only once the first field is revealed,
+# and the random.Random used to place them
+PendingMines       = namedtuple("PendingMines", ["mineCount", "rng"])
+
+# Bytes stored in a board's view for a hidden field, a flag, a border and
+# an empty field, and in a board file for a mine
+UNKNOWN_BYTE       = ord(UNKNOWN)
+FLAG_BYTE          = ord(FLAG)
+BORDER_BYTE        = ord(BORDER)
+SPACE_BYTE         = ord(SPACE)
+MINE_BYTE          = ord(MINE)
+
+# Tables used by bytes.translate() when loading a board file. The first
+# hides every field but the borders, the second turns each field into
+# a "1" if it holds a mine and a "0" otherwise
+HIDE_FIELDS        = bytes(BORDER_BYTE if i == BORDER_BYTE else UNKNOWN_BYTE for i in range(256))
+MINE_DIGITS        = bytes(ord("1") if i == ord(MINE) else ord("0") for i in range(256))
+
+# Table used to turn a string of "0" and "1" digits into bytes 0 and 1
+DIGIT_VALUES       = bytes(i - ord("0") if ord("0") <= i <= ord("1") else 0 for i in range(256))
+
+# Tables used to turn a row of the player's view into bytes 1 and 0,
+# marking the flagged fields and the hidden (unknown or flagged) fields
+FLAGGED_FIELDS     = bytes(1 if i == FLAG_BYTE else 0 for i in range(256))
+HIDDEN_FIELDS      = bytes(1 if i == UNKNOWN_BYTE or i == FLAG_BYTE else 0 for i in range(256))
+
+# Tables used by bytes.translate() to index the islands of a board. The
+# first two take the clue in the low or high half of a byte, the third
+# marks the fields with a clue of 0 and the fourth the fields that are not
+# borders. The last turns a clue from 1 to 8 into its char
+LOW_CLUES          = bytes(i & 15 for i in range(256))
+HIGH_CLUES         = bytes(i >> 4 for i in range(256))
+ZERO_CLUES         = bytes(1 if i == 0 else 0 for i in range(256))
+NOT_BORDER         = bytes(0 if i == BORDER_BYTE else 1 for i in range(256))
+CLUE_TEXT          = bytes(ord(CLUES[i - 1]) if 1 <= i <= len(CLUES) else 0 for i in range(256))
+
+# Number of bytes of a mapped board file read at a time to count its mines
+MAP_COUNT_BLOCK    = 1 << 24
+
+# Fields along each side of a chunk of a TiledBoard, as a power of two, and
+# the number of chunks kept in memory at once by default
+CHUNK_SHIFT        = 6
+CHUNK_SIZE         = 1 << CHUNK_SHIFT
+CHUNK_MASK         = CHUNK_SIZE - 1
+CHUNK_FIELDS       = CHUNK_SIZE * CHUNK_SIZE
+MAX_CHUNKS         = 4096
+
+# Number of board rows the clue grid is built from at a time with NumPy
+CLUE_BAND_ROWS     = 1024
+
+# For each byte, the 4 bytes that hold its bits spread out to every 4th
+# bit, used to build clues 4 bits at a time without NumPy
+SPREAD_BYTES       = [sum(1 << 4 * bit for bit in range(8) if value >> bit & 1).to_bytes(4, "little")
+                      for value in range(256)]
+
+# Number of binary digits of the mine density used when generating a
+# board, and the density used when none is given
+DENSITY_BITS       = 32
+DEFAULT_DENSITY    = 0.15
+
+# When mines are placed after the first reveal, boards with at least this
+# many fields for each mine get their mines picked one by one and their
+# clues added around each mine, instead of building the whole grids.
+# Building the clue grid with NumPy is faster than adding a mine's clues
+# in Python until there are about this many fields per mine
+SPARSE_MINE_FIELDS = 1024 if numpy is not None else 128
+
+# Table used by bytes.translate() when writing a board file, turning the
+# player's view into borders and spaces, before the mines are added
+BORDER_TEXT        = bytes(BORDER_BYTE if i == BORDER_BYTE else ord(SPACE) for i in range(256))
+
+# Or-ed into a space, this turns the space into a mine. The table turns
+# the bytes 1 and 0 of a row of mines into it and into a zero
+MINE_TEXT          = ord(MINE) ^ ord(SPACE)
+MINE_TEXT_VALUES   = bytes(MINE_TEXT if i == 1 else 0 for i in range(256))
+
+# Header of a binary board file: a magic number, the format version, the
+# compression, flags for the grids that follow the mines, the number of
+# rows and of columns, borders included, and the number of mines
+BINARY_MAGIC       = b"MSWB"
+BINARY_VERSION     = 1
+BINARY_HEADER      = struct.Struct("<4sBBBxIIQ")
+BINARY_COMPRESSIONS = {"none": 0, "zlib": 1, "lzma": 2}
+BINARY_HAS_BORDERS = 1
+BINARY_HAS_CLUES   = 2
+
+# The fastest zlib level; the mines do not compress, and the clue grid
+# compresses nearly as well as at the default level
+BINARY_ZLIB_LEVEL  = 1
+
+# Tables used by bytes.translate() to turn a row of the player's view into
+# a "1" for each border and a "0" for every other field, and back
+BORDER_DIGITS      = bytes(ord("1") if i == BORDER_BYTE else ord("0") for i in range(256))
+BORDER_FIELDS      = bytes(BORDER_BYTE if i == ord("1") else UNKNOWN_BYTE for i in range(256))
+
+# Header of a saved game: a magic number, the format version, whether a
+# mine was detonated, the number of moves played, the mines left to find
+# and the size of the compressed revealed and flagged fields
+SNAPSHOT_MAGIC     = b"MSWS"
+SNAPSHOT_VERSION   = 1
+SNAPSHOT_HEADER    = struct.Struct("<4sBB2xQqI")
+
+# Tables used by bytes.translate() to turn a row of the player's view into
+# a "1" for each revealed field, or each flagged field, and a "0" for
+# every other field
+REVEALED_DIGITS    = bytes(ord("0") if i in (UNKNOWN_BYTE, FLAG_BYTE, BORDER_BYTE) else ord("1") for i in range(256))
+FLAGGED_DIGITS     = bytes(ord("1") if i == FLAG_BYTE else ord("0") for i in range(256))
+
+# Tables used by bytes.translate() when loading a saved game, to turn the
+# binary digits of a bitset into a mask of 255 or 0 for each field, and a
+# clue into what the player sees once it is revealed
+DIGIT_MASKS        = bytes(255 if i == ord("1") else 0 for i in range(256))
+SHOWN_CLUES        = bytes(SPACE_BYTE if i == 0 else ord(CLUES[i - 1]) if i <= len(CLUES) else 0 for i in range(256))
+
+# The journal kept next to a saved game starts with a magic number and the
+# number of moves in the saved game, then holds a row, a column and an
+# action for each move played since. A new snapshot is saved every
+# SNAPSHOT_EVERY moves
+JOURNAL_SUFFIX     = ".journal"
+JOURNAL_MAGIC      = b"MSWJ"
+JOURNAL_HEADER     = struct.Struct("<4sQ")
+JOURNAL_MOVE       = struct.Struct("<IIB")
+SNAPSHOT_EVERY     = 1000
+
+# Most moves, and most changed fields over all of them, kept for undo by
+# a MoveHistory. Each changed field takes 9 bytes, and the oldest moves
+# are dropped first
+HISTORY_MOVES      = 1000
+HISTORY_FIELDS     = 1 << 22
+
+# Most bytes of grids a BoardCache keeps before dropping the boards used
+# least recently
+BOARD_CACHE_BYTES  = 1 << 28
 
-# prettyPrintBoard() prints the board with row and column labels,
-#                    and spaces the board out so that it looks square
-# Input:             board;   the rectangular 2d gameboard to print
-# Output:            None;    prints the board in a pretty way
-def prettyPrintBoard(board):
 
-    print() # empty line
-
-    # if enough columns, print a "tens column" line above
-    if len(board[0])-2 >= 10:
-        print("{:25s}".format(""), end="")  # empty space for 1 - 9
-        for i in range(10, len(board[0])-1 ):
-            print( str(i // 10), end =" ")
-        print()
-
-    # create and print top numbered line
-    print("       ", end="")
-    # only go from 1 to len - 1, so we don't number the borders
-    for i in range(1, len(board[0])-1 ):
-        # only print the last digit (so 15 --> 5)
-        print(str(i % 10), end = " ")
-    print()
+##############################################################################
+# Board              holds everything about a game board in a compact form.
+#                    Mines are kept as a bitset, one bit per field, and the
+#                    player's view of the board is kept as a flat
+#                    bytearray of chars, one byte per field.
+#                    The number of mines around each field is kept as a
+#                    4-bit clue, two fields per byte. Each grid is stored
+#                    row after row, so a field is found from its row and
+#                    column with the row stride of that grid.
+#
+#                    The accessors below take the same row and column
+#                    used to index the 2-D boards before, borders included
+#
+#                    The board also keeps running counts of the mines, the
+#                    flags placed on mines, the flags placed on fields
+#                    without a mine, and the fields without a mine that
+#                    are still hidden. setCell() and setMine() keep them
+#                    up to date, so checking for a win does not have to
+#                    look at the whole board
+class Board:
+    __slots__ = ("numRows", "numCols", "mineStride", "clueStride",
+                 "mines", "cells", "clues",
+                 "mineCount", "correctFlags", "wrongFlags", "hiddenSafe", "changes", "pendingMines")
+
+    ##########################################################################
+    # __init__()     creates an empty board, with every field hidden and
+    #                no mines, or a board around grids already built
+    # Input:         numRows; integer number of rows, borders included
+    #                numCols; integer number of columns, borders included
+    #                mines; bytearray of the mines, mineStride bytes per
+    #                       row, or None for no mines
+    #                cells; bytearray of the player's view, numCols bytes
+    #                       per row, or None for every field hidden
+    #                When either grid is given, recount() must be called
+    def __init__(self, numRows, numCols, mines=None, cells=None):
+        self.numRows    = numRows
+        self.numCols    = numCols
+        self.mineStride = (numCols + 7) // 8
+        self.clueStride = (numCols + 1) // 2
+
+        if mines is None:
+            mines = bytearray(numRows * self.mineStride)
+        elif len(mines) != numRows * self.mineStride:
+            raise ValueError("the mines grid is not " + str(numRows) + " rows of " + str(self.mineStride) + " bytes")
+        if cells is None:
+            cells = bytearray([UNKNOWN_BYTE]) * (numRows * numCols)
+        elif len(cells) != numRows * numCols:
+            raise ValueError("the view is not " + str(numRows) + " rows of " + str(numCols) + " fields")
+
+        self.mines = mines
+        self.cells = cells
+        self.clues = bytearray(numRows * self.clueStride)
+
+        # every field is hidden, and none of them holds a mine
+        self.mineCount    = 0
+        self.correctFlags = 0
+        self.wrongFlags   = 0
+        self.hiddenSafe   = numRows * numCols
+
+        # a FieldChanges that is told the old value of every field that
+        # is changed, while a move is recorded for undo
+        self.changes = None
+
+        # the PendingMines of a board whose mines are placed on the first
+        # reveal, or None once they are placed
+        self.pendingMines = None
+
+    ##########################################################################
+    # clear()        used to empty the board again, hiding every field and
+    #                taking away every mine, so it can be used for another
+    #                game without building new grids
+    # Input:         None
+    # Output:        None
+    def clear(self):
+        self.mines[:] = bytes(len(self.mines))
+        self.cells[:] = bytes([UNKNOWN_BYTE]) * len(self.cells)
+        self.clues[:] = bytes(len(self.clues))
+
+        self.mineCount    = 0
+        self.correctFlags = 0
+        self.wrongFlags   = 0
+        self.hiddenSafe   = self.numRows * self.numCols
+        self.pendingMines = None
+
+    ##########################################################################
+    # share()        used to start another game on the same board. The new
+    #                Board uses the same mines and clues grids, which must
+    #                not be changed while they are shared, and gets its own
+    #                copy of the view and of the running counts
+    # Input:         None
+    # Output:        board; the new Board
+    def share(self):
+        board = Board.__new__(Board)
+        board.numRows    = self.numRows
+        board.numCols    = self.numCols
+        board.mineStride = self.mineStride
+        board.clueStride = self.clueStride
+
+        board.mines = self.mines
+        board.cells = bytearray(self.cells)
+        board.clues = self.clues
+
+        board.mineCount    = self.mineCount
+        board.correctFlags = self.correctFlags
+        board.wrongFlags   = self.wrongFlags
+        board.hiddenSafe   = self.hiddenSafe
+        board.changes      = None
+        board.pendingMines = None
+        return board
+
+    ##########################################################################
+    # recount()      used to count the mines, flags and hidden fields from
+    #                scratch, after whole grids have been replaced
+    # Input:         None
+    # Output:        None; the running counts are reset
+    def recount(self):
+        self.mineCount    = 0
+        self.correctFlags = 0
+        self.wrongFlags   = 0
+        self.hiddenSafe   = 0
+
+        for row in range(self.numRows):
+            start = row * self.numCols
+            cells = self.cells[start:start + self.numCols]
+
+            # each of these holds one byte, 1 or 0, per field of the row,
+            # so and-ing them as integers marks the fields where both are 1
+            mines   = int.from_bytes(self.getMineRow(row), "little")
+            flagged = int.from_bytes(cells.translate(FLAGGED_FIELDS), "little")
+            hidden  = int.from_bytes(cells.translate(HIDDEN_FIELDS), "little")
+
+            correctFlags = countBits(flagged & mines)
+            self.mineCount    += countBits(mines)
+            self.correctFlags += correctFlags
+            self.wrongFlags   += countBits(flagged) - correctFlags
+            self.hiddenSafe   += countBits(hidden) - countBits(hidden & mines)
+
+    ##########################################################################
+    # isCounted()    used to find if the running counts can be read without
+    #                waiting for them to be counted. A Board always can
+    # Input:         None
+    # Output:        a boolean that is True if they can
+    def isCounted(self):
+        return True
+
+    ##########################################################################
+    # fewestMines()  used to find how many mines the board has at least,
+    #                without waiting for them to be counted
+    # Input:         None
+    # Output:        an integer - the mine count of a Board
+    def fewestMines(self):
+        return self.mineCount
+
+    ##########################################################################
+    # isMine()       used to check if a field holds a mine
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a boolean that is True if there is a mine there
+    def isMine(self, row, col):
+        return self.mines[row * self.mineStride + (col >> 3)] >> (col & 7) & 1 == 1
+
+    ##########################################################################
+    # setMine()      used to place a mine on a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        None
+    def setMine(self, row, col):
+        if self.isMine(row, col):
+            return
+
+        self.mines[row * self.mineStride + (col >> 3)] |= 1 << (col & 7)
+        self.mineCount += 1
+
+        # the field no longer counts as a hidden safe field, and a flag
+        # on it is now a correct one
+        value = self.cells[row * self.numCols + col]
+        if value == UNKNOWN_BYTE or value == FLAG_BYTE:
+            self.hiddenSafe -= 1
+        if value == FLAG_BYTE:
+            self.wrongFlags   -= 1
+            self.correctFlags += 1
+
+    ##########################################################################
+    # clearMine()    used to take a mine off a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        None
+    def clearMine(self, row, col):
+        if not self.isMine(row, col):
+            return
+
+        self.mines[row * self.mineStride + (col >> 3)] &= ~(1 << (col & 7))
+        self.mineCount -= 1
+
+        # the field counts as a hidden safe field again, and a flag on it
+        # is now a wrong one
+        value = self.cells[row * self.numCols + col]
+        if value == UNKNOWN_BYTE or value == FLAG_BYTE:
+            self.hiddenSafe += 1
+        if value == FLAG_BYTE:
+            self.correctFlags -= 1
+            self.wrongFlags   += 1
+
+    ##########################################################################
+    # getCell()      used to find what the player sees at a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a single char string, such as UNKNOWN or FLAG
+    def getCell(self, row, col):
+        return chr(self.cells[row * self.numCols + col])
+
+    ##########################################################################
+    # setCell()      used to change what the player sees at a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    #                value; single char string to show at the field
+    # Output:        None
+    def setCell(self, row, col, value):
+        index    = row * self.numCols + col
+        oldValue = self.cells[index]
+        newValue = ord(value)
+        self.cells[index] = newValue
+        if self.changes is not None and oldValue != newValue:
+            self.changes.add(index, oldValue)
+
+        self.countChange(self.isMine(row, col), oldValue, newValue)
+
+    ##########################################################################
+    # countChange()  used to keep the running counts up to date when what
+    #                the player sees at a field changes
+    # Input:         isMine; a boolean that is True if the field has a mine
+    #                oldValue; byte the field showed before
+    #                newValue; byte the field shows now
+    # Output:        None
+    def countChange(self, isMine, oldValue, newValue):
+        wasHidden = oldValue == UNKNOWN_BYTE or oldValue == FLAG_BYTE
+        isHidden  = newValue == UNKNOWN_BYTE or newValue == FLAG_BYTE
+
+        # update the running counts for a flag removed or placed
+        if oldValue == FLAG_BYTE:
+            if isMine:
+                self.correctFlags -= 1
+            else:
+                self.wrongFlags -= 1
+        if newValue == FLAG_BYTE:
+            if isMine:
+                self.correctFlags += 1
+            else:
+                self.wrongFlags += 1
+
+        # and for a field without a mine being revealed or hidden again
+        if not isMine and wasHidden != isHidden:
+            if isHidden:
+                self.hiddenSafe += 1
+            else:
+                self.hiddenSafe -= 1
+
+    ##########################################################################
+    # swapCells()    used to put back what the player saw at a list of
+    #                fields, such as to undo a move. Each field is listed
+    #                once, as a move changes a field at most once
+    # Input:         indices; array of the index (row * numCols + col) of
+    #                         each field
+    #                values; bytes to show at each field
+    # Output:        oldIndices; array of the same fields
+    #                oldValues; bytearray of what each of them showed, so
+    #                           swapping them back undoes the swap
+    def swapCells(self, indices, values):
+        cells      = self.cells
+        mines      = self.mines
+        numCols    = self.numCols
+        mineStride = self.mineStride
+        oldValues  = bytearray(map(cells.__getitem__, indices))
+
+        # write the fields straight into the view, keeping the running
+        # counts up to date as setCell() would
+        countChange = self.countChange
+        for index, oldValue, newValue in zip(indices, oldValues, values):
+            cells[index] = newValue
+            row, col = divmod(index, numCols)
+            countChange(mines[row * mineStride + (col >> 3)] >> (col & 7) & 1 == 1, oldValue, newValue)
+
+        return indices, oldValues
+
+    ##########################################################################
+    # swapEachCell() does the same as swapCells(), one field at a time with
+    #                getCell() and setCell(), for boards that do not keep
+    #                their view in one bytearray
+    # Input:         indices; array of the index (row * numCols + col) of
+    #                         each field
+    #                values; bytes to show at each field
+    # Output:        oldIndices; array of the same fields
+    #                oldValues; bytearray of what each of them showed
+    def swapEachCell(self, indices, values):
+        numCols   = self.numCols
+        oldValues = bytearray(len(values))
+
+        for position, index in enumerate(indices):
+            row, col = divmod(index, numCols)
+            oldValues[position] = ord(self.getCell(row, col))
+            self.setCell(row, col, chr(values[position]))
+
+        return indices, oldValues
+
+    ##########################################################################
+    # getClue()      used to find how many mines are around a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        an integer from 0 to 8
+    def getClue(self, row, col):
+        return self.clues[row * self.clueStride + (col >> 1)] >> ((col & 1) << 2) & 15
+
+    ##########################################################################
+    # getRow()       used to find what the player sees on a row
+    # Input:         row; integer row of the board
+    #                firstCol; integer - first column to include
+    #                lastCol; integer - column to stop before, or None
+    #                         to include the rest of the row
+    # Output:        a string with one char per field of the row
+    def getRow(self, row, firstCol=0, lastCol=None):
+        if lastCol is None:
+            lastCol = self.numCols
+
+        start = row * self.numCols
+        return self.cells[start + firstCol:start + lastCol].decode()
+
+    ##########################################################################
+    # getClueRow()   used to find the clues of a whole row at once
+    # Input:         row; integer row of the board
+    # Output:        a bytearray holding the clue of each field of the row
+    def getClueRow(self, row):
+        # unpack the clues, two to a byte, into one byte per field
+        start  = row * self.clueStride
+        packed = self.clues[start:start + self.clueStride]
+        clues  = bytearray(2 * self.clueStride)
+        clues[0::2] = packed.translate(LOW_CLUES)
+        clues[1::2] = packed.translate(HIGH_CLUES)
+        del clues[self.numCols:]
+        return clues
+
+    ##########################################################################
+    # getMineRow()   used to find which fields of a row hold mines
+    # Input:         row; integer row of the board
+    # Output:        bytes with a 1 for each field holding a mine and a 0
+    #                for every other field of the row
+    def getMineRow(self, row):
+        # the lowest bit is the first column, so reverse the binary digits
+        digits = format(self.getMineBits(row), "0" + str(self.mineStride * 8) + "b")[::-1]
+        return digits[:self.numCols].encode().translate(DIGIT_VALUES)
+
+    ##########################################################################
+    # getMineBits()  used to find which fields of a row hold mines
+    # Input:         row; integer row of the board
+    # Output:        an integer with bit col set for each field holding a
+    #                mine
+    def getMineBits(self, row):
+        start = row * self.mineStride
+        return int.from_bytes(self.mines[start:start + self.mineStride], "little")
+
+    ##########################################################################
+    # setMineRow()   used to place the mines of a whole row at once
+    # Input:         row; integer row of the board
+    #                mineDigits; bytes holding b"1" for each field with a
+    #                            mine and b"0" for every other field
+    # Output:        None; recount() must be called once the rows are set
+    def setMineRow(self, row, mineDigits):
+        self.setMineBits(row, int(mineDigits[::-1], 2) if mineDigits else 0)
+
+    ##########################################################################
+    # setMineBits()  used to place the mines of a whole row at once
+    # Input:         row; integer row of the board
+    #                bits; integer with bit col set for each field with a
+    #                      mine
+    # Output:        None; recount() must be called once the rows are set
+    def setMineBits(self, row, bits):
+        start = row * self.mineStride
+        self.mines[start:start + self.mineStride] = bits.to_bytes(self.mineStride, "little")
+
+    ##########################################################################
+    # setClueBits()  used to store the clues of a whole row at once
+    # Input:         row; integer row of the board
+    #                bits; integer holding the clue of field col in bits
+    #                      4 * col to 4 * col + 3
+    # Output:        None
+    def setClueBits(self, row, bits):
+        start = row * self.clueStride
+        self.clues[start:start + self.clueStride] = bits.to_bytes(self.clueStride, "little")
+
 
-    # create the border row
-    borderRow = "     "
-    for col in range(len(board[0])):
-        borderRow += board[0][col] + " "
-
-    # print the top border row
-    print(borderRow)
-
-    # print all the interior rows
-    for row in range(1, len(board) - 1):
-        # print the row label
-        print("{:3d}  ".format(row), end="")
-
-        # print the row contents
-        for col in range(len(board[row])):
-            if str(board[row][col]) == FLAG:
-                # this will print the flag in black and green
-                print("\033[1;30;42m" + "F" + "\033[0m", end =" ")
-            elif str(board[row][col]) == DETONATED_MINE:
-                # this will print the detonated Mine in white and red
-                print("\033[1;37;41m" + "X" + "\033[0m", end =" ")
+##############################################################################
+# MappedBoard        a Board read straight from a memory-mapped board file,
+#                    for boards too big to load. The file is treated as a
+#                    grid with a fixed number of bytes per row, so a field
+#                    is read from the file only when it is asked for, and
+#                    clues are counted from the fields around it then. Only
+#                    the fields the player has changed are kept in memory.
+#                    Every row of the file must be as long as the first
+#
+#                    The mines and borders are counted by a thread that
+#                    reads through the file in the background, so the
+#                    board can be played at once. The counts are waited
+#                    for only when they are read; until then the hidden
+#                    fields are counted as a change from the file's count
+class MappedBoard(Board):
+    __slots__ = ("boardFile", "fileMap", "rowStride", "changed",
+                 "countedMines", "countedHiddenSafe", "minesSoFar", "hiddenChange", "counter")
+
+    ##########################################################################
+    # __init__()     maps the board file into memory, and starts counting
+    #                its mines
+    # Input:         fileName; the name of the board file
+    def __init__(self, fileName):
+        self.boardFile = open(fileName, "rb")
+        self.fileMap   = mmap.mmap(self.boardFile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # the first line gives the number of columns, and whether lines
+        # end with "\n" or "\r\n"
+        lineEnd = self.fileMap.find(b"\n")
+        if lineEnd == -1:
+            lineEnd = len(self.fileMap)
+        numCols = lineEnd
+        if numCols > 0 and self.fileMap[numCols - 1] == ord("\r"):
+            numCols -= 1
+        self.rowStride = lineEnd + 1
+
+        # the last line may be missing its line ending, or be followed by
+        # blank lines, which createBoard() skips too
+        fileSize = len(self.fileMap)
+        while fileSize > 0 and self.fileMap[fileSize - 1] in b"\r\n":
+            fileSize -= 1
+        numRows, extra = divmod(fileSize + self.rowStride - numCols, self.rowStride) if fileSize else (0, 0)
+        if extra > 0:
+            raise ValueError(fileName + ": rows are not all " + str(numCols) + " fields long")
+
+        self.numRows      = numRows
+        self.numCols      = numCols
+        self.changed      = {}
+        self.correctFlags = 0
+        self.wrongFlags   = 0
+
+        self.countedMines      = None
+        self.countedHiddenSafe = None
+        self.hiddenChange      = 0
+        self.changes           = None
+        self.pendingMines      = None
+
+        # a mine near the start of the file is enough to know a game with
+        # no flags is not won, until the first block has been counted
+        self.minesSoFar = 1 if self.fileMap.find(MINE.encode(), 0, MAP_COUNT_BLOCK) != -1 else 0
+
+        # the thread reads the file through its own handle, so it does not
+        # move the board's
+        self.counter = threading.Thread(target=self.countFields, args=(open(fileName, "rb"),), daemon=True)
+        self.counter.start()
+
+    ##########################################################################
+    # countFields()  used to count the mines and the hidden fields without
+    #                a mine, reading the file one block at a time
+    # Input:         countFile; the board file opened for reading, which
+    #                           is closed once it is counted
+    # Output:        None
+    def countFields(self, countFile):
+        mines   = 0
+        borders = 0
+
+        with countFile:
+            block = countFile.read(MAP_COUNT_BLOCK)
+            while block:
+                mines   += block.count(MINE.encode())
+                borders += block.count(BORDER.encode())
+                self.minesSoFar = mines
+                block = countFile.read(MAP_COUNT_BLOCK)
+
+        # the mine count is set last, as it marks the counting done
+        self.countedHiddenSafe = self.numRows * self.numCols - mines - borders
+        self.countedMines      = mines
+
+    ##########################################################################
+    # waitForCount() used to wait until the file has been counted. If the
+    #                thread could not count it, it is counted here instead,
+    #                so the error is raised to the caller
+    # Input:         None
+    # Output:        None
+    def waitForCount(self):
+        if self.countedMines is None:
+            self.counter.join()
+        if self.countedMines is None:
+            self.countFields(open(self.boardFile.name, "rb"))
+
+    ##########################################################################
+    # isCounted()    used to find if the running counts can be read without
+    #                waiting for the file to be counted
+    # Input:         None
+    # Output:        a boolean that is True once the file has been counted
+    def isCounted(self):
+        return self.countedMines is not None
+
+    ##########################################################################
+    # fewestMines()  used to find how many mines the board has at least,
+    #                without waiting for the file to be counted
+    # Input:         None
+    # Output:        an integer - the mines counted so far
+    def fewestMines(self):
+        return self.minesSoFar if self.countedMines is None else self.countedMines
+
+    ##########################################################################
+    # mineCount, hiddenSafe  the running counts kept by Board, read once the
+    #                        file has been counted. The mines of a mapped
+    #                        board can not be changed
+    @property
+    def mineCount(self):
+        self.waitForCount()
+        return self.countedMines
+
+    @property
+    def hiddenSafe(self):
+        self.waitForCount()
+        return self.countedHiddenSafe + self.hiddenChange
+
+    @hiddenSafe.setter
+    def hiddenSafe(self, value):
+        self.waitForCount()
+        self.hiddenChange = value - self.countedHiddenSafe
+
+    ##########################################################################
+    # countChange()  used to keep the running counts up to date when what
+    #                the player sees at a field changes, as for a Board.
+    #                The hidden fields are counted as a change from the
+    #                file's count, so it is not waited for
+    # Input:         isMine; a boolean that is True if the field has a mine
+    #                oldValue; byte the field showed before
+    #                newValue; byte the field shows now
+    # Output:        None
+    def countChange(self, isMine, oldValue, newValue):
+        wasHidden = oldValue == UNKNOWN_BYTE or oldValue == FLAG_BYTE
+        isHidden  = newValue == UNKNOWN_BYTE or newValue == FLAG_BYTE
+
+        if oldValue == FLAG_BYTE:
+            if isMine:
+                self.correctFlags -= 1
+            else:
+                self.wrongFlags -= 1
+        if newValue == FLAG_BYTE:
+            if isMine:
+                self.correctFlags += 1
+            else:
+                self.wrongFlags += 1
+
+        if not isMine and wasHidden != isHidden:
+            if isHidden:
+                self.hiddenChange += 1
             else:
-                print(str(board[row][col]), end = " ")
-        print()
+                self.hiddenChange -= 1
+
+    ##########################################################################
+    # isMine()       used to check if a field holds a mine
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a boolean that is True if there is a mine there
+    def isMine(self, row, col):
+        return self.fileMap[row * self.rowStride + col] == MINE_BYTE
+
+    ##########################################################################
+    # setMine(), clearMine()  the mines of a mapped board can not be changed
+    def setMine(self, row, col):
+        raise TypeError("the mines of a MappedBoard can not be changed")
+
+    def clearMine(self, row, col):
+        raise TypeError("the mines of a MappedBoard can not be changed")
+
+    ##########################################################################
+    # getCell()      used to find what the player sees at a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a single char string, such as UNKNOWN or FLAG
+    def getCell(self, row, col):
+        value = self.changed.get(row * self.numCols + col)
+        if value is None:
+            value = HIDE_FIELDS[self.fileMap[row * self.rowStride + col]]
+        return chr(value)
+
+    ##########################################################################
+    # setCell()      used to change what the player sees at a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    #                value; single char string to show at the field
+    # Output:        None
+    def setCell(self, row, col, value):
+        index    = row * self.numCols + col
+        oldValue = ord(self.getCell(row, col))
+        newValue = ord(value)
+        self.changed[index] = newValue
+        if self.changes is not None and oldValue != newValue:
+            self.changes.add(index, oldValue)
+
+        self.countChange(self.isMine(row, col), oldValue, newValue)
+
+    ##########################################################################
+    # swapCells()    used to put back what the player saw at a list of
+    #                fields, as for a Board
+    # Input:         indices; array of the index of each field
+    #                values; bytes to show at each field
+    # Output:        oldIndices, oldValues; what swaps them back
+    def swapCells(self, indices, values):
+        return self.swapEachCell(indices, values)
+
+    ##########################################################################
+    # getClue()      used to find how many mines are around a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        an integer from 0 to 8
+    def getClue(self, row, col):
+        return numOfMinesAround(row, col, self)
+
+    ##########################################################################
+    # getRow()       used to find what the player sees on a row
+    # Input:         row; integer row of the board
+    #                firstCol; integer - first column to include
+    #                lastCol; integer - column to stop before, or None
+    #                         to include the rest of the row
+    # Output:        a string with one char per field of the row
+    def getRow(self, row, firstCol=0, lastCol=None):
+        if lastCol is None:
+            lastCol = self.numCols
+
+        start = row * self.rowStride
+        cells = bytearray(self.fileMap[start + firstCol:start + lastCol].translate(HIDE_FIELDS))
+
+        # put back the fields the player has changed
+        if self.changed:
+            start = row * self.numCols
+            for col in range(firstCol, lastCol):
+                value = self.changed.get(start + col)
+                if value is not None:
+                    cells[col - firstCol] = value
+
+        return cells.decode()
+
+    ##########################################################################
+    # getMineBits()  used to find which fields of a row hold mines
+    # Input:         row; integer row of the board
+    # Output:        an integer with bit col set for each field holding a
+    #                mine
+    def getMineBits(self, row):
+        start  = row * self.rowStride
+        digits = self.fileMap[start:start + self.numCols].translate(MINE_DIGITS)
+        return int(digits[::-1], 2) if digits else 0
+
+    ##########################################################################
+    # close()        unmaps the board file
+    # Input:         None
+    # Output:        None
+    def close(self):
+        self.fileMap.close()
+        self.boardFile.close()
 
-    # print the bottom border row and an empty line
-    print(borderRow, "\n")
+
+##############################################################################
+# BoardChunk         one square tile of a TiledBoard, holding the mines and
+#                    the player's view of CHUNK_SIZE by CHUNK_SIZE fields,
+#                    one byte per field, row after row
+class BoardChunk:
+    __slots__ = ("mines", "cells", "isDirty")
+
+    ##########################################################################
+    # __init__()     creates a chunk
+    # Input:         mines; bytes holding a 1 for each field with a mine
+    #                cells; bytearray of what the player sees at each field
+    def __init__(self, mines, cells):
+        self.mines   = mines
+        self.cells   = cells
+        self.isDirty = False
+
+##############################################################################
+# TiledBoard         a Board split into square chunks of CHUNK_SIZE by
+#                    CHUNK_SIZE fields, for boards far too big to hold in
+#                    memory. The mines of each chunk are placed at random
+#                    from a seed made from the board's seed and where the
+#                    chunk is, so a chunk is only built when one of its
+#                    fields is first used, and the same mines are placed
+#                    each time it is built again
+#
+#                    At most maxChunks chunks are kept in memory. When
+#                    another one is needed, the least recently used one
+#                    is dropped. If the player has changed any of its
+#                    fields, its view is first written to a temporary
+#                    store file, and read back from there when the chunk
+#                    is needed again. Clues are counted from the fields
+#                    around a field when asked for, so they work across
+#                    chunks the same way as inside one
+class TiledBoard(Board):
+    __slots__ = ("density", "seed", "maxChunks", "chunks", "lastKey", "lastChunk",
+                 "storeFile", "storeSlots")
+
+    ##########################################################################
+    # __init__()     creates a board, without building any of its chunks
+    # Input:         numRows; integer number of rows, borders included
+    #                numCols; integer number of columns, borders included
+    #                density; float - fraction of the fields of each chunk
+    #                         holding a mine
+    #                seed; integer seed for the random mines, or None to
+    #                      pick one at random
+    #                maxChunks; integer number of chunks kept in memory
+    def __init__(self, numRows, numCols, density, seed=None, maxChunks=MAX_CHUNKS):
+        if not 0 <= density <= 1:
+            raise ValueError("the density must be between 0 and 1")
+        if maxChunks < 1:
+            raise ValueError("at least one chunk must be kept in memory")
+
+        self.numRows   = numRows
+        self.numCols   = numCols
+        self.density   = density
+        self.seed      = random.getrandbits(64) if seed is None else seed
+        self.maxChunks = maxChunks
+
+        self.chunks    = OrderedDict()
+        self.lastKey   = None
+        self.lastChunk = None
+
+        # the store file is only created when a changed chunk is dropped.
+        # Each chunk written to it gets its own slot of CHUNK_FIELDS bytes
+        self.storeFile  = None
+        self.storeSlots = {}
+
+        # each chunk holds a fixed number of mines, so they can be counted
+        # from the number of chunks of each size
+        self.mineCount = 0
+        for chunkRows, rowChunks in chunkSpans(numRows).items():
+            for chunkCols, colChunks in chunkSpans(numCols).items():
+                self.mineCount += rowChunks * colChunks * round(density * chunkRows * chunkCols)
+
+        self.correctFlags = 0
+        self.wrongFlags   = 0
+        self.hiddenSafe   = max(numRows - 2, 0) * max(numCols - 2, 0) - self.mineCount
+        self.changes      = None
+        self.pendingMines = None
+
+    ##########################################################################
+    # getChunk()     used to find the chunk holding a field, building it or
+    #                reading it back from the store file if it is not in
+    #                memory
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        chunk; the BoardChunk holding the field
+    def getChunk(self, row, col):
+        key = (row >> CHUNK_SHIFT, col >> CHUNK_SHIFT)
+        if key == self.lastKey:
+            return self.lastChunk
+
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.loadChunk(*key)
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.maxChunks:
+                self.dropChunk()
+        else:
+            self.chunks.move_to_end(key)
+
+        self.lastKey   = key
+        self.lastChunk = chunk
+        return chunk
+
+    ##########################################################################
+    # loadChunk()    used to build a chunk, placing its mines, and to read
+    #                back what the player has changed in it
+    # Input:         chunkRow; integer row of the chunk
+    #                chunkCol; integer column of the chunk
+    # Output:        chunk; the new BoardChunk
+    def loadChunk(self, chunkRow, chunkCol):
+        # only the fields inside the borders can hold a mine
+        firstRow = max(chunkRow << CHUNK_SHIFT, 1)
+        lastRow  = min((chunkRow + 1) << CHUNK_SHIFT, self.numRows - 1)
+        firstCol = max(chunkCol << CHUNK_SHIFT, 1)
+        lastCol  = min((chunkCol + 1) << CHUNK_SHIFT, self.numCols - 1)
+
+        fields = [(row & CHUNK_MASK) << CHUNK_SHIFT | (col & CHUNK_MASK)
+                  for row in range(firstRow, lastRow) for col in range(firstCol, lastCol)]
+
+        # the seed and the chunk are given to random.Random() as text,
+        # which it hashes whole, so the seed keeps its sign and no two
+        # chunks share a seed, however far out they are
+        rng   = random.Random(str((self.seed, chunkRow, chunkCol)))
+        mines = bytearray(CHUNK_FIELDS)
+        for field in rng.sample(fields, round(self.density * len(fields))):
+            mines[field] = 1
+
+        slot = self.storeSlots.get((chunkRow, chunkCol))
+        if slot is not None:
+            self.storeFile.seek(slot * CHUNK_FIELDS)
+            cells = bytearray(self.storeFile.read(CHUNK_FIELDS))
+        else:
+            # every field starts as a border, then the ones inside the
+            # borders are hidden
+            cells = bytearray([BORDER_BYTE]) * CHUNK_FIELDS
+            hidden = bytes([UNKNOWN_BYTE]) * max(lastCol - firstCol, 0)
+            for row in range(firstRow, lastRow):
+                start = (row & CHUNK_MASK) << CHUNK_SHIFT | (firstCol & CHUNK_MASK)
+                cells[start:start + len(hidden)] = hidden
+
+        chunk = BoardChunk(bytes(mines), cells)
+        chunk.isDirty = slot is not None
+        return chunk
+
+    ##########################################################################
+    # dropChunk()    used to drop the least recently used chunk from memory,
+    #                writing it to the store file if it has been changed
+    # Input:         None
+    # Output:        None
+    def dropChunk(self):
+        key, chunk = self.chunks.popitem(last=False)
+        if key == self.lastKey:
+            self.lastKey   = None
+            self.lastChunk = None
+
+        # a chunk the player has not changed can just be built again
+        if not chunk.isDirty:
+            return
+
+        if self.storeFile is None:
+            self.storeFile = tempfile.TemporaryFile()
+
+        slot = self.storeSlots.setdefault(key, len(self.storeSlots))
+        self.storeFile.seek(slot * CHUNK_FIELDS)
+        self.storeFile.write(chunk.cells)
+
+    ##########################################################################
+    # isMine()       used to check if a field holds a mine
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a boolean that is True if there is a mine there
+    def isMine(self, row, col):
+        return self.getChunk(row, col).mines[(row & CHUNK_MASK) << CHUNK_SHIFT | (col & CHUNK_MASK)] == 1
+
+    ##########################################################################
+    # setMine(), clearMine()  the mines of a tiled board can not be changed
+    def setMine(self, row, col):
+        raise TypeError("the mines of a TiledBoard can not be changed")
+
+    def clearMine(self, row, col):
+        raise TypeError("the mines of a TiledBoard can not be changed")
+
+    ##########################################################################
+    # getCell()      used to find what the player sees at a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a single char string, such as UNKNOWN or FLAG
+    def getCell(self, row, col):
+        return chr(self.getChunk(row, col).cells[(row & CHUNK_MASK) << CHUNK_SHIFT | (col & CHUNK_MASK)])
+
+    ##########################################################################
+    # setCell()      used to change what the player sees at a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    #                value; single char string to show at the field
+    # Output:        None
+    def setCell(self, row, col, value):
+        chunk    = self.getChunk(row, col)
+        index    = (row & CHUNK_MASK) << CHUNK_SHIFT | (col & CHUNK_MASK)
+        oldValue = chunk.cells[index]
+        newValue = ord(value)
+        chunk.cells[index] = newValue
+        chunk.isDirty = True
+        if self.changes is not None and oldValue != newValue:
+            self.changes.add(row * self.numCols + col, oldValue)
+
+        self.countChange(chunk.mines[index] == 1, oldValue, newValue)
+
+    ##########################################################################
+    # swapCells()    used to put back what the player saw at a list of
+    #                fields, as for a Board
+    # Input:         indices; array of the index of each field
+    #                values; bytes to show at each field
+    # Output:        oldIndices, oldValues; what swaps them back
+    def swapCells(self, indices, values):
+        return self.swapEachCell(indices, values)
+
+    ##########################################################################
+    # getClue()      used to find how many mines are around a field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        an integer from 0 to 8
+    def getClue(self, row, col):
+        return numOfMinesAround(row, col, self)
+
+    ##########################################################################
+    # getRow()       used to find what the player sees on a row
+    # Input:         row; integer row of the board
+    #                firstCol; integer - first column to include
+    #                lastCol; integer - column to stop before, or None
+    #                         to include the rest of the row
+    # Output:        a string with one char per field of the row
+    def getRow(self, row, firstCol=0, lastCol=None):
+        if lastCol is None:
+            lastCol = self.numCols
+
+        # take the part of the row in each chunk it crosses
+        parts = []
+        col   = firstCol
+        while col < lastCol:
+            stop  = min((col | CHUNK_MASK) + 1, lastCol)
+            start = (row & CHUNK_MASK) << CHUNK_SHIFT | (col & CHUNK_MASK)
+            parts.append(self.getChunk(row, col).cells[start:start + stop - col])
+            col = stop
+
+        return b"".join(parts).decode()
+
+    ##########################################################################
+    # close()        removes the store file
+    # Input:         None
+    # Output:        None
+    def close(self):
+        if self.storeFile is not None:
+            self.storeFile.close()
+
+#####################################################################
+# chunkSpans()       used to find how many of the fields inside the
+#                    borders each chunk along one side of a board holds
+# Input:             size; integer number of rows or columns of the
+#                          board, borders included
+# Output:            spans; a dict from a number of fields to the number
+#                           of chunks holding that many
+def chunkSpans(size):
+    spans = {}
+    if size <= 2:
+        return spans
+
+    # the first chunk starts after the border, and the last one stops
+    # before the border, which may be in the chunk after it
+    lastField  = size - 2
+    lastChunk  = lastField >> CHUNK_SHIFT
+    if lastChunk == 0:
+        spans[lastField] = 1
+        return spans
+
+    firstSpan = CHUNK_SIZE - 1
+    lastSpan  = lastField - (lastChunk << CHUNK_SHIFT) + 1
+    spans[firstSpan] = 1
+    spans[lastSpan]  = spans.get(lastSpan, 0) + 1
+    if lastChunk > 1:
+        spans[CHUNK_SIZE] = spans.get(CHUNK_SIZE, 0) + lastChunk - 1
+    return spans
+
+
+# renderBoard()      builds the text prettyPrintBoard() prints: the board
+#                    with row and column labels, spaced out so that it
+#                    looks square. A window of the board can be given, in
+#                    which case only that part is built, still labeled
+#                    with the row and column numbers of the whole board
+# Input:             board;   the Board to print
+#                    top; integer - first row to print, borders included
+#                    left; integer - first column to print
+#                    height; integer - number of rows to print, or None
+#                            for all of them
+#                    width; integer - number of columns to print, or
+#                           None for all of them
+# Output:            frame;   a string holding the printed board
+def renderBoard(board, top=0, left=0, height=None, width=None):
+
+    bottom = board.numRows if height is None else min(top + height, board.numRows)
+    right  = board.numCols if width is None else min(left + width, board.numCols)
+
+    # the row labels are wide enough for the largest row number
+    labelWidth = rowLabelWidth(board)
+    blankLabel = " " * (labelWidth + 2)
+
+    # only number the columns that are not borders
+    firstCol = max(left, 1)
+    lastCol  = min(right, board.numCols - 1) - 1
+
+    lines = [""] # empty line
+
+    # if enough columns, add a "tens column" line above, and a line for
+    # each higher digit (hundreds, thousands, ...) above that
+    place = 1
+    while lastCol >= place * 10:
+        place *= 10
+    while place >= 10:
+        # empty space for the columns with fewer digits
+        labels = ["  "] * (max(min(place, lastCol + 1), left) - left)
+        labels += [str(i // place % 10) + " " for i in range(max(place, left), lastCol + 1)]
+        lines.append(blankLabel + "".join(labels))
+        place //= 10
+
+    # create the numbered line, only using the last digit (15 --> 5)
+    labels = ["  "] * (firstCol - left)
+    labels += [str(i % 10) + " " for i in range(firstCol, lastCol + 1)]
+    lines.append(blankLabel + "".join(labels))
+
+    # add the rows, labeling all but the border rows
+    for row in range(top, bottom):
+        if row == 0 or row == board.numRows - 1:
+            label = blankLabel
+        else:
+            label = "{:{}d}  ".format(row, labelWidth)
+        lines.append(label + renderRow(board.getRow(row, left, right)))
+
+    # add an empty line
+    lines[-1] += " \n"
+
+    return "\n".join(lines) + "\n"
+
+######################################################################
+# rowLabelWidth()    used to find how wide the row labels printed by
+#                    renderBoard() are
+# Input:             board;   the Board to print
+# Output:            width;   integer - at least 3, or the number of
+#                             digits in the largest row number
+def rowLabelWidth(board):
+    return max(3, len(str(board.numRows - END_OF_LINE)))
+
+######################################################################
+# renderRow()        spaces out one row of the board, coloring its flags
+#                    and detonated mines
+# Input:             cells;   string with one char per field of the row
+# Output:            text;    the row as it is printed
+def renderRow(cells):
+    text = " ".join(cells) + " "
+
+    if FLAG in cells:
+        text = text.replace(FLAG, COLORED_FLAG)
+    if DETONATED_MINE in cells:
+        text = text.replace(DETONATED_MINE, COLORED_DETONATED_MINE)
+
+    return text
+
+######################################################################
+# prettyPrintBoard() prints the board with row and column labels,
+#                    and spaces the board out so that it looks square.
+#                    The whole board is written to the screen at once
+# Input:             board;   the Board to print
+# Output:            None;    prints the board in a pretty way
+def prettyPrintBoard(board):
+    sys.stdout.write(renderBoard(board))
+
+######################################################################
+# BoardRenderer      prints a board the first time it is drawn, and then
+#                    only redraws the fields that changed since the last
+#                    time, moving the cursor to each of them. Used when
+#                    the whole board fits on the screen
+class BoardRenderer:
+    __slots__ = ("lastCells", "numRows", "numCols", "firstLine", "firstColumn")
+
+    ##################################################################
+    # __init__()     creates a renderer that has not drawn anything yet
+    def __init__(self):
+        self.lastCells   = None
+        self.numRows     = 0
+        self.numCols     = 0
+        self.firstLine   = 0
+        self.firstColumn = 0
+
+    ##################################################################
+    # draw()         prints the board, or the fields that changed since
+    #                it was last drawn, and leaves the cursor below it
+    # Input:         board;   the Board to print
+    # Output:        None;    writes the frame to the screen at once
+    def draw(self, board):
+        if self.lastCells is None or self.numRows != board.numRows or self.numCols != board.numCols:
+            frame = CLEAR_SCREEN + renderBoard(board)
+
+            # the top border row comes after the empty line and the
+            # column number lines
+            self.numRows   = board.numRows
+            self.numCols   = board.numCols
+            self.firstLine = len(str(max(board.numCols - 2, 1))) + 2
+
+            # and the fields come after the row labels
+            self.firstColumn = rowLabelWidth(board) + 3
+        else:
+            frame = self.changedFields(board)
+
+        self.lastCells = bytes(board.cells)
+        sys.stdout.write(frame)
+
+    ##################################################################
+    # changedFields() builds the text that redraws the fields that
+    #                 changed since the last frame
+    # Input:          board;   the Board to print
+    # Output:         frame;   a string of cursor moves and fields
+    def changedFields(self, board):
+        numCols = self.numCols
+        parts   = []
+
+        for row in range(self.numRows):
+            start    = row * numCols
+            newCells = board.cells[start:start + numCols]
+            oldCells = self.lastCells[start:start + numCols]
+            if newCells == oldCells:
+                continue
+
+            for col in range(numCols):
+                if newCells[col] != oldCells[col]:
+                    # each field takes two columns, after the row label
+                    parts.append(MOVE_CURSOR.format(self.firstLine + row, self.firstColumn + 2 * col))
+                    parts.append(renderRow(chr(newCells[col]))[:-1])
+
+        # move back below the board and clear what was printed there
+        parts.append(MOVE_CURSOR.format(self.firstLine + self.numRows + 1, 1) + CLEAR_BELOW)
+
+        return "".join(parts)
+
+######################################################################
+# Viewport           prints only a window of the board, for boards too
+#                    big for the screen. The window can be placed by the
+#                    caller, or follow the last move of a game
+class Viewport:
+    __slots__ = ("height", "width", "top", "left", "game")
+
+    ##################################################################
+    # __init__()     creates a viewport at the top left of the board
+    # Input:         height; integer - number of rows to print
+    #                width; integer - number of columns to print
+    #                game; the Game whose last move the window follows,
+    #                      or None to leave the window where it is put
+    def __init__(self, height, width, game=None):
+        self.height = height
+        self.width  = width
+        self.top    = 0
+        self.left   = 0
+        self.game   = game
+
+    ##################################################################
+    # moveTo()       places the window, keeping it on the board
+    # Input:         board;   the Board being printed
+    #                top; integer - first row of the window
+    #                left; integer - first column of the window
+    # Output:        None
+    def moveTo(self, board, top, left):
+        self.top  = max(0, min(top, board.numRows - self.height))
+        self.left = max(0, min(left, board.numCols - self.width))
+
+    ##################################################################
+    # centerOn()     places the window with a field in its middle
+    # Input:         board;   the Board being printed
+    #                row; integer row of the field
+    #                col; integer column of the field
+    # Output:        None
+    def centerOn(self, board, row, col):
+        self.moveTo(board, row - self.height // 2, col - self.width // 2)
+
+    ##################################################################
+    # draw()         prints the window of the board
+    # Input:         board;   the Board to print
+    # Output:        None;    writes the window to the screen at once
+    def draw(self, board):
+        if self.game is not None and self.game.lastMove is not None:
+            self.centerOn(board, *self.game.lastMove)
+
+        sys.stdout.write(renderBoard(board, self.top, self.left, self.height, self.width))
 
 #####################################################################
-# createBoard()      used to create initial game board from file
+# createBoard()      used to create the game board from file in a single
+#                    pass. The file is read one line at a time, so only
+#                    the board itself is kept in memory, and both Unix
+#                    and Windows line endings are accepted
 # Input:             fileName; the file name entered by the user 
 # Output:            board;    the board it got from the file
 
 def createBoard(fileName):
-    
-    row = []
-    board = []
-    i = 0
-    j = 0
-
-    # open the file and read in contents
-    gameFile = open(fileName)
-    fileContent = gameFile.read()
-
-    # close the file
-    gameFile.close()
-
-    # put contents of file that was read into a 2-d list
-    while i < len(fileContent):
-        row.append(fileContent[i:i+1])
-        if fileContent[i+1:i+2] == "\n":
-            board.append(row[j:i+1])
-            j = i + 2
-        i += 1
+    with open(fileName, "rb") as gameFile:
+        return loadTextBoard(gameFile, fileName)
+
+#####################################################################
+# loadTextBoard()    used to read a board in the text format from an
+#                    open binary file, one line at a time
+# Input:             gameFile; the binary file to read, at the start of
+#                              the board
+#                    fileName; the name of the file, for errors
+# Output:            board;    the board it got from the file
+
+def loadTextBoard(gameFile, fileName):
+
+    fieldRows = bytearray()
+    mineRows  = bytearray()
+    numRows   = 0
+    numCols   = 0
+
+    for line in gameFile:
+        line = line.rstrip(b"\r\n")
+
+        # skip blank lines, such as one left at the end of the file
+        if line == b"":
+            continue
+
+        if numRows == 0:
+            numCols    = len(line)
+            mineStride = (numCols + 7) // 8
+        elif len(line) != numCols:
+            raise ValueError(fileName + ": row " + str(numRows + 1) + " is not as long as the first row")
+
+        # keep the hidden fields the player sees, and the mines of
+        # the row packed into a bitset, the lowest bit first
+        fieldRows += line.translate(HIDE_FIELDS)
+        mineRows  += int(line.translate(MINE_DIGITS)[::-1], 2).to_bytes(mineStride, "little")
+        numRows   += 1
+
+    board = Board(numRows, numCols, mineRows, fieldRows)
+    board.recount()
+
+    # count the mines around every position once, so revealing a
+    # position only has to look its clue up
+    createClueGrid(board)
+
+    return board
+
+#####################################################################
+# generateBoard()    used to create a game board with mines placed at
+#                    random, surrounded by a border
+# Input:             numRows; integer number of rows, without borders
+#                    numCols; integer number of columns, without borders
+#                    mineCount; integer number of mines to place, or None
+#                               to use the density
+#                    density; float - fraction of the fields to fill with
+#                             mines, used when mineCount is None
+#                    seed; the seed for the random numbers, so the same
+#                          seed always gives the same board
+#                    board; a Board of the same size to clear and reuse,
+#                           or None to create a new one
+#                    safeStart; a boolean that is True to place the mines
+#                               only when the first field is revealed, so
+#                               it and its neighbors never hold a mine.
+#                               See placePendingMines()
+# Output:            board;    the Board that was created
+
+def generateBoard(numRows, numCols, mineCount=None, density=None, seed=None, board=None, safeStart=False):
+    numFields = numRows * numCols
+    if mineCount is None:
+        if isinstance(density, bool) or not isinstance(density, (int, float)) or not 0 <= density <= 1:
+            raise ValueError("a mine count, or a density between 0 and 1, is needed")
+        mineCount = round(density * numFields)
+
+    # placeMines() adds and takes away whole mines until there are exactly
+    # mineCount of them, which never happens for a fraction of a mine
+    if isinstance(mineCount, bool) or not isinstance(mineCount, int):
+        raise ValueError("the mine count must be a whole number, not " + repr(mineCount))
+    if not 0 <= mineCount <= numFields:
+        raise ValueError("can not place " + str(mineCount) + " mines on " + str(numFields) + " fields")
+
+    rng = random.Random(seed)
+    if board is None:
+        board = Board(numRows + 2, numCols + 2)
+    elif board.numRows != numRows + 2 or board.numCols != numCols + 2:
+        raise ValueError("the board to reuse is not " + str(numRows) + "x" + str(numCols))
+    else:
+        board.clear()
+
+    if not safeStart:
+        placeMines(board, mineCount, rng)
+
+    # surround the fields with borders
+    borderRow = bytes([BORDER_BYTE]) * board.numCols
+    board.cells[:board.numCols] = borderRow
+    board.cells[-board.numCols:] = borderRow
+    for row in range(1, board.numRows - 1):
+        board.cells[row * board.numCols] = BORDER_BYTE
+        board.cells[(row + 1) * board.numCols - 1] = BORDER_BYTE
+
+    # nothing is flagged, and every field without a mine is hidden. The
+    # counts are the same whether the mines are placed yet or not
+    board.mineCount    = mineCount
+    board.correctFlags = 0
+    board.wrongFlags   = 0
+    board.hiddenSafe   = numFields - mineCount
+
+    if safeStart:
+        board.pendingMines = PendingMines(mineCount, rng)
+    else:
+        createClueGrid(board)
 
     return board
 
+#####################################################################
+# placeMines()       used to place mines at random on the fields of an
+#                    empty board, inside its borders
+# Input:             board; the Board to place the mines on
+#                    mineCount; integer number of mines to place
+#                    rng; the random.Random to use
+#                    safeFields; a set of (row, col) fields that must not
+#                                hold a mine
+# Output:            None; the running counts are left to the caller
+
+def placeMines(board, mineCount, rng, safeFields=frozenset()):
+    numRows = board.numRows - 2
+    numCols = board.numCols - 2
+
+    # give every field the same chance of holding a mine, a whole row at
+    # a time, then add or take away mines at random fields until there
+    # are exactly mineCount of them. Each set of mineCount fields is as
+    # likely as any other to be the one that is picked
+    chance = mineCount / (numRows * numCols) if numRows * numCols else 0
+    placed = 0
+    for row in range(1, numRows + 1):
+        bits = randomBits(rng, numCols, chance)
+        board.setMineBits(row, bits << 1)
+        placed += countBits(bits)
+
+    while placed != mineCount:
+        row = rng.randint(1, numRows)
+        col = rng.randint(1, numCols)
+        if placed < mineCount and not board.isMine(row, col):
+            board.setMine(row, col)
+            placed += 1
+        elif placed > mineCount and board.isMine(row, col):
+            board.clearMine(row, col)
+            placed -= 1
+
+    # move each mine on a safe field to a random field that is neither
+    # safe nor a mine. Every other field is as likely to get it, so each
+    # set of mineCount fields that are not safe is still as likely as
+    # any other
+    for row, col in safeFields:
+        if not board.isMine(row, col):
+            continue
+        board.clearMine(row, col)
+        while True:
+            nextRow = rng.randint(1, numRows)
+            nextCol = rng.randint(1, numCols)
+            if (nextRow, nextCol) not in safeFields and not board.isMine(nextRow, nextCol):
+                board.setMine(nextRow, nextCol)
+                break
+
+#####################################################################
+# placeSparseMines() used to place a few mines at random on the fields
+#                    of an empty board, picking each one, and to add
+#                    their clues around each of them. Takes time for
+#                    each mine instead of for each field
+# Input:             board; the Board to place the mines on
+#                    mineCount; integer number of mines to place
+#                    rng; the random.Random to use
+#                    safeFields; a set of (row, col) fields that must not
+#                                hold a mine
+# Output:            None; the running counts are left to the caller
+
+def placeSparseMines(board, mineCount, rng, safeFields=frozenset()):
+    numCols    = board.numCols - 2
+    mines      = board.mines
+    clues      = board.clues
+    mineStride = board.mineStride
+    clueStride = board.clueStride
+
+    # pick among the fields that are not safe, numbered row by row, and
+    # skip over the safe fields to find where each one is
+    safeIndices = sorted((row - 1) * numCols + col - 1 for row, col in safeFields)
+    numFields   = (board.numRows - 2) * numCols - len(safeIndices)
+
+    for index in rng.sample(range(numFields), mineCount):
+        for safeIndex in safeIndices:
+            if safeIndex <= index:
+                index += 1
+        row = index // numCols + 1
+        col = index % numCols + 1
+        mines[row * mineStride + (col >> 3)] |= 1 << (col & 7)
+
+        # each neighbor's clue, 4 bits of a byte, goes up by one. The
+        # mine's own clue does not count it
+        for nextRow in range(row - 1, row + 2):
+            start = nextRow * clueStride
+            for nextCol in range(col - 1, col + 2):
+                clues[start + (nextCol >> 1)] += 1 << ((nextCol & 1) << 2)
+        clues[row * clueStride + (col >> 1)] -= 1 << ((col & 1) << 2)
+
+#####################################################################
+# placePendingMines() used when the first field of a board generated
+#                     with safeStart is revealed, to place its mines
+#                     and build its clues. Neither the field nor its
+#                     neighbors get a mine, unless there are too few
+#                     fields left, then only the field itself is kept
+#                     free of them
+# Input:              board; the Board with PendingMines
+#                     row; integer row of the field being revealed
+#                     col; integer column of the field being revealed
+# Output:             None
+
+def placePendingMines(board, row, col):
+    mineCount, rng = board.pendingMines
+    board.pendingMines = None
+
+    numRows   = board.numRows - 2
+    numCols   = board.numCols - 2
+    numFields = numRows * numCols
+
+    safeFields = {(nextRow, nextCol)
+                  for nextRow in range(max(row - 1, 1), min(row + 1, numRows) + 1)
+                  for nextCol in range(max(col - 1, 1), min(col + 1, numCols) + 1)}
+    if mineCount > numFields - len(safeFields):
+        safeFields = {(row, col)} if mineCount < numFields else set()
+
+    if numFields >= SPARSE_MINE_FIELDS * mineCount:
+        placeSparseMines(board, mineCount, rng, safeFields)
+    else:
+        placeMines(board, mineCount, rng, safeFields)
+        createClueGrid(board)
+
+    # nothing has been revealed yet, but flags placed before the mines
+    # are now right or wrong
+    board.mineCount  = mineCount
+    board.hiddenSafe = numFields - mineCount
+    if board.correctFlags or board.wrongFlags:
+        board.recount()
+
+#####################################################################
+# randomBits()       used to pick fields at random, each with the same
+#                    chance, using a few random numbers for all of them
+# Input:             rng; the random.Random to use
+#                    numBits; integer number of fields
+#                    chance; float - chance of each field being picked
+# Output:            bits; integer with the bit of each picked field set
+
+def randomBits(rng, numBits, chance):
+    # build the chance one binary digit at a time, from the last digit
+    # to the first. Or-ing in random bits for a 1 digit halves the chance
+    # of a bit being unset, and and-ing them in for a 0 digit halves the
+    # chance of it being set
+    digits = round(chance * (1 << DENSITY_BITS))
+    if digits >= 1 << DENSITY_BITS:
+        return (1 << numBits) - 1
+
+    bits = 0
+    for place in range(DENSITY_BITS):
+        if digits >> place & 1:
+            bits |= rng.getrandbits(numBits)
+        else:
+            bits &= rng.getrandbits(numBits)
+
+    return bits
+
+#####################################################################
+# writeBoard()       used to save a board in the text format read by
+#                    createBoard(), with "#" borders, "*" mines and
+#                    spaces, one row per line
+# Input:             board;    the Board to save
+#                    fileName; the name of the file to write
+# Output:            None;     the board is written to the file
+
+def writeBoard(board, fileName):
+    with open(fileName, "wb") as boardFile:
+        for row in range(board.numRows):
+            start = row * board.numCols
+            text  = board.cells[start:start + board.numCols].translate(BORDER_TEXT)
+
+            # or the mines into the spaces, all the fields at once
+            mines = board.getMineRow(row).translate(MINE_TEXT_VALUES)
+            text  = int.from_bytes(text, "big") | int.from_bytes(mines, "big")
+
+            boardFile.write(text.to_bytes(board.numCols, "big") + b"\n")
+
+#####################################################################
+# writeBinaryBoard() used to save a board in the binary format read by
+#                    readBinaryBoard(): a header giving the version, the
+#                    size and the number of mines, then the mines packed
+#                    one bit per field, row after row. Boards whose
+#                    borders are not just the ring around the edge also
+#                    keep their borders the same way, and the clue grid
+#                    can be kept too, so loading does not rebuild it
+# Input:             board;    the Board to save
+#                    fileName; the name of the file to write
+#                    compression; "none", "zlib" or "lzma"
+#                    withClues; a boolean that is True to keep the clues
+# Output:            None;     the board is written to the file
+
+def writeBinaryBoard(board, fileName, compression="none", withClues=True):
+    with open(fileName, "wb") as boardFile:
+        boardFile.write(packBinaryBoard(board, compression, withClues))
+
+#####################################################################
+# packBinaryBoard()  used to build the bytes writeBinaryBoard() writes
+# Input:             board;    the Board to save
+#                    compression; "none", "zlib" or "lzma"
+#                    withClues; a boolean that is True to keep the clues
+# Output:            the bytes of the binary board
+
+def packBinaryBoard(board, compression="none", withClues=True):
+    if compression not in BINARY_COMPRESSIONS:
+        raise ValueError("unknown compression: " + compression)
+    if compression == "lzma" and lzma is None:
+        raise ValueError("lzma compression is not available")
+
+    flags = 0
+    parts = [board.mines]
+
+    if not hasRingBorder(board):
+        flags |= BINARY_HAS_BORDERS
+        borders = bytearray()
+        for row in range(board.numRows):
+            start  = row * board.numCols
+            digits = board.cells[start:start + board.numCols].translate(BORDER_DIGITS)
+            borders += (int(digits[::-1], 2) if digits else 0).to_bytes(board.mineStride, "little")
+        parts.append(borders)
+
+    if withClues:
+        flags |= BINARY_HAS_CLUES
+        parts.append(board.clues)
+
+    payload = b"".join(parts)
+    if compression == "zlib":
+        payload = zlib.compress(payload, BINARY_ZLIB_LEVEL)
+    elif compression == "lzma":
+        payload = lzma.compress(payload)
+
+    header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_COMPRESSIONS[compression], flags,
+                                board.numRows, board.numCols, board.mineCount)
+    return header + payload
+
+#####################################################################
+# hasRingBorder()    used to check if the only borders of a board are
+#                    the ones around its edge
+# Input:             board; the Board to check
+# Output:            a boolean that is True if they are
+def hasRingBorder(board):
+    numRows = board.numRows
+    numCols = board.numCols
+    if numRows < 2 or numCols < 2:
+        return board.cells.count(BORDER_BYTE) == numRows * numCols
+
+    ringSize = 2 * numCols + 2 * (numRows - 2)
+    if board.cells.count(BORDER_BYTE) != ringSize:
+        return False
+
+    # with the right number of borders, they are all on the ring if the
+    # ring is all borders
+    borderRow = bytes([BORDER_BYTE]) * numCols
+    if board.cells[:numCols] != borderRow or board.cells[-numCols:] != borderRow:
+        return False
+    return all(board.cells[row * numCols] == BORDER_BYTE and board.cells[(row + 1) * numCols - 1] == BORDER_BYTE
+               for row in range(1, numRows - 1))
+
+#####################################################################
+# readBinaryBoard()  used to create the game board from a file written
+#                    by writeBinaryBoard()
+# Input:             fileName; the name of the file to read
+# Output:            board;    the board it got from the file
+
+def readBinaryBoard(fileName):
+    with open(fileName, "rb") as boardFile:
+        return loadBinaryBoard(boardFile, fileName)
+
+#####################################################################
+# loadBinaryBoard()  used to read a board in the binary format from an
+#                    open file, such as one holding a saved game, up
+#                    to the end of the file. Uncompressed grids are
+#                    read straight into the board
+# Input:             boardFile; the binary file to read, at the start
+#                               of the board
+#                    fileName; the name of the file, for errors
+# Output:            board;    the board it got from the file
+
+def loadBinaryBoard(boardFile, fileName):
+    header = boardFile.read(BINARY_HEADER.size)
+    if len(header) != BINARY_HEADER.size or not header.startswith(BINARY_MAGIC):
+        raise ValueError(fileName + ": not a binary board file")
+
+    magic, version, compression, flags, numRows, numCols, mineCount = BINARY_HEADER.unpack(header)
+    if version > BINARY_VERSION:
+        raise ValueError(fileName + ": binary board version " + str(version) + " is not supported")
+
+    board = Board(numRows, numCols)
+    grids = [board.mines]
+    if flags & BINARY_HAS_BORDERS:
+        grids.append(bytearray(len(board.mines)))
+    if flags & BINARY_HAS_CLUES:
+        grids.append(board.clues)
+
+    if compression == BINARY_COMPRESSIONS["none"]:
+        payload = None
+        for grid in grids:
+            if boardFile.readinto(grid) != len(grid):
+                raise ValueError(fileName + ": the file is cut short")
+    elif compression == BINARY_COMPRESSIONS["zlib"]:
+        try:
+            payload = zlib.decompress(boardFile.read())
+        except zlib.error as error:
+            raise ValueError(fileName + ": the grids can not be decompressed: " + str(error))
+    elif compression == BINARY_COMPRESSIONS["lzma"] and lzma is not None:
+        try:
+            payload = lzma.decompress(boardFile.read())
+        except lzma.LZMAError as error:
+            raise ValueError(fileName + ": the grids can not be decompressed: " + str(error))
+    else:
+        raise ValueError(fileName + ": compression " + str(compression) + " is not supported")
+
+    if payload is not None:
+        if len(payload) != sum(len(grid) for grid in grids):
+            raise ValueError(fileName + ": the grids are not the size the header gives")
+        start = 0
+        for grid in grids:
+            grid[:] = payload[start:start + len(grid)]
+            start += len(grid)
+
+    if flags & BINARY_HAS_BORDERS:
+        borders = grids[1]
+        for row in range(numRows):
+            bits   = int.from_bytes(borders[row * board.mineStride:(row + 1) * board.mineStride], "little")
+            digits = format(bits, "0" + str(board.mineStride * 8) + "b")[::-1][:numCols]
+            board.cells[row * numCols:(row + 1) * numCols] = digits.encode().translate(BORDER_FIELDS)
+    elif numRows and numCols:
+        # surround the fields with borders
+        borderRow = bytes([BORDER_BYTE]) * numCols
+        board.cells[:numCols] = borderRow
+        board.cells[-numCols:] = borderRow
+        board.cells[numCols::numCols] = bytes([BORDER_BYTE]) * (numRows - 1)
+        board.cells[numCols - 1::numCols] = bytes([BORDER_BYTE]) * numRows
+
+    # nothing is flagged, and every field without a mine or a border is
+    # hidden. Without a grid of borders, they are just the ring
+    if flags & BINARY_HAS_BORDERS:
+        numBorders = board.cells.count(BORDER_BYTE)
+    else:
+        numBorders = numRows * numCols - max(numRows - 2, 0) * max(numCols - 2, 0)
+
+    board.mineCount    = mineCount
+    board.correctFlags = 0
+    board.wrongFlags   = 0
+    board.hiddenSafe   = numRows * numCols - numBorders - mineCount
+
+    if not flags & BINARY_HAS_CLUES:
+        createClueGrid(board)
+
+    return board
+
+#####################################################################
+# loadBoard()        used to create the game board from a file in
+#                    either the text or the binary format
+# Input:             fileName; the name of the file to read
+# Output:            board;    the board it got from the file
+
+def loadBoard(fileName):
+    with open(fileName, "rb") as boardFile:
+        return loadBoardFile(boardFile, fileName)
+
+#####################################################################
+# loadBoardFile()    used to read a board in either the text or the
+#                    binary format from an open binary file that can
+#                    seek, such as an io.BytesIO of the file's bytes
+# Input:             boardFile; the binary file to read, at its start
+#                    fileName; the name of the file, for errors
+# Output:            board;    the board it got from the file
+
+def loadBoardFile(boardFile, fileName):
+    isBinary = boardFile.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    boardFile.seek(0)
+
+    return loadBinaryBoard(boardFile, fileName) if isBinary else loadTextBoard(boardFile, fileName)
+
+#####################################################################
+# checkBoardSize()   used to refuse a board file with too many fields
+#                    before reading all of it. A binary file gives its
+#                    size in its header. In a text file every row is as
+#                    wide as the first, and takes at most two bytes more
+#                    than that with its line ending, which gives the
+#                    fewest rows the file can hold
+# Input:             boardFile; the binary file to check, at its start.
+#                               It is left at its start
+#                    fileName; the name of the file, for errors
+#                    maxFields; integer number of fields, borders
+#                               included, a board can have
+# Output:            None; a ValueError is raised if the board is bigger
+
+def checkBoardSize(boardFile, fileName, maxFields):
+    header = boardFile.read(BINARY_HEADER.size)
+    if len(header) == BINARY_HEADER.size and header.startswith(BINARY_MAGIC):
+        numRows, numCols = BINARY_HEADER.unpack(header)[4:6]
+    else:
+        boardFile.seek(0)
+        numCols = len(boardFile.readline(maxFields + 1).rstrip(b"\r\n"))
+        numRows = -(-os.fstat(boardFile.fileno()).st_size // (numCols + 2))
+    boardFile.seek(0)
+
+    if numRows * numCols > maxFields:
+        raise ValueError(fileName + ": boards can have at most " + str(maxFields) + " fields")
+
+#####################################################################
+# BoardCache         keeps the boards loaded from files, keyed by a hash
+#                    of the file's contents, so many games on the same
+#                    board load it once. Each game gets a Board from
+#                    Board.share(): the mines and clues are kept once,
+#                    and only the view is copied. The boards used least
+#                    recently are dropped once their grids take more
+#                    than maxBytes
+#
+#                    The hash of each file is kept along with its size
+#                    and the time it was last changed, so a file that
+#                    has not changed is not read again while its board
+#                    is kept. A file is read once to be both hashed and
+#                    loaded, and a board that is refused is never kept.
+#                    Boards can be loaded from many threads at once
+class BoardCache:
+    __slots__ = ("maxBytes", "numBytes", "boards", "digests", "lock")
+
+    #################################################################
+    # __init__()     creates an empty cache
+    # Input:         maxBytes; integer number of bytes of grids kept
+    def __init__(self, maxBytes=BOARD_CACHE_BYTES):
+        self.maxBytes = maxBytes
+        self.numBytes = 0
+        self.boards   = OrderedDict()
+        self.digests  = {}
+        self.lock     = threading.Lock()
+
+    #################################################################
+    # find()         used to look a board up by its key, marking it as
+    #                the one used most recently
+    # Input:         key; the hash of the file's contents, or None
+    # Output:        board; the Board kept for it, or None
+    def find(self, key):
+        with self.lock:
+            board = self.boards.get(key)
+            if board is not None:
+                self.boards.move_to_end(key)
+            return board
+
+    #################################################################
+    # load()         used to get a new game board from a file, loading
+    #                the file only if its contents are not in the cache
+    # Input:         fileName; the name of the file to read
+    #                maxFields; integer number of fields, borders
+    #                           included, a board can have, or None for
+    #                           any number
+    # Output:        board; a Board of its own for one game
+    def load(self, fileName, maxFields=None):
+        with open(fileName, "rb") as boardFile:
+            status  = os.fstat(boardFile.fileno())
+            version = (status.st_size, status.st_mtime_ns)
+            known   = self.digests.get(fileName)
+            board   = self.find(known[1]) if known is not None and known[0] == version else None
+
+            if board is None:
+                if maxFields is not None:
+                    checkBoardSize(boardFile, fileName, maxFields)
+                data = boardFile.read()
+                key  = hashlib.sha256(data).digest()
+                self.digests[fileName] = (version, key)
+                board = self.find(key)
+
+        if board is None:
+            # the board kept in the cache is never played on, so every
+            # game starts from its view
+            board = loadBoardFile(io.BytesIO(data), fileName)
+            if maxFields is not None and board.numRows * board.numCols > maxFields:
+                raise ValueError(fileName + ": boards can have at most " + str(maxFields) + " fields")
+
+            with self.lock:
+                if key not in self.boards:
+                    self.boards[key] = board
+                    self.numBytes += len(board.mines) + len(board.cells) + len(board.clues)
+
+                while len(self.boards) > 1 and self.numBytes > self.maxBytes:
+                    key, dropped = self.boards.popitem(last=False)
+                    self.numBytes -= len(dropped.mines) + len(dropped.cells) + len(dropped.clues)
+
+        elif maxFields is not None and board.numRows * board.numCols > maxFields:
+            raise ValueError(fileName + ": boards can have at most " + str(maxFields) + " fields")
+
+        return board.share()
+
+#####################################################################
+# writeSnapshot()    used to save a game in progress to a file, in one
+#                    go. The file holds a header with the number of
+#                    moves played, the mines left to find and whether a
+#                    mine was detonated, then the revealed and flagged
+#                    fields as two bitsets, compressed, then the board
+#                    in the binary format. What the player sees at a
+#                    revealed field is found again from the clues. The
+#                    file is written next to the old one and then put
+#                    in its place, so a crash can not leave half of it
+# Input:             game;      the Game to save
+#                    moveCount; integer number of moves played so far
+#                    fileName;  the name of the file to write
+# Output:            None;      the game is written to the file
+
+def writeSnapshot(game, moveCount, fileName):
+    board = game.board
+    if board.pendingMines is not None:
+        raise ValueError("a game can not be saved before its mines are placed")
+
+    revealed = bytearray()
+    flagged  = bytearray()
+    for row in range(board.numRows):
+        start = row * board.numCols
+        cells = board.cells[start:start + board.numCols]
+        for bits, digits in ((revealed, cells.translate(REVEALED_DIGITS)),
+                             (flagged, cells.translate(FLAGGED_DIGITS))):
+            bits += (int(digits[::-1], 2) if digits else 0).to_bytes(board.mineStride, "little")
+
+    state  = zlib.compress(bytes(revealed + flagged), BINARY_ZLIB_LEVEL)
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, game.isDetonated,
+                                  moveCount, game.minesLeft, len(state))
+
+    with open(fileName + ".tmp", "wb") as snapshotFile:
+        snapshotFile.write(header)
+        snapshotFile.write(state)
+        snapshotFile.write(packBinaryBoard(board))
+        snapshotFile.flush()
+        os.fsync(snapshotFile.fileno())
+    os.replace(fileName + ".tmp", fileName)
+
+#####################################################################
+# readSnapshot()     used to load a game saved by writeSnapshot()
+# Input:             fileName; the name of the file to read
+# Output:            game;      the Game as it was saved
+#                    moveCount; integer number of moves played before
+#                               it was saved
+
+def readSnapshot(fileName):
+    with open(fileName, "rb") as snapshotFile:
+        header = snapshotFile.read(SNAPSHOT_HEADER.size)
+        if len(header) != SNAPSHOT_HEADER.size or not header.startswith(SNAPSHOT_MAGIC):
+            raise ValueError(fileName + ": not a saved game")
+
+        magic, version, isDetonated, moveCount, minesLeft, stateSize = SNAPSHOT_HEADER.unpack(header)
+        if version > SNAPSHOT_VERSION:
+            raise ValueError(fileName + ": saved game version " + str(version) + " is not supported")
+
+        state = zlib.decompress(snapshotFile.read(stateSize))
+        board = loadBinaryBoard(snapshotFile, fileName)
+
+    numCols    = board.numCols
+    mineStride = board.mineStride
+    gridSize   = board.numRows * mineStride
+    if len(state) != 2 * gridSize:
+        raise ValueError(fileName + ": the saved fields are not the size of the board")
+
+    flagRow = int.from_bytes(bytes([FLAG_BYTE]) * numCols, "little")
+    for row in range(board.numRows):
+        start    = row * mineStride
+        revealed = int.from_bytes(state[start:start + mineStride], "little")
+        flagged  = int.from_bytes(state[gridSize + start:gridSize + start + mineStride], "little")
+        if not revealed and not flagged:
+            continue
+
+        # turn each bitset into a mask of one byte per field, and put the
+        # clue of each revealed field and a flag on each flagged field
+        # into the row all at once
+        masks = []
+        for bits in (revealed, flagged):
+            digits = format(bits, "0" + str(mineStride * 8) + "b")[::-1][:numCols]
+            masks.append(int.from_bytes(digits.encode().translate(DIGIT_MASKS), "little"))
+        revealedMask, flaggedMask = masks
+
+        first = row * numCols
+        shown = int.from_bytes(board.getClueRow(row).translate(SHOWN_CLUES), "little")
+        cells = int.from_bytes(board.cells[first:first + numCols], "little")
+        cells = cells & ~(revealedMask | flaggedMask) | shown & revealedMask | flagRow & flaggedMask
+        board.cells[first:first + numCols] = cells.to_bytes(numCols, "little")
+
+        # a revealed mine was detonated
+        detonated = revealed & board.getMineBits(row)
+        while detonated:
+            col = detonated.bit_length() - 1
+            board.cells[first + col] = ord(DETONATED_MINE)
+            detonated ^= 1 << col
+
+    board.recount()
+
+    game = Game(board)
+    game.minesLeft   = minesLeft
+    game.isDetonated = bool(isDetonated)
+    return game, moveCount
+
+#####################################################################
+# GameJournal        saves a game after every move by adding the move
+#                    to the end of a journal file, which takes the same
+#                    time however big the board is. Every snapshotEvery
+#                    moves, the whole game is saved with writeSnapshot()
+#                    instead and the journal is started again
+#
+#                    The journal starts with the number of moves in the
+#                    snapshot it follows. If a crash comes after a new
+#                    snapshot is written but before the journal is
+#                    started again, the journal no longer matches the
+#                    snapshot and is not used
+class GameJournal:
+    __slots__ = ("game", "fileName", "moveCount", "snapshotEvery", "journalFile", "journalMoves")
+
+    #################################################################
+    # __init__()     saves a snapshot of a game and starts its journal
+    # Input:         game; the Game to save
+    #                fileName; the name of the snapshot file. The
+    #                          journal is kept next to it
+    #                moveCount; integer number of moves played so far
+    #                snapshotEvery; integer number of moves between
+    #                               snapshots
+    def __init__(self, game, fileName, moveCount=0, snapshotEvery=SNAPSHOT_EVERY):
+        self.game          = game
+        self.fileName      = fileName
+        self.moveCount     = moveCount
+        self.snapshotEvery = snapshotEvery
+        self.journalFile   = None
+        self.snapshot()
+
+    #################################################################
+    # snapshot()     used to save the whole game and start the journal
+    #                again
+    # Input:         None
+    # Output:        None
+    def snapshot(self):
+        writeSnapshot(self.game, self.moveCount, self.fileName)
+
+        if self.journalFile is not None:
+            self.journalFile.close()
+        self.journalFile  = open(self.fileName + JOURNAL_SUFFIX, "wb")
+        self.journalFile.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, self.moveCount))
+        self.journalFile.flush()
+        self.journalMoves = 0
+
+    #################################################################
+    # record()       used to save a move once it has been played
+    # Input:         row; integer row of the move
+    #                col; integer column of the move
+    #                choice; "r" or "f"
+    # Output:        None
+    def record(self, row, col, choice):
+        self.moveCount += 1
+        if self.journalMoves + 1 >= self.snapshotEvery:
+            self.snapshot()
+            return
+
+        self.journalFile.write(JOURNAL_MOVE.pack(row, col, ord(choice)))
+        self.journalFile.flush()
+        self.journalMoves += 1
+
+    #################################################################
+    # close()        used to close the journal file
+    # Input:         None
+    # Output:        None
+    def close(self):
+        self.journalFile.close()
+
+#####################################################################
+# resumeGame()       used to load a game saved by a GameJournal: its
+#                    last snapshot, with the moves in its journal
+#                    played again. A move cut short by a crash at the
+#                    end of the journal is left out
+# Input:             fileName; the name of the snapshot file
+# Output:            game;      the Game as it was last saved
+#                    moveCount; integer number of moves played
+
+def resumeGame(fileName):
+    game, moveCount = readSnapshot(fileName)
+
+    try:
+        with open(fileName + JOURNAL_SUFFIX, "rb") as journalFile:
+            journal = journalFile.read()
+    except FileNotFoundError:
+        return game, moveCount
+
+    if len(journal) < JOURNAL_HEADER.size:
+        return game, moveCount
+    magic, snapshotMoves = JOURNAL_HEADER.unpack_from(journal)
+    if magic != JOURNAL_MAGIC or snapshotMoves != moveCount:
+        return game, moveCount
+
+    numMoves = (len(journal) - JOURNAL_HEADER.size) // JOURNAL_MOVE.size
+    for row, col, choice in JOURNAL_MOVE.iter_unpack(journal[JOURNAL_HEADER.size:JOURNAL_HEADER.size + numMoves * JOURNAL_MOVE.size]):
+        if chr(choice) == "f":
+            game.flag(row, col)
+        else:
+            game.reveal(row, col)
+        moveCount += 1
+
+    return game, moveCount
+
 ########################################################################
 # validateRow()      used to validate row input from the user
 # Input:             rowInput; integer entered by the user
-#                    board; 2-D board of chars that represents the game
+#                    board; the Board that holds the game
 # Output:            isValid; a boolean stating if the input is valid
 def validateRow(rowInput, board):
-    if rowInput < 1 or rowInput > len(board) - END_OF_LINE:
+    if rowInput < 1 or rowInput > board.numRows - END_OF_LINE:
         isValid = False
     else:
         isValid = True
@@ -117,11 +2200,11 @@ def validateRow(rowInput, board):
 ########################################################################
 # validateColumn()   used to validate column input from the user
 # Input:             columnInput; integer entered by the user
-#                    board; 2-D board of chars that represents the game
+#                    board; the Board that holds the game
 # Output:            isValid; a boolean stating if the input is valid
 
 def validateColumn(columnInput, board):
-    if columnInput < 1 or columnInput > len(board) - END_OF_LINE:
+    if columnInput < 1 or columnInput > board.numCols - END_OF_LINE:
         isValid = False
     else:
         isValid = True
@@ -131,113 +2214,111 @@ def validateColumn(columnInput, board):
 
 ########################################################################
 # processInput()     processes the input entered by the user with the
-#                    game board
+#                    game, and prints the board and what happened
 # Input:             row; integer entered by the user for row input
 #                    col; integer entered by the user for column
 #                                 input
 #                    choice; a char representing a validated choice
 #                                 entered by the user
-#                    numOfMines; an integer stating number of mines left
-#                    board; 2-D board of chars that represents the game
-#                    prettyBoard; a 2-D board of chars that is shown to
-#                                 the player after each play
-# Output:            numOfMines; an integer stating number of mines left
-def processInput(row, col, choice, numOfMines, board, prettyBoard):
+#                    game; the Game being played
+#                    render; the function used to print the board
+# Output:            result; the MoveResult of the move
+def processInput(row, col, choice, game, render=prettyPrintBoard):
     # If player chooses to place a flag
     if choice == "f":
-        # If position already flagged, unflag it
-        if prettyBoard[row][col] == FLAG:
-            prettyBoard[row][col] = UNKNOWN
-            numOfMines += 1
-            prettyPrintBoard(prettyBoard)
+        result = game.flag(row, col)
+
+        # If position already flagged, it was unflagged
+        if result.outcome == FLAG_REMOVED:
+            render(game.board)
 
             # check if the game is complete after removing a flag
-            isComplete  = checkGameComplete(board, prettyBoard, numOfMines)
-            if numOfMines == 0 and isComplete == True:
+            if game.state().status == WON:
                 print()
             else:
                 print("\t Flag removed from " + str(row) + ", " + str(col))
-                print("\t There are", numOfMines, "mines left to find")
+                printMinesLeft(result.minesLeft)
                 print()
 
         # If position is a revealed empty space, do nothing
-        elif prettyBoard[row][col] == SPACE:
-            prettyPrintBoard(prettyBoard)
+        elif result.outcome == ALREADY_REVEALED:
+            render(game.board)
             print("\t Already been revealed")
             print()
 
-        # If position is unknown, place a flag
-        elif prettyBoard[row][col] == UNKNOWN:
-            prettyBoard[row][col] = FLAG
-            numOfMines -= 1
-            prettyPrintBoard(prettyBoard)
-            print("\t There are", numOfMines, "mines left to find")
+        # If position was unknown, a flag was placed
+        elif result.outcome == FLAG_PLACED:
+            render(game.board)
+            printMinesLeft(result.minesLeft)
             print()
 
     # If the user chooses to reveal 
     else:
+        result = game.reveal(row, col)
+
         # if position has been revealed already, let user know
-        if prettyBoard[row][col] == SPACE or prettyBoard[row][col] in CLUES:
-            prettyPrintBoard(prettyBoard)
+        if result.outcome == ALREADY_REVEALED:
+            render(game.board)
             print("\t Has been revealed already")
-            print("\t There are", numOfMines, "mines left to find")
+            printMinesLeft(result.minesLeft)
             print()
 
         # if position has been flagged
-        elif prettyBoard[row][col] == FLAG:
-            prettyPrintBoard(prettyBoard)
+        elif result.outcome == MUST_UNFLAG:
+            render(game.board)
             print("\t Field " + str(row) + ", " + str(col) + " must be unflagged before it can be revealed")
-            print("\t There are", numOfMines, "mines left to find")
+            printMinesLeft(result.minesLeft)
             print()
             
         # if position has a mine, let user know and print game over message
-        elif board[row][col] == MINE:
-            prettyBoard[row][col] = DETONATED_MINE
-            prettyPrintBoard(prettyBoard)
+        elif result.outcome == DETONATED:
+            render(game.board)
             print(LOSE_MSG)
             print()
 
-        # if there is nothing at that poition, then reveal the empty fields(islands)
-        elif board[row][col] != MINE and prettyBoard[row][col] == UNKNOWN:
-            revealIsland(board, prettyBoard, row, col)
-            prettyPrintBoard(prettyBoard)
-            print("\t There are", numOfMines, "mines left to find")
+        # if there was nothing at that poition, the empty fields(islands)
+        # were revealed
+        elif result.outcome == REVEALED:
+            render(game.board)
+            printMinesLeft(result.minesLeft)
             print()
         
-    return numOfMines
+    return result
+
+##########################################################################
+# printMinesLeft()     prints how many mines are left to find
+# Input:               minesLeft; an integer, or None if the mines are
+#                      still being counted
+# Output:              None
+def printMinesLeft(minesLeft):
+    if minesLeft is None:
+        print("\t The mines are still being counted")
+    else:
+        print("\t There are", minesLeft, "mines left to find")
 
 ##########################################################################
 # checkGameComplete()  Checks if the user has won the game
-# Input:               board; 2-D board of chars that represents the game
-#                      prettyBoard; a 2-D board of chars that is shown to
-#                                   the player after each play
+# Input:               board; the Board that holds the game
 #                      numMines; an integer holding number of mines left
 # Output:              isComplete; a boolean showing if the game is won
-def checkGameComplete(board, prettyBoard, numMines):
+def checkGameComplete(board, numMines):
     isComplete = True
 
     # if there are any mines left, then  the game is not over
     if numMines != 0:
         isComplete = False
-        
-    for i in range(len(board)):
-        for j in range(len(board)):
-
-            # if the two boards mine and flag location do not match
-            # then the game is not over
-            if prettyBoard[i][j] == FLAG:
-                if board[i][j] != MINE:
-                    isComplete = False
-            elif board[i][j] == MINE:
-                if prettyBoard[i][j] != FLAG:
-                    isComplete = False
+
+    # if the mine and flag locations do not match then the game is not
+    # over. The board keeps count of both as flags are placed and removed
+    if board.wrongFlags != 0 or board.correctFlags != board.mineCount:
+        isComplete = False
 
     return isComplete
                    
 
 #############################################################################
 # checkMineDetonated()  Checks if the user has detonated a mine
-# Input:                board; 2-D board of chars that represents the game
+# Input:                board; the Board that holds the game
 #                       rowInput; integer entered by the user for row input
 #                       columnInput; integer entered by the user for column
 #                                    input
@@ -245,55 +2326,17 @@ def checkGameComplete(board, prettyBoard, numMines):
 #                                    detonated
 def checkMineDetonated(board, rowInput, columnInput):
     isDetonated = False
-    if board[rowInput][columnInput] == DETONATED_MINE:
+    if board.getCell(rowInput, columnInput) == DETONATED_MINE:
         isDetonated = True
 
     return isDetonated
 
-##############################################################################
-# createPrettyBoard()   used to create the gameboard shown to the player
-# Input:                fileName; a string variable - the name of the file
-#                                 to read the board from.
-# Output:               prettyBoard; a 2-D board of chars that is shown to
-#                                    the player after each play
-
-def createPrettyBoard(fileName):
-
-    row = []
-    prettyBoard = []
-    i = 0
-    j = 0
-
-    # open the file to read
-    gameFile = open(fileName)
-    fileContent = gameFile.read()
-
-    # close the file
-    gameFile.close()
-
-    # create 2-d list using contents of the file
-    while i < len(fileContent):
-        row.append(fileContent[i:i+1])
-        if fileContent[i+1:i+2] == "\n":
-            prettyBoard.append(row[j:i+1])
-            j = i + 2
-        i += 1
-
-    # fill the empty spaces in the board with dots
-    for i in range(len(prettyBoard)):
-        for j in range(len(prettyBoard)):
-            if prettyBoard[i][j] != BORDER:
-                prettyBoard[i][j] = UNKNOWN
-                
-
-    return prettyBoard
-
 ##############################################################################
 # numOfMinesAround()    used to find how many mines in contact with each
 #                       location
 # Input:                row; integer entered by the user for row input
 #                       col; integer entered by the user for column
-#                       board; 2-D board of chars that represents the game
+#                       board; the Board that holds the game
 #                    
 # Output                numOfMines; an integer representing the number of
 #                                   mines around a location
@@ -301,443 +2344,949 @@ def numOfMinesAround(row, col, board):
     numOfMines = 0
 
     # check if there are mines at each location around the position entered
-    if board[row - 1][col] == MINE:
+    if board.isMine(row - 1, col):
         numOfMines += 1
 
-    if board[row + 1][col] == MINE:
+    if board.isMine(row + 1, col):
         numOfMines += 1
 
-    if board[row][col - 1] == MINE:
+    if board.isMine(row, col - 1):
         numOfMines += 1
 
-    if board[row][col + 1] == MINE:
+    if board.isMine(row, col + 1):
         numOfMines += 1
 
-    if board[row - 1][col - 1] == MINE:
+    if board.isMine(row - 1, col - 1):
         numOfMines += 1
 
-    if board[row + 1][col - 1] == MINE:
+    if board.isMine(row + 1, col - 1):
         numOfMines += 1
 
-    if board[row - 1][col + 1] == MINE:
+    if board.isMine(row - 1, col + 1):
         numOfMines += 1
 
-    if board[row + 1][col + 1] == MINE:
+    if board.isMine(row + 1, col + 1):
         numOfMines += 1
 
     return numOfMines
 
+##############################################################################
+# createClueGrid()      used to find how many mines are in contact with
+#                       every location at once, instead of calling
+#                       numOfMinesAround() each time a location is revealed
+# Input:                board; the Board that holds the game
+# Output                None; the clue of every location is stored in the
+#                             board
+def createClueGrid(board):
+    if numpy is not None:
+        createClueGridNumpy(board)
+        return
+
+    fieldMask = (1 << board.numCols) - 1
+
+    # slide a window of three rows down the board, keeping the mines of
+    # each row as the bits of an integer
+    above   = 0
+    current = board.getMineBits(0) if board.numRows > 0 else 0
+    for row in range(board.numRows):
+        below = board.getMineBits(row + 1) if row + 1 < board.numRows else 0
+
+        # add up the eight neighbors of every location of the row at once.
+        # Bit col of planes[k] is binary digit k of the count at col, and
+        # each neighbor is added in like a carry rippling through them
+        planes = [0, 0, 0, 0]
+        for neighbors in (above << 1, above, above >> 1, current << 1,
+                          current >> 1, below << 1, below, below >> 1):
+            carry = neighbors & fieldMask
+            for digit in range(4):
+                if carry == 0:
+                    break
+                planes[digit], carry = planes[digit] ^ carry, planes[digit] & carry
+
+        # move bit col of each plane to bit 4 * col + k, giving 4 bits per
+        # location
+        clueBits = 0
+        for digit in range(4):
+            if planes[digit]:
+                clueBits |= spreadBits(planes[digit], board.mineStride) << digit
+        board.setClueBits(row, clueBits)
+
+        above   = current
+        current = below
+
+##############################################################################
+# spreadBits()          used to move bit i of an integer to bit 4 * i
+# Input:                bits; the integer to spread out
+#                       numBytes; integer - number of bytes bits fits in
+# Output                spread; the spread out integer
+def spreadBits(bits, numBytes):
+    spread = b"".join(map(SPREAD_BYTES.__getitem__, bits.to_bytes(numBytes, "little")))
+    return int.from_bytes(spread, "little")
+
+##############################################################################
+# createClueGridNumpy()   same as createClueGrid(), using NumPy to add up
+#                         the eight shifted copies of the mine grid. The
+#                         board is done in bands of rows, so only one band
+#                         is unpacked in memory at a time
+# Input:                  board; the Board that holds the game
+# Output                  None; the clue of every location is stored in
+#                               the board
+def createClueGridNumpy(board):
+    numRows = board.numRows
+    numCols = board.numCols
+
+    mineBits = numpy.frombuffer(board.mines, dtype=numpy.uint8).reshape(numRows, board.mineStride)
+    clues    = numpy.frombuffer(board.clues, dtype=numpy.uint8).reshape(numRows, board.clueStride)
+
+    for top in range(0, numRows, CLUE_BAND_ROWS):
+        bottom = min(top + CLUE_BAND_ROWS, numRows)
+
+        # unpack the band plus one row above and below it, inside a ring
+        # of empty locations so every shift fits
+        first = max(top - 1, 0)
+        last  = min(bottom + 1, numRows)
+        mines = numpy.unpackbits(mineBits[first:last], axis=1, bitorder="little")[:, :numCols]
+
+        padded = numpy.zeros((bottom - top + 2, numCols + 2), dtype=numpy.uint8)
+        padded[first - top + 1:last - top + 1, 1:-1] = mines
+
+        bandClues = numpy.zeros((bottom - top, numCols + numCols % 2), dtype=numpy.uint8)
+        for rowShift in range(3):
+            for colShift in range(3):
+                if rowShift != 1 or colShift != 1:
+                    bandClues[:, :numCols] += padded[rowShift:rowShift + bottom - top, colShift:colShift + numCols]
+
+        # pack two clues in each byte, the first one in the low half
+        clues[top:bottom] = bandClues[:, 0::2] | bandClues[:, 1::2] << 4
+
 
 ##############################################################################
 # numOfMines()    used to find how many mines in the game
-# Input:          board; 2-D board of chars that represents the game
+# Input:          board; the Board that holds the game
 # Output          numOfMines; an integer representing the number of mines
 #
 def numOfMines(board):
-    count = 0
-    for i in range(len(board)):
-        for j in range(len(board)):
-            if board[i][j] == MINE:
-                count += 1
-    return count
+    return board.mineCount
         
 
 #######################################################################
-# revealIsland()    checks if there are islands and calls recursive
-#                   functions when needed
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
+# revealIsland()    reveals a position and, if it has no mines around
+#                   it, flood fills the empty field (island) it belongs
+#                   to along with the clues bordering it. Uses a queue
+#                   instead of recursion so large islands can not run
+#                   out of stack, and each position is visited once.
+# Input:            board; the Board that holds the game
 #                   row; integer entered by the user for row input
 #                   col; integer entered by the user for column
 #                        input
-# Output:           none; used to call recursive functions when required
-def revealIsland(board, prettyBoard, row, col):
+# Output:           numEmpty; integer number of empty positions whose
+#                             neighbors were looked at. The board is
+#                             updated in place
+def revealIsland(board, row, col):
     # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
-    else:
-        if board[row][col] == SPACE:
-
-            # if position is empty, check number of mines around the position
-            # and assign the position a value
-            clue = numOfMinesAround(row, col, board)
-            if clue == 0:
-                prettyBoard[row][col] = SPACE
-            else:
-                prettyBoard[row][col] = str(clue)
-
-            # if position is a space after the check above, call recursive
-            # functions to reveal the empty fields (islands)
-            if prettyBoard[row][col] == SPACE:    
-                revealUp(board, prettyBoard, row, col)
-                revealDown(board, prettyBoard, row, col)
-                revealLeft(board, prettyBoard, row, col)
-                revealRight(board, prettyBoard, row, col)
-                revealUpperRight(board, prettyBoard, row, col)
-                revealLowerRight(board, prettyBoard, row, col)
-                revealUpperLeft(board, prettyBoard, row, col)
-                revealLowerLeft(board, prettyBoard, row, col)
-            
+    if board.isMine(row, col) or board.getCell(row, col) != UNKNOWN:
+        return 0
 
-#######################################################################
-# revealLeft()      recursive function used to reveal all empty spaces
-#                   to the left of a position.
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
-#                   row; integer entered by the user for row input
-#                   col; integer entered by the user for column
-#                        input
-# Output:           none; recursive call until base staement is reached
-def revealLeft(board, prettyBoard, row, col):
-    
-    # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
+    # positions waiting to have their neighbors revealed
+    toVisit = deque()
 
-    # if position to the left is a mine, border, flag or space.
-    # Do nothing
-    elif board[row][col - 1] == MINE or board[row][col - 1] == BORDER or prettyBoard[row][col - 1] == FLAG or prettyBoard[row][col - 1] == SPACE:
-        return
+    # reveal the position entered by the user
+    clue = board.getClue(row, col)
+    if clue == 0:
+        board.setCell(row, col, SPACE)
+        toVisit.append((row, col))
     else:
+        board.setCell(row, col, CLUES[clue - 1])
 
-        # find number of mines around position to the left and assign
-        # value to position
-        clue = numOfMinesAround(row, col - 1, board)
-        if clue == 0:
-            prettyBoard[row][col - 1] = SPACE
-        else:
-            prettyBoard[row][col - 1] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row][col - 1] == SPACE:
-            revealUp(board, prettyBoard, row, col - 1)
-            revealDown(board, prettyBoard, row, col - 1)
-            revealLeft(board, prettyBoard, row, col - 1)
-            revealRight(board, prettyBoard, row, col - 1)
-            revealUpperRight(board, prettyBoard, row, col - 1)
-            revealLowerRight(board, prettyBoard, row, col - 1)
-            revealUpperLeft(board, prettyBoard, row, col - 1)
-            revealLowerLeft(board, prettyBoard, row, col - 1)
-        else:
-            return
+    numEmpty = 0
+    while toVisit:
+        row, col = toVisit.popleft()
+        numEmpty += 1
 
-#######################################################################
-# revealRight()     recursive function used to reveal all empty spaces
-#                   to the right of a position.
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
-#                   row; integer entered by the user for row input
-#                   col; integer entered by the user for column
-#                        input
-# Output:           none; recursive call until base staement is reached
-def revealRight(board, prettyBoard, row, col):
+        # reveal every hidden position around an empty position. Mines,
+        # borders, flags and positions already revealed are left alone
+        for nextRow in range(row - 1, row + 2):
+            for nextCol in range(col - 1, col + 2):
+                if board.getCell(nextRow, nextCol) != UNKNOWN or board.isMine(nextRow, nextCol):
+                    continue
 
-    # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
+                clue = board.getClue(nextRow, nextCol)
+                if clue == 0:
+                    board.setCell(nextRow, nextCol, SPACE)
+                    toVisit.append((nextRow, nextCol))
+                else:
+                    board.setCell(nextRow, nextCol, CLUES[clue - 1])
 
-    # if position to the right is a mine, border, flag or space.
-    # Do nothing
-    elif board[row][col + 1] == MINE or board[row][col + 1] == BORDER or prettyBoard[row][col + 1] == FLAG or prettyBoard[row][col + 1] == SPACE:
-        return
-    else:
-
-        # find number of mines around position to the right and assign
-        # value to position
-        clue = numOfMinesAround(row, col + 1, board)
-        if clue == 0:
-             prettyBoard[row][col + 1] = SPACE
-        else:
-            prettyBoard[row][col + 1] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row][col + 1] == SPACE:
-            revealUp(board, prettyBoard, row, col + 1)
-            revealDown(board, prettyBoard, row, col + 1)
-            revealLeft(board, prettyBoard, row, col + 1)
-            revealRight(board, prettyBoard, row, col + 1)
-            revealUpperRight(board, prettyBoard, row, col + 1)
-            revealLowerRight(board, prettyBoard, row, col + 1)
-            revealUpperLeft(board, prettyBoard, row, col + 1)
-            revealLowerLeft(board, prettyBoard, row, col + 1)
-        else:
-            return
+    return numEmpty
 
 #######################################################################
-# revealUp()        recursive function used to reveal all empty spaces
-#                   to the top of a position.
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
-#                   row; integer entered by the user for row input
-#                   col; integer entered by the user for column
-#                        input
-# Output:           none; recursive call until base staement is reached
-def revealUp(board, prettyBoard, row, col):
-
-    # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
-
-    # if position to the top is a mine, border, flag or space.
-    # Do nothing
-    elif board[row - 1][col] == MINE or board[row - 1][col] == BORDER or prettyBoard[row - 1][col] == FLAG or prettyBoard[row - 1][col] == SPACE:
-        return
-    else:
-
-        # find number of mines around position to the top and assign
-        # value to position
-        clue = numOfMinesAround(row - 1, col, board)
-        if clue == 0:
-            prettyBoard[row - 1][col] = SPACE
-        else:
-            prettyBoard[row - 1][col] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row - 1][col] == SPACE:
-            revealUp(board, prettyBoard, row - 1, col)
-            revealDown(board, prettyBoard, row - 1, col)
-            revealLeft(board, prettyBoard, row - 1, col)
-            revealRight(board, prettyBoard, row - 1, col)
-            revealUpperRight(board, prettyBoard, row - 1, col)
-            revealLowerRight(board, prettyBoard, row - 1, col)
-            revealUpperLeft(board, prettyBoard, row - 1, col)
-            revealLowerLeft(board, prettyBoard, row - 1, col)
-        else:
-            return
+# RegionIndex       labels every island of empty fields (fields with no
+#                   mines around them) once, when a board is loaded, so
+#                   revealing an island copies its fields from a list
+#                   instead of flood filling it again. Each island keeps
+#                   its empty fields followed by the clues bordering it,
+#                   and the char each one shows once revealed
+#
+#                   The islands are found with a union-find over the
+#                   empty fields, joining each one to the empty fields
+#                   before it. The index also gives the number and size
+#                   of the islands, and the board's 3BV: the fewest
+#                   reveals that clear the board, one for each island
+#                   and one for each clue that borders none
+class RegionIndex:
+    __slots__ = ("numCols", "labels", "cells", "values", "numEmpty", "numLoneClues")
+
+    ###################################################################
+    # __init__()    builds the index of a board
+    # Input:        board; the Board to index, with its clue grid built
+    def __init__(self, board):
+        numRows = board.numRows
+        numCols = board.numCols
+        self.numCols = numCols
+
+        # the islands are built from runs of empty fields along a row.
+        # Each run is joined to the runs of the row above that touch it,
+        # diagonals included
+        runs   = []
+        parent = []
+
+        def findRoot(run):
+            while parent[run] != run:
+                parent[run] = parent[parent[run]]
+                run = parent[run]
+            return run
+
+        # 1 for each field that is a clue, used to find the clues around
+        # each island below, and the clue of every field
+        clueFields = bytearray(numRows * numCols)
+        clueValues = bytearray(numRows * numCols)
+
+        above = []
+        for row in range(1, numRows - 1):
+            emptyRow, clueRow, clues = self.rowFields(board, row)
+            clueFields[row * numCols:(row + 1) * numCols] = clueRow
+            clueValues[row * numCols:(row + 1) * numCols] = clues
+
+            current = []
+            first   = 0
+            start   = emptyRow.find(1)
+            while start != -1:
+                end = emptyRow.find(0, start)
+                if end == -1:
+                    end = numCols
+
+                run = len(runs)
+                runs.append((row, start, end))
+                parent.append(run)
+                current.append((start, end, run))
+
+                # the runs above are in order, so skip the ones that end
+                # before this one starts
+                while first < len(above) and above[first][1] < start:
+                    first += 1
+                other = first
+                while other < len(above) and above[other][0] <= end:
+                    parent[findRoot(above[other][2])] = findRoot(run)
+                    other += 1
+
+                start = emptyRow.find(1, end)
+            above = current
+
+        # number the islands, and list the empty fields of each
+        self.labels = array("i", [-1]) * (numRows * numCols)
+        self.cells  = []
+        islandRuns  = []
+        roots = {}
+        for run, (row, start, end) in enumerate(runs):
+            label = roots.setdefault(findRoot(run), len(roots))
+            if label == len(self.cells):
+                self.cells.append(array("i"))
+                islandRuns.append([])
+            first = row * numCols
+            self.labels[first + start:first + end] = array("i", [label]) * (end - start)
+            self.cells[label].extend(range(first + start, first + end))
+            islandRuns[label].append((row, start, end))
+        self.numEmpty = [len(cells) for cells in self.cells]
+
+        # add the clues around each island. A clue can border more than
+        # one island, so the last island it was added to is kept
+        lastLabel = array("i", [-1]) * (numRows * numCols)
+        numBordering = 0
+        for label, cells in enumerate(self.cells):
+            for row, start, end in islandRuns[label]:
+                for nextRow in range(row - 1, row + 2):
+                    first = nextRow * numCols
+                    col   = clueFields.find(1, first + start - 1, first + end + 1)
+                    while col != -1:
+                        if lastLabel[col] != label:
+                            if lastLabel[col] < 0:
+                                numBordering += 1
+                            lastLabel[col] = label
+                            cells.append(col)
+                        col = clueFields.find(1, col + 1, first + end + 1)
+
+        self.values = []
+        for label, cells in enumerate(self.cells):
+            clues = bytes(map(clueValues.__getitem__, cells[self.numEmpty[label]:]))
+            self.values.append(bytes([SPACE_BYTE]) * self.numEmpty[label] + clues.translate(CLUE_TEXT))
+
+        # every clue bordering no island needs a reveal of its own
+        self.numLoneClues = clueFields.count(1) - numBordering
+
+    ###################################################################
+    # rowFields()   used to find the empty fields and the clues of a row
+    # Input:        board; the Board being indexed
+    #               row; integer row of the board
+    # Output:       emptyRow; bytes with a 1 for each field with no mine
+    #                         on or around it, and a 0 for the others
+    #               clueRow; bytes with a 1 for each field with no mine
+    #                        on it but some around it
+    #               clues; bytearray of the clue of each field
+    @staticmethod
+    def rowFields(board, row):
+        numCols = board.numCols
+        clues   = board.getClueRow(row)
+
+        # combine one byte per field as the bytes of integers
+        mines    = int.from_bytes(board.getMineRow(row), "little")
+        inside   = int.from_bytes(board.getRow(row).encode().translate(NOT_BORDER), "little")
+        noClue   = int.from_bytes(clues.translate(ZERO_CLUES), "little")
+        safe     = inside & ~mines
+        emptyRow = (safe & noClue).to_bytes(numCols, "little")
+        clueRow  = (safe & ~noClue).to_bytes(numCols, "little")
+        return emptyRow, clueRow, clues
+
+    ###################################################################
+    # regionCount()  used to find how many islands the board has
+    # Input:         None
+    # Output:        an integer number of islands
+    def regionCount(self):
+        return len(self.cells)
+
+    ###################################################################
+    # regionSize()   used to find how many fields revealing a field
+    #                would reveal, if it is an empty field
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        an integer number of fields, the island's empty
+    #                fields and bordering clues, or 0 if the field is
+    #                not empty
+    def regionSize(self, row, col):
+        label = self.labels[row * self.numCols + col]
+        return len(self.cells[label]) if label >= 0 else 0
+
+    ###################################################################
+    # threeBV()      used to find the fewest reveals that clear the board
+    # Input:         None
+    # Output:        an integer, the board's 3BV
+    def threeBV(self):
+        return len(self.cells) + self.numLoneClues
+
+    ###################################################################
+    # reveal()       used to reveal the island of an empty field at once,
+    #                when no empty field of the island has been revealed
+    #                or flagged yet, so the result is the same as
+    #                revealIsland(). Flagged clues are left flagged
+    # Input:         board; the Board the index was built from
+    #                row; integer row of the field
+    #                col; integer column of the field
+    # Output:        a boolean that is True if the island was revealed, or
+    #                False if revealIsland() has to be used instead
+    def reveal(self, board, row, col):
+        label = self.labels[row * self.numCols + col]
+        if label < 0:
+            return False
+
+        cells = self.cells[label]
+        view  = board.cells
+        for position in range(self.numEmpty[label]):
+            if view[cells[position]] != UNKNOWN_BYTE:
+                return False
+
+        revealed = 0
+        changes  = board.changes
+        for index, value in zip(cells, self.values[label]):
+            if view[index] == UNKNOWN_BYTE:
+                view[index] = value
+                revealed += 1
+                if changes is not None:
+                    changes.add(index, UNKNOWN_BYTE)
+
+        # none of the fields holds a mine, and none was flagged
+        board.hiddenSafe -= revealed
+        return True
 
 #######################################################################
-# revealDown()      recursive function used to reveal all empty spaces
-#                   to the bottom of a position.
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
-#                   row; integer entered by the user for row input
-#                   col; integer entered by the user for column
-#                        input
-# Output:           none; recursive call until base staement is reached
-def revealDown(board, prettyBoard, row, col):
-
-    # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
-
-    # if position to the bottom is a mine, border, flag or space.
-    # Do nothing
-    elif board[row + 1][col] == MINE or board[row + 1][col] == BORDER or prettyBoard[row + 1][col] == FLAG or prettyBoard[row + 1][col] == SPACE:
-        return
-    else:
-        # find number of mines around position to the bottom and assign
-        # value to position
-        clue = numOfMinesAround(row + 1, col, board)
-        if clue == 0:
-            prettyBoard[row + 1][col] = SPACE
-        else:
-            prettyBoard[row + 1][col] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row + 1][col] == SPACE:
-            revealUp(board, prettyBoard, row + 1, col)
-            revealDown(board, prettyBoard, row + 1, col)
-            revealLeft(board, prettyBoard, row + 1, col)
-            revealRight(board, prettyBoard, row + 1, col)
-            revealUpperRight(board, prettyBoard, row + 1, col)
-            revealLowerRight(board, prettyBoard, row + 1, col)
-            revealUpperLeft(board, prettyBoard, row + 1, col)
-            revealLowerLeft(board, prettyBoard, row + 1, col)
-        else:
-            return
-
-#########################################################################
-# revealUpperRight()  recursive function used to reveal all empty spaces
-#                     to the upper-right of a position.
-# Input:              board; 2-D board of chars that represents the game
-#                     prettyBoard; a 2-D board of chars that is shown to
-#                                  the player after each play
-#                     row; integer entered by the user for row input
-#                     col; integer entered by the user for column
-#                          input
-# Output:             none; recursive call until base staement is reached
-def revealUpperRight(board, prettyBoard, row, col):
-
-    # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
-
-    # if position to the upper-right is a mine, border, flag or space.
-    # Do nothing
-    elif board[row - 1][col + 1] == MINE or board[row - 1][col + 1] == BORDER or prettyBoard[row - 1][col + 1] == FLAG or prettyBoard[row - 1][col + 1] == SPACE:
-        return
-    else:
+# FieldChanges      collects the old value of each field changed while a
+#                   move is played, as an array of field indices and a
+#                   bytearray of values, so a move costs memory only for
+#                   the fields it changed
+class FieldChanges:
+    __slots__ = ("indices", "values")
+
+    ###################################################################
+    # __init__()    starts with no fields changed
+    def __init__(self):
+        self.indices = array("q")
+        self.values  = bytearray()
+
+    ###################################################################
+    # add()         used to note a field that is being changed
+    # Input:        index; integer index (row * numCols + col) of the field
+    #               value; byte the field showed before the change
+    # Output:       None
+    def add(self, index, value):
+        self.indices.append(index)
+        self.values.append(value)
 
-        # find number of mines around position to the upper-right and assign
-        # value to position
-        clue = numOfMinesAround(row - 1, col + 1, board)
-        if clue == 0:
-            prettyBoard[row - 1][col + 1] = SPACE
-        else:
-            prettyBoard[row - 1][col + 1] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row - 1][col + 1] == SPACE:
-            revealUp(board, prettyBoard, row - 1, col + 1)
-            revealDown(board, prettyBoard, row - 1, col + 1)
-            revealLeft(board, prettyBoard, row - 1, col + 1)
-            revealRight(board, prettyBoard, row - 1, col + 1)
-            revealUpperRight(board, prettyBoard, row - 1, col + 1)
-            revealLowerRight(board, prettyBoard, row - 1, col + 1)
-            revealUpperLeft(board, prettyBoard, row - 1, col + 1)
-            revealLowerLeft(board, prettyBoard, row - 1, col + 1)
-        else:
+#######################################################################
+# MoveHistory       keeps a MoveDelta for each move of a game that changed
+#                   the board, to undo and redo them. At most maxMoves
+#                   moves, changing at most maxFields fields in all, are
+#                   kept, and the oldest ones are dropped first
+class MoveHistory:
+    __slots__ = ("maxMoves", "maxFields", "undoMoves", "redoMoves", "numFields", "changes", "before")
+
+    ###################################################################
+    # __init__()    starts an empty history
+    # Input:        maxMoves; integer number of moves kept
+    #               maxFields; integer number of changed fields kept
+    def __init__(self, maxMoves=HISTORY_MOVES, maxFields=HISTORY_FIELDS):
+        self.maxMoves  = maxMoves
+        self.maxFields = maxFields
+        self.undoMoves = deque()
+        self.redoMoves = deque()
+        self.numFields = 0
+        self.changes   = None
+        self.before    = None
+
+    ###################################################################
+    # begin()       used before a move is played, to start noting the
+    #               fields it changes
+    # Input:        game; the Game the move is played on
+    # Output:       None
+    def begin(self, game):
+        self.changes = FieldChanges()
+        self.before  = (game.numFlags, game.isDetonated, game.lastMove)
+        game.board.changes = self.changes
+
+    ###################################################################
+    # end()         used after a move is played, to keep it if it changed
+    #               the board. A new move can not be redone over
+    # Input:        game; the Game the move was played on
+    # Output:       None
+    def end(self, game):
+        changes = self.changes
+        game.board.changes = None
+        self.changes = None
+        if not changes.indices:
             return
 
+        self.redoMoves.clear()
+        self.push(self.undoMoves, MoveDelta(changes.indices, changes.values, *self.before))
+
+        # drop the oldest moves once there are too many, but always keep
+        # the last one
+        while len(self.undoMoves) > 1 and (len(self.undoMoves) > self.maxMoves or self.numFields > self.maxFields):
+            self.numFields -= len(self.undoMoves.popleft().indices)
+
+    ###################################################################
+    # push()        used to add a move to the undo or the redo list
+    # Input:        moves; the deque to add the move to
+    #               delta; the MoveDelta of the move
+    # Output:       None
+    def push(self, moves, delta):
+        moves.append(delta)
+        if moves is self.undoMoves:
+            self.numFields += len(delta.indices)
+
+    ###################################################################
+    # swap()        used to undo or redo a move, moving it from one list
+    #               to the other
+    # Input:        game; the Game the move was played on
+    #               fromMoves; the deque to take the move from
+    #               toMoves; the deque to put the move that reverses it
+    # Output:       a boolean that is False if there was no move to take
+    def swap(self, game, fromMoves, toMoves):
+        if not fromMoves:
+            return False
+
+        delta = fromMoves.pop()
+        if fromMoves is self.undoMoves:
+            self.numFields -= len(delta.indices)
+
+        indices, values = game.board.swapCells(delta.indices, delta.values)
+        self.push(toMoves, MoveDelta(indices, values, game.numFlags, game.isDetonated, game.lastMove))
+        game.numFlags, game.isDetonated, game.lastMove = delta.numFlags, delta.isDetonated, delta.lastMove
+        return True
 
 #######################################################################
-# revealLowerRight()  recursive function used to reveal all empty spaces
-#                     to the lower-right of a position.
-# Input:              board; 2-D board of chars that represents the game
-#                     prettyBoard; a 2-D board of chars that is shown to
-#                                  the player after each play
-#                     row; integer entered by the user for row input
-#                     col; integer entered by the user for column
-#                          input
-# Output:             none; recursive call until base staement is reached
-def revealLowerRight(board, prettyBoard, row, col):
-
-    # if the position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
-
-    # if position to the lower-right is a mine, border, flag or space.
-    # Do nothing
-    elif board[row + 1][col + 1] == MINE or board[row + 1][col + 1] == BORDER or prettyBoard[row + 1][col + 1] == FLAG or prettyBoard[row + 1][col + 1] == SPACE:
-        return
-    else:
-
-        # find number of mines around position to the lower-right and assign
-        # value to position
-        clue = numOfMinesAround(row + 1, col + 1, board)
-        if clue == 0:
-            prettyBoard[row + 1][col + 1] = SPACE
-        else:
-            prettyBoard[row + 1][col + 1] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row + 1][col + 1] == SPACE:
-            revealUp(board, prettyBoard, row + 1, col + 1)
-            revealDown(board, prettyBoard, row + 1, col + 1)
-            revealLeft(board, prettyBoard, row + 1, col + 1)
-            revealRight(board, prettyBoard, row + 1, col + 1)
-            revealUpperRight(board, prettyBoard, row + 1, col + 1)
-            revealLowerRight(board, prettyBoard, row + 1, col + 1)
-            revealUpperLeft(board, prettyBoard, row + 1, col + 1)
-            revealLowerLeft(board, prettyBoard, row + 1, col + 1)
-        else:
-            return
+# ByteCounter       stands in for sys.stdout while a board is printed,
+#                   counting the bytes written before passing them on
+class ByteCounter:
+    __slots__ = ("output", "numBytes")
+
+    ###################################################################
+    # __init__()    starts counting
+    # Input:        output; the file the text is passed on to
+    def __init__(self, output):
+        self.output   = output
+        self.numBytes = 0
+
+    ###################################################################
+    # write()       used to count and pass on some text
+    # Input:        text; the string written
+    # Output:       the number of chars written
+    def write(self, text):
+        self.numBytes += len(text.encode())
+        return self.output.write(text)
+
+    ###################################################################
+    # flush()       used to flush the file the text is passed on to
+    # Input:        None
+    # Output:       None
+    def flush(self):
+        self.output.flush()
 
 #######################################################################
-# revealUpperLeft() recursive function used to reveal all empty spaces
-#                   to the upper-left of a position.
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
-#                   row; integer entered by the user for row input
-#                   col; integer entered by the user for column
-#                        input
-# Output:           none; recursive call until base staement is reached
-def revealUpperLeft(board, prettyBoard, row, col):
-    
-    # if position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
+# MoveProfiler      measures each move of a Game it is given to: how long
+#                   the move took, and how many fields it revealed, how
+#                   many clues it looked up, and how many fields it
+#                   looked at. Printing the board after a move, through
+#                   a render function from wrapRender(), adds how long
+#                   that took and how many bytes it wrote. Each move's
+#                   record is a dict passed to the callback once the
+#                   next move starts, or the profiler is closed
+#
+#                   A Game without a profiler only checks that it has
+#                   none, once per move
+class MoveProfiler:
+    __slots__ = ("callback", "moveCount", "record", "start", "hiddenSafe")
+
+    ###################################################################
+    # __init__()    creates a profiler that has seen no moves
+    # Input:        callback; function called with the record of each
+    #                         move
+    def __init__(self, callback):
+        self.callback   = callback
+        self.moveCount  = 0
+        self.record     = None
+        self.start      = 0.0
+        self.hiddenSafe = 0
+
+    ###################################################################
+    # begin()       used when a move starts
+    # Input:        game; the Game the move is played on
+    # Output:       None
+    def begin(self, game):
+        self.flush()
+        self.hiddenSafe = game.board.hiddenSafe
+        self.start      = time.perf_counter()
+
+    ###################################################################
+    # end()         used when a move has been played, to build its record
+    # Input:        game; the Game the move was played on
+    #               action; "r" or "f"
+    #               result; the MoveResult of the move
+    #               isFlooded; a boolean that is True if revealIsland()
+    #                          was used, which looks up the clue of
+    #                          every field it reveals
+    #               numScanned; integer number of fields looked at
+    # Output:       None
+    def end(self, game, action, result, isFlooded, numScanned):
+        seconds = time.perf_counter() - self.start
+        self.moveCount += 1
+
+        revealed = self.hiddenSafe - game.board.hiddenSafe
+        numClues = revealed if isFlooded else 0
+        if result.outcome == DETONATED:
+            revealed += 1
+
+        self.record = {"move": self.moveCount,
+                       "row": result.row,
+                       "col": result.col,
+                       "action": action,
+                       "outcome": result.outcome,
+                       "seconds": seconds,
+                       "revealed": revealed,
+                       "clues": numClues,
+                       "scanned": numScanned,
+                       "renderSeconds": 0.0,
+                       "renderedBytes": 0}
+
+    ###################################################################
+    # wrapRender()  used to measure the printing of the board
+    # Input:        render; the function used to print the board
+    # Output:       a function that prints the board the same way, and
+    #               adds the time and the bytes to the last move's record
+    def wrapRender(self, render):
+        def measuredRender(board):
+            output  = sys.stdout
+            counter = ByteCounter(output)
+            start   = time.perf_counter()
+            sys.stdout = counter
+            try:
+                render(board)
+            finally:
+                sys.stdout = output
+
+            if self.record is not None:
+                self.record["renderSeconds"] += time.perf_counter() - start
+                self.record["renderedBytes"] += counter.numBytes
+
+        return measuredRender
+
+    ###################################################################
+    # flush()       used to pass the last move's record to the callback
+    # Input:        None
+    # Output:       None
+    def flush(self):
+        if self.record is not None:
+            record = self.record
+            self.record = None
+            self.callback(record)
+
+    ###################################################################
+    # close()       used once the game is over, to pass on the last record
+    # Input:        None
+    # Output:       None
+    def close(self):
+        self.flush()
 
-    # if position to the upper-left is a mine, border, flag or space.
-    # Do nothing
-    elif board[row - 1][col - 1] == MINE or board[row - 1][col - 1] == BORDER or prettyBoard[row - 1][col - 1] == FLAG or prettyBoard[row - 1][col - 1] == SPACE:
-        return
-    else:
-        # find number of mines around position to the upper-left and assign
-        # value to position
-        clue = numOfMinesAround(row - 1, col - 1, board)
-        if clue == 0:
-            prettyBoard[row - 1][col - 1] = SPACE
+#######################################################################
+# Game              plays a game on a Board without any input or output,
+#                   so it can be driven by a program as well as by a
+#                   player. Each move returns a MoveResult, and nothing
+#                   is ever printed
+class Game:
+    __slots__ = ("board", "numFlags", "isDetonated", "lastMove", "regions", "history", "profiler")
+
+    ###################################################################
+    # __init__()    starts a game
+    # Input:        board; the Board to play on
+    #               regions; a RegionIndex of the board, used to reveal
+    #                        islands at once, or None to flood fill them
+    #               history; a MoveHistory used to undo and redo moves,
+    #                        or None if moves can not be undone
+    #               profiler; a MoveProfiler that measures each move, or
+    #                         None
+    #               The mines are not counted here, as a MappedBoard
+    #               counts them in the background; numFlags is the number
+    #               of flags placed less the number removed
+    def __init__(self, board, regions=None, history=None, profiler=None):
+        self.board       = board
+        self.numFlags    = 0
+        self.isDetonated = False
+        self.lastMove    = None
+        self.regions     = regions
+        self.history     = history
+        self.profiler    = profiler
+
+    ###################################################################
+    # minesLeft     the number of mines less the number of flags placed,
+    #               waiting for the board's mines to be counted
+    @property
+    def minesLeft(self):
+        return numOfMines(self.board) - self.numFlags
+
+    @minesLeft.setter
+    def minesLeft(self, value):
+        self.numFlags = numOfMines(self.board) - value
+
+    ###################################################################
+    # knownMinesLeft() used to find the mines left without waiting for
+    #               the board's mines to be counted
+    # Input:        None
+    # Output:       an integer, or None if they are still being counted
+    def knownMinesLeft(self):
+        return self.minesLeft if self.board.isCounted() else None
+
+    ###################################################################
+    # isWon()       used to find if every mine has been flagged. While a
+    #               board's mines are being counted, a game with a wrong
+    #               flag, or fewer flags than the mines counted so far,
+    #               is known not to be won without waiting for the count
+    # Input:        None
+    # Output:       a boolean that is True if the game is won
+    def isWon(self):
+        board = self.board
+        if board.wrongFlags != 0 or board.correctFlags < board.fewestMines():
+            return False
+        return checkGameComplete(board, self.minesLeft)
+
+    ###################################################################
+    # flag()        places a flag on a hidden position, or removes the
+    #               flag if there is one already
+    # Input:        row; integer row of the position
+    #               col; integer column of the position
+    # Output:       a MoveResult holding what the move did
+    def flag(self, row, col):
+        if self.history is not None:
+            self.history.begin(self)
+        if self.profiler is not None:
+            self.profiler.begin(self)
+
+        board = self.board
+        cell  = board.getCell(row, col)
+        self.lastMove = (row, col)
+
+        if cell == FLAG:
+            board.setCell(row, col, UNKNOWN)
+            self.numFlags -= 1
+            outcome = FLAG_REMOVED
+        elif cell == SPACE:
+            outcome = ALREADY_REVEALED
+        elif cell == UNKNOWN:
+            board.setCell(row, col, FLAG)
+            self.numFlags += 1
+            outcome = FLAG_PLACED
         else:
-            prettyBoard[row - 1][col - 1] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row - 1][col - 1] == SPACE:
-            revealUp(board, prettyBoard, row - 1, col - 1)
-            revealDown(board, prettyBoard, row - 1, col - 1)
-            revealLeft(board, prettyBoard, row - 1, col - 1)
-            revealRight(board, prettyBoard, row - 1, col - 1)
-            revealUpperRight(board, prettyBoard, row - 1, col - 1)
-            revealLowerRight(board, prettyBoard, row - 1, col - 1)
-            revealUpperLeft(board, prettyBoard, row - 1, col - 1)
-            revealLowerLeft(board, prettyBoard, row - 1, col - 1)
+            outcome = NO_CHANGE
+
+        result = MoveResult(row, col, outcome, self.knownMinesLeft())
+        if self.history is not None:
+            self.history.end(self)
+        if self.profiler is not None:
+            self.profiler.end(self, "f", result, False, 1)
+        return result
+
+    ###################################################################
+    # reveal()      reveals a hidden position, along with the island
+    #               around it if it has no mines around it
+    # Input:        row; integer row of the position
+    #               col; integer column of the position
+    # Output:       a MoveResult holding what the move did
+    def reveal(self, row, col):
+        if self.history is not None:
+            self.history.begin(self)
+        if self.profiler is not None:
+            self.profiler.begin(self)
+
+        board = self.board
+        cell  = board.getCell(row, col)
+        self.lastMove = (row, col)
+
+        # the mines of a board generated with safeStart are placed once
+        # the first field is revealed, and the islands are found again
+        if board.pendingMines is not None and cell == UNKNOWN:
+            placePendingMines(board, row, col)
+            if self.regions is not None:
+                self.regions = RegionIndex(board)
+
+        # the fields looked at: the field itself, the island copied from
+        # the index, or the neighbors of each empty field flood filled
+        isFlooded  = False
+        numScanned = 1
+        if cell == SPACE or cell in CLUES:
+            outcome = ALREADY_REVEALED
+        elif cell == FLAG:
+            outcome = MUST_UNFLAG
+        elif board.isMine(row, col):
+            board.setCell(row, col, DETONATED_MINE)
+            self.isDetonated = True
+            outcome = DETONATED
+        elif cell == UNKNOWN:
+            if self.regions is not None and self.regions.reveal(board, row, col):
+                numScanned = self.regions.regionSize(row, col)
+            else:
+                isFlooded  = True
+                numScanned = 1 + 9 * revealIsland(board, row, col)
+            outcome = REVEALED
         else:
-            return
+            outcome = NO_CHANGE
+
+        result = MoveResult(row, col, outcome, self.knownMinesLeft())
+        if self.history is not None:
+            self.history.end(self)
+        if self.profiler is not None:
+            self.profiler.end(self, "r", result, isFlooded, numScanned)
+        return result
+
+    ###################################################################
+    # undo()        takes back the last move that changed the board
+    # Input:        None
+    # Output:       a boolean that is False if there was no move to undo
+    def undo(self):
+        if self.history is None:
+            return False
+        return self.history.swap(self, self.history.undoMoves, self.history.redoMoves)
+
+    ###################################################################
+    # redo()        plays again the last move taken back by undo()
+    # Input:        None
+    # Output:       a boolean that is False if there was no move to redo
+    def redo(self):
+        if self.history is None:
+            return False
+        return self.history.swap(self, self.history.redoMoves, self.history.undoMoves)
+
+    ###################################################################
+    # state()       used to find if the game is still being played
+    # Input:        None
+    # Output:       a GameState holding the status of the game, the
+    #               mines left to find and the safe positions left to
+    #               reveal. Both are None while the board's mines are
+    #               still being counted
+    def state(self):
+        if self.isDetonated:
+            status = LOST
+        elif self.isWon():
+            status = WON
+        else:
+            status = PLAYING
+
+        if not self.board.isCounted():
+            return GameState(status, None, None)
+        return GameState(status, self.minesLeft, self.board.hiddenSafe)
+
+    ###################################################################
+    # applyMoves()  plays a list of moves without asking for input or
+    #               printing each board, stopping early if the game is
+    #               won or lost
+    # Input:        moves; an iterable of (row, col, choice) tuples,
+    #                      where choice is "r" or "f"
+    #               renderEvery; integer - print the board after every
+    #                            this many moves, or never if 0
+    #               render; the function used to print the board
+    # Output:       count; an integer holding the number of moves played
+    def applyMoves(self, moves, renderEvery=0, render=prettyPrintBoard):
+        board  = self.board
+        flag   = self.flag
+        reveal = self.reveal
+
+        # with nothing to note for each move, the moves on a Board are
+        # played straight on its grids
+        if self.history is None and self.profiler is None and type(board) is Board and board.changes is None:
+            return self.applyBoardMoves(moves, renderEvery, render)
+
+        # same bounds as validateRow() and validateColumn()
+        lastRow = board.numRows - END_OF_LINE
+        lastCol = board.numCols - END_OF_LINE
+
+        count = 0
+        for row, col, choice in moves:
+            if not (1 <= row <= lastRow and 1 <= col <= lastCol):
+                raise ValueError("move " + str(count + 1) + " is off the board: " + str(row) + ", " + str(col))
+
+            if choice == "f":
+                flag(row, col)
+            elif choice == "r":
+                reveal(row, col)
+            else:
+                raise ValueError("move " + str(count + 1) + " has an invalid action: " + repr(choice))
+            count += 1
+
+            if renderEvery and count % renderEvery == 0:
+                render(board)
+
+            if self.isDetonated or self.isWon():
+                break
+
+        return count
+
+    ###################################################################
+    # applyBoardMoves() does the same as applyMoves(), for a Board with
+    #               no history, profiler or FieldChanges. Flags are placed
+    #               and removed in the view itself, with the running counts
+    #               kept in local variables, and no MoveResult is built. A
+    #               hidden clue is revealed the same way. Other reveals of
+    #               hidden fields are played by reveal(), once the counts
+    #               are put back, as they may flood fill, detonate a mine
+    #               or place the mines
+    # Input:        the same as applyMoves()
+    # Output:       count; an integer holding the number of moves played
+    def applyBoardMoves(self, moves, renderEvery, render):
+        board      = self.board
+        cells      = board.cells
+        mines      = board.mines
+        clues      = board.clues
+        numCols    = board.numCols
+        mineStride = board.mineStride
+        clueStride = board.clueStride
+        lastRow    = board.numRows - END_OF_LINE
+        lastCol    = numCols - END_OF_LINE
+
+        numFlags     = self.numFlags
+        correctFlags = board.correctFlags
+        wrongFlags   = board.wrongFlags
+        mineCount    = board.mineCount
+
+        count = 0
+        try:
+            for row, col, choice in moves:
+                if not (1 <= row <= lastRow and 1 <= col <= lastCol):
+                    raise ValueError("move " + str(count + 1) + " is off the board: " + str(row) + ", " + str(col))
+
+                index = row * numCols + col
+                cell  = cells[index]
+                if choice == "f":
+                    if cell == FLAG_BYTE:
+                        cells[index] = UNKNOWN_BYTE
+                        numFlags -= 1
+                        if mines[row * mineStride + (col >> 3)] >> (col & 7) & 1:
+                            correctFlags -= 1
+                        else:
+                            wrongFlags -= 1
+                    elif cell == UNKNOWN_BYTE:
+                        cells[index] = FLAG_BYTE
+                        numFlags += 1
+                        if mines[row * mineStride + (col >> 3)] >> (col & 7) & 1:
+                            correctFlags += 1
+                        else:
+                            wrongFlags += 1
+                    self.lastMove = (row, col)
+                elif choice == "r":
+                    clue = clues[row * clueStride + (col >> 1)] >> ((col & 1) << 2) & 15
+                    if cell != UNKNOWN_BYTE:
+                        self.lastMove = (row, col)
+                    elif clue and board.pendingMines is None and not mines[row * mineStride + (col >> 3)] >> (col & 7) & 1:
+                        # a clue is shown by itself
+                        cells[index] = CLUE_TEXT[clue]
+                        board.hiddenSafe -= 1
+                        self.lastMove = (row, col)
+                    else:
+                        self.numFlags      = numFlags
+                        board.correctFlags = correctFlags
+                        board.wrongFlags   = wrongFlags
+                        self.reveal(row, col)
+                        correctFlags = board.correctFlags
+                        wrongFlags   = board.wrongFlags
+                        mineCount    = board.mineCount
+                else:
+                    raise ValueError("move " + str(count + 1) + " has an invalid action: " + repr(choice))
+                count += 1
 
-#######################################################################
-# revealLowerLeft() recursive function used to reveal all empty spaces
-#                   to the lower-left of a position.
-# Input:            board; 2-D board of chars that represents the game
-#                   prettyBoard; a 2-D board of chars that is shown to
-#                                the player after each play
-#                   row; integer entered by the user for row input
-#                   col; integer entered by the user for column
-#                        input
-# Output:           none; recursive call until base staement is reached
-def revealLowerLeft(board, prettyBoard, row, col):
-    
-    # if position is not empty, do nothing
-    if board[row][col] == MINE or board[row][col] == BORDER or prettyBoard[row][col] in CLUES or prettyBoard[row][col] == FLAG:
-        return
+                if renderEvery and count % renderEvery == 0:
+                    self.numFlags      = numFlags
+                    board.correctFlags = correctFlags
+                    board.wrongFlags   = wrongFlags
+                    render(board)
+
+                # the game can only be won once every mine is flagged, and
+                # nothing else is
+                if self.isDetonated:
+                    break
+                if wrongFlags == 0 and correctFlags >= mineCount:
+                    self.numFlags      = numFlags
+                    board.correctFlags = correctFlags
+                    board.wrongFlags   = wrongFlags
+                    if self.isWon():
+                        break
+        finally:
+            self.numFlags      = numFlags
+            board.correctFlags = correctFlags
+            board.wrongFlags   = wrongFlags
+
+        return count
 
-    # if position to the lower-left is a mine, border, flag or space.
-    # Do nothing
-    elif board[row + 1][col - 1] == MINE or board[row + 1][col - 1] == BORDER or prettyBoard[row + 1][col - 1] == FLAG or prettyBoard[row + 1][col - 1] == SPACE:
-        return
-    else:
-        # find number of mines around position to the lower-left and assign
-        # value to position
-        clue = numOfMinesAround(row + 1, col - 1, board)
-        if clue == 0:
-            prettyBoard[row + 1][col - 1] = SPACE
-        else:
-            prettyBoard[row + 1][col - 1] = str(clue)
-
-        # if value assigned after statement above is a space, recursively call
-        # recursive functions
-        if prettyBoard[row + 1][col - 1] == SPACE:
-            revealUp(board, prettyBoard, row + 1, col - 1)
-            revealDown(board, prettyBoard, row + 1, col - 1)
-            revealLeft(board, prettyBoard, row + 1, col - 1)
-            revealRight(board, prettyBoard, row + 1, col - 1)
-            revealUpperRight(board, prettyBoard, row + 1, col - 1)
-            revealLowerRight(board, prettyBoard, row + 1, col - 1)
-            revealUpperLeft(board, prettyBoard, row + 1, col - 1)
-            revealLowerLeft(board, prettyBoard, row + 1, col - 1)
-        else:
-            return
-        
 #######################################################################
 # getRow()        used to get and the row input from the user
-# Input:          board; 2-D board of chars that represents the game
+# Input:          board; the Board that holds the game
 # Output:         rowInput; integer - validated row input
 def getRow(board):
     # get row from user
     print ("Please choose the row:")
-    rowInput = int(input("Enter a number between 1 and " + str(len(board) - END_OF_LINE) + "(inclusive): "))
+    rowInput = int(input("Enter a number between 1 and " + str(board.numRows - END_OF_LINE) + "(inclusive): "))
 
     # check if the row entered is a valid row
     isRowValid = validateRow(rowInput, board)
@@ -745,20 +3294,20 @@ def getRow(board):
     # keep asking till valid row is entered
     while isRowValid == False:
         print(ERROR_MSG_POSITION)
-        rowInput = int(input("Enter a number between 1 and " + str(len(board) - END_OF_LINE) + "(inclusive): "))
+        rowInput = int(input("Enter a number between 1 and " + str(board.numRows - END_OF_LINE) + "(inclusive): "))
         isRowValid = validateRow(rowInput, board)
 
     return rowInput
 
 #######################################################################
 # getColumn()     used to get and the column input from the user
-# Input:          board; 2-D board of chars that represents the game
+# Input:          board; the Board that holds the game
 # Output:         columnInput; integer - validated column input
 def getColumn(board):
     # Get the column                                                           
     print ("Please choose the column:")
 
-    columnInput = int(input("Enter a number between 1 and " + str(len(board) - END_OF_LINE) + "(inclusive): "))
+    columnInput = int(input("Enter a number between 1 and " + str(board.numCols - END_OF_LINE) + "(inclusive): "))
 
     # check if column value entered is valid
     isColumnValid = validateColumn(columnInput, board)
@@ -766,7 +3315,7 @@ def getColumn(board):
     # keep asking until valid input is entered
     while isColumnValid == False:
         print(ERROR_MSG_POSITION)
-        columnInput = int(input("Enter a number between 1 and " + str(len(board) - END_OF_LINE) + "(inclusive): "))
+        columnInput = int(input("Enter a number between 1 and " + str(board.numCols - END_OF_LINE) + "(inclusive): "))
         isColumnValid = validateColumn(columnInput, board)
 
     return columnInput
@@ -774,63 +3323,301 @@ def getColumn(board):
 
 ############################################################################
 # getChoice()     used to get reveal or flag choice from the user
-# Input:          board; 2-D board of chars that represents the game
+# Input:          board; the Board that holds the game
+#                 canUndo; a boolean that is True to also accept "u" to
+#                          undo the last move and "y" to redo it
 # Output:         userChoice; single char string -  validated choice input
-def getChoice(board):
-    
+def getChoice(board, canUndo=False):
+    choices = "rfuy" if canUndo else "rf"
+    message = UNDO_CHOICE_MSG if canUndo else INPUT_CHOICE_MSG
+
     # Get choice to reveal or flag
-    userChoice = input(INPUT_CHOICE_MSG)
-    while userChoice != "f" and userChoice != "r":
+    userChoice = input(message)
+    while len(userChoice) != 1 or userChoice not in choices:
         print(ERROR_MSG_CHOICE)
-        userChoice = input(INPUT_CHOICE_MSG)
+        userChoice = input(message)
 
     return userChoice
 
+############################################################################
+# processUndo()   used to undo or redo a move, and print the board and
+#                 what happened
+# Input:          choice; "u" to undo the last move, or "y" to redo it
+#                 game; the Game being played, with a MoveHistory
+#                 render; the function used to print the board
+# Output:         isDone; a boolean that is False if there was no move to
+#                         undo or redo
+def processUndo(choice, game, render=prettyPrintBoard):
+    isDone = game.undo() if choice == "u" else game.redo()
+
+    render(game.board)
+    if not isDone:
+        print("\t There is no move to", "undo" if choice == "u" else "redo")
+    printMinesLeft(game.knownMinesLeft())
+    print()
+
+    return isDone
+
+
+
+############################################################################
+# readMoves()     used to read a list of moves from a file, one move per
+#                 line given as the row, the column and "r" or "f",
+#                 separated by spaces or commas. Blank lines and lines
+#                 starting with "#" are skipped
+# Input:          fileName; the name of the file holding the moves
+# Output:         moves; a list of (row, col, choice) tuples
+def readMoves(fileName):
+    moves = []
+
+    with open(fileName) as movesFile:
+        for lineNumber, line in enumerate(movesFile, 1):
+            fields = line.replace(",", " ").split()
+            if not fields or fields[0].startswith("#"):
+                continue
+
+            if len(fields) != 3:
+                raise ValueError(fileName + ": line " + str(lineNumber) + " is not a row, a column and an action")
+            moves.append((int(fields[0]), int(fields[1]), fields[2]))
+
+    return moves
+
+############################################################################
+# replay()        used to play a file of moves on a board and report how
+#                 fast they were played
+# Input:          board; the Board to play on
+#                 movesFileName; the name of the file holding the moves
+#                 renderEvery; integer - print the board after every this
+#                              many moves, or only at the end if 0
+#                 viewport; (height, width) of the window around the last
+#                           move to print, or None to print whole boards
+#                 regions; a RegionIndex of the board, or None
+#                 profiler; a MoveProfiler that measures each move, or None
+# Output:         None; prints the final board and the moves per second
+def replay(board, movesFileName, renderEvery, viewport=None, regions=None, profiler=None):
+    game  = Game(board, regions, profiler=profiler)
+    moves = readMoves(movesFileName)
+
+    render = prettyPrintBoard
+    if viewport:
+        render = Viewport(viewport[0], viewport[1], game).draw
+    if profiler is not None:
+        render = profiler.wrapRender(render)
+
+    start   = time.perf_counter()
+    count   = game.applyMoves(moves, renderEvery, render)
+    seconds = time.perf_counter() - start
+
+    render(game.board)
+    printMinesLeft(game.knownMinesLeft())
+    print("\t Game is", game.state().status)
+    print("\t Played", count, "moves in", "{:.3f}".format(seconds), "seconds", end="")
+    if seconds > 0:
+        print(" ({:,.0f} moves/sec)".format(count / seconds), end="")
+    print()
+
+
+############################################################################
+# readSize()      used to read a number of rows and columns given on the
+#                 command line, such as "20x40"
+# Input:          text; the string given on the command line
+# Output:         size; a (rows, columns) tuple of integers
+def readSize(text):
+    height, separator, width = text.lower().partition("x")
+    if not separator or not height.isdigit() or not width.isdigit() or int(height) < 1 or int(width) < 1:
+        raise argparse.ArgumentTypeError("expected ROWSxCOLS, such as 20x40")
+
+    return int(height), int(width)
 
 
 def main():
 
-    numMines    = 0
-    isDetonated = False
-    isComplete  = False
+    parser = argparse.ArgumentParser(description="Play a simplified version of Minesweeper.")
+    parser.add_argument("board", nargs="?",
+                        help="file to load the board from (asked for if not given)")
+    parser.add_argument("--generate", metavar="ROWSxCOLS", type=readSize,
+                        help="play on a board of random mines instead of a file")
+    parser.add_argument("--mines", type=int,
+                        help="with --generate, the number of mines to place")
+    parser.add_argument("--density", type=float, default=DEFAULT_DENSITY,
+                        help="with --generate, the fraction of fields holding a mine")
+    parser.add_argument("--seed", type=int,
+                        help="with --generate, the seed for the random mines")
+    parser.add_argument("--safe-start", action="store_true",
+                        help="with --generate, place the mines after the first reveal, away from it")
+    parser.add_argument("--save", metavar="FILE",
+                        help="save the board to FILE instead of playing, such as to convert a board file")
+    parser.add_argument("--binary", action="store_true",
+                        help="with --save, write the binary board format")
+    parser.add_argument("--compress", choices=sorted(BINARY_COMPRESSIONS), default="none",
+                        help="with --save --binary, how to compress the board")
+    parser.add_argument("--moves", metavar="FILE",
+                        help="play the moves in FILE instead of asking for them")
+    parser.add_argument("--render-every", metavar="N", type=int, default=0,
+                        help="with --moves, print the board after every N moves")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only redraw the fields that changed after each move")
+    parser.add_argument("--viewport", metavar="ROWSxCOLS", type=readSize,
+                        help="only print a window of the board around the last move")
+    parser.add_argument("--mmap", action="store_true",
+                        help="read the board file in place instead of loading it, for huge boards")
+    parser.add_argument("--tiled", action="store_true",
+                        help="with --generate, build the board in chunks as it is played, for huge boards")
+    parser.add_argument("--regions", action="store_true",
+                        help="index the islands of the board when it is loaded, and print its 3BV")
+    parser.add_argument("--autosave", metavar="FILE",
+                        help="save the game to FILE after every move, so it can be resumed")
+    parser.add_argument("--resume", metavar="FILE",
+                        help="carry on with a game saved by --autosave, and keep saving it")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write how long each move took, and what it did, to FILE as JSON lines")
+    parser.add_argument("--undo", action="store_true",
+                        help="keep the moves played, so they can be undone with 'u' and redone with 'y'")
+    args = parser.parse_args()
+
+    if args.incremental and args.viewport:
+        parser.error("--incremental and --viewport can not be used together")
+    if args.generate and args.board:
+        parser.error("give a board file or --generate, not both")
+    if args.mmap and (args.generate or not args.board):
+        parser.error("--mmap needs a board file")
+    if args.mmap and args.incremental:
+        parser.error("--mmap and --incremental can not be used together")
+    if args.tiled and (not args.generate or args.mines is not None or args.save):
+        parser.error("--tiled needs --generate, and can not be used with --mines or --save")
+    if args.save and args.mmap:
+        parser.error("--save can not be used with --mmap")
+    if args.compress != "none" and not args.binary:
+        parser.error("--compress needs --binary")
+    if args.tiled and not args.viewport:
+        parser.error("--tiled needs --viewport")
+    if args.regions and (args.mmap or args.tiled):
+        parser.error("--regions can not be used with --mmap or --tiled")
+    if args.safe_start and (not args.generate or args.tiled or args.save or args.autosave or args.regions):
+        parser.error("--safe-start needs --generate, and can not be used with --tiled, --save, --autosave or --regions")
+    if args.resume and (args.board or args.generate or args.save or args.moves or args.autosave):
+        parser.error("--resume can not be used with a board, --generate, --save, --moves or --autosave")
+    if args.autosave and (args.mmap or args.tiled or args.moves):
+        parser.error("--autosave can not be used with --mmap, --tiled or --moves")
+    if args.undo and (args.moves or args.autosave or args.resume):
+        parser.error("--undo can not be used with --moves, --autosave or --resume")
+
+    # create the board used by the game to keep track of mines and of
+    # what is displayed to the user
+    board = None
+    if args.tiled:
+        try:
+            board = TiledBoard(args.generate[0] + 2, args.generate[1] + 2, args.density, args.seed)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.generate:
+        try:
+            board = generateBoard(args.generate[0], args.generate[1], args.mines, args.density, args.seed,
+                                  safeStart=args.safe_start)
+        except ValueError as error:
+            parser.error(str(error))
+    elif args.mmap:
+        board = MappedBoard(args.board)
+    elif args.board:
+        board = loadBoard(args.board)
+
+    if args.save:
+        if board is None:
+            parser.error("--save needs a board file or --generate")
+        if args.binary:
+            writeBinaryBoard(board, args.save, args.compress)
+        else:
+            writeBoard(board, args.save)
+        return
+
+    regions = None
+    if args.regions and board is not None:
+        regions = RegionIndex(board)
+        print("\t The board has", regions.regionCount(), "islands and a 3BV of", regions.threeBV())
+
+    # each move's record is written as soon as the next move starts
+    profiler = None
+    if args.profile:
+        profileFile = open(args.profile, "w")
+        profiler = MoveProfiler(lambda record: profileFile.write(json.dumps(record) + "\n"))
+
+    if args.moves:
+        if board is None:
+            parser.error("--moves needs a board file or --generate")
+        replay(board, args.moves, args.render_every, args.viewport, regions, profiler)
+        if profiler is not None:
+            profiler.close()
+            profileFile.close()
+        return
 
     print()
     print(INTRO)
     print()
 
-    # Get the file name from the user
-    fileName = input("Enter the file to load the board from: ")
-
-    # create the board used by the game to keep track of mines
-    board = createBoard(fileName)
-
-    # Create the board that will be displayed to the user
-    prettyBoard = createPrettyBoard(fileName)
+    # carry on with a saved game, or get the file name from the user
+    journal = None
+    if args.resume:
+        game, moveCount = resumeGame(args.resume)
+        if args.regions:
+            game.regions = RegionIndex(game.board)
+        game.profiler = profiler
+        journal = GameJournal(game, args.resume, moveCount)
+    else:
+        if board is None:
+            fileName = input("Enter the file to load the board from: ")
+            board = loadBoard(fileName)
+            if args.regions:
+                regions = RegionIndex(board)
 
-    # Get initial number of mines in the field
-    numMines = numOfMines(board)
+        history = MoveHistory() if args.undo else None
+        game    = Game(board, regions, history, profiler)
+        if args.autosave:
+            journal = GameJournal(game, args.autosave)
 
     # print the initial board for debugging
-    prettyPrintBoard(prettyBoard)
+    render = prettyPrintBoard
+    if args.incremental:
+        render = BoardRenderer().draw
+    elif args.viewport:
+        render = Viewport(args.viewport[0], args.viewport[1], game).draw
+    if profiler is not None:
+        render = profiler.wrapRender(render)
+    render(game.board)
 
     # Print number of mines in the field
-    print("\t There are", numMines, "mines left to find")
+    printMinesLeft(game.knownMinesLeft())
     print()
 
-    # Start while loop to play game till it is over
-    while isDetonated == False and isComplete == False:
-        # Get inputs from the user and validate
-        rowInput    = getRow(board)
-        columnInput = getColumn(board)
-        userChoice  = getChoice(board)
-
-        numMines = processInput(rowInput, columnInput, userChoice, numMines, board, prettyBoard)
-
-        isDetonated = checkMineDetonated(prettyBoard, rowInput, columnInput)
-        isComplete  = checkGameComplete(board, prettyBoard, numMines)
+    # Start while loop to play game till it is over. The journal and the
+    # profile are closed even if the input ends first
+    try:
+        while game.state().status == PLAYING:
+            # Get inputs from the user and validate. With --undo the action
+            # is asked for first, as undoing a move needs no field
+            if args.undo:
+                userChoice = getChoice(game.board, True)
+                if userChoice == "u" or userChoice == "y":
+                    processUndo(userChoice, game, render)
+                    continue
+
+            rowInput    = getRow(game.board)
+            columnInput = getColumn(game.board)
+            if not args.undo:
+                userChoice = getChoice(game.board)
+
+            processInput(rowInput, columnInput, userChoice, game, render)
+            if journal is not None:
+                journal.record(rowInput, columnInput, userChoice)
+    finally:
+        if journal is not None:
+            journal.close()
+        if profiler is not None:
+            profiler.close()
+            profileFile.close()
 
     # print message when the user wins the game
-    if isDetonated == False and isComplete == True:
+    if game.state().status == WON:
         print("You won! Congratulations, and good game!")
     
-main()
+if __name__ == "__main__":
+    main()
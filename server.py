@@ -0,0 +1,269 @@
+# File:         server.py
+# Description:  Serves many games at once over a local TCP or Unix socket,
+#               one game for each connection, with asyncio. Games on the
+#               same board file share its mines and clues
+#
+# Usage:        python server.py [--host HOST] [--port N | --unix PATH] [--boards DIR]
+#                                [--cache-mb N]
+#
+# Protocol:     each request and each reply is one line of JSON.
+#               {"op": "new", "board": "board1.txt"}
+#               {"op": "new", "generate": [ROWS, COLS], "mines": N, "seed": S}
+#                   starts a game on a board file from the boards directory,
+#                   or on a generated board ("density" can be given instead
+#                   of "mines", and "safeStart": true places the mines
+#                   away from the first reveal), and replies with its
+#                   "rows", "cols", "minesLeft" and "status". Boards of
+#                   more than MAX_FIELDS fields, borders included, are
+#                   refused
+#               {"op": "reveal", "row": R, "col": C}
+#               {"op": "flag", "row": R, "col": C}
+#                   plays a move, and replies with its "outcome", the
+#                   "minesLeft" and "status" after it, and "cells": a
+#                   [row, col, char] list of the fields it changed
+#               {"op": "board"}
+#                   replies with "view": what the player sees of each row
+#               Any request that can not be played gets {"error": "..."}
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+import proj3
+
+# Address served when none is given
+DEFAULT_HOST    = "127.0.0.1"
+DEFAULT_PORT    = 8019
+
+# Longest line, in bytes, a request or a reply can take, and the number of
+# connections that can wait to be accepted
+LINE_LIMIT      = 1 << 24
+LISTEN_BACKLOG  = 4096
+
+# Most fields a board can have, so one session can not take all of the
+# memory. A changed field takes at most FIELD_BYTES bytes of a reply, as
+# [row,col,"c"], so the reply to a move that changes every field of the
+# biggest board still fits in a line
+FIELD_BYTES     = 24
+MAX_FIELDS      = 1 << 18
+
+# Moves on boards with more fields than this are played in a worker
+# thread, so a big flood fill does not hold up every other session
+INLINE_FIELDS   = 1 << 12
+
+
+##############################################################################
+# startGame()     used to start the game asked for by a "new" request
+# Input:          request; the dict sent by the player
+#                 boardDir; the directory board files are loaded from
+#                 cache; the proj3.BoardCache board files are loaded with
+# Output:         game; the proj3.Game started
+def startGame(request, boardDir, cache):
+    if "generate" in request:
+        numRows, numCols = request["generate"]
+        if not (type(numRows) is int and type(numCols) is int and numRows >= 1 and numCols >= 1):
+            raise ValueError("generate needs a number of rows and of columns")
+        if (numRows + proj3.END_OF_LINE) * (numCols + proj3.END_OF_LINE) > MAX_FIELDS:
+            raise ValueError("boards can have at most " + str(MAX_FIELDS) + " fields")
+
+        # generateBoard() refuses a mine count or density it can not place
+        board = proj3.generateBoard(numRows, numCols, request.get("mines"),
+                                    request.get("density", proj3.DEFAULT_DENSITY), request.get("seed"),
+                                    safeStart=bool(request.get("safeStart")))
+    elif "board" in request:
+        # only files in the boards directory can be played
+        fileName = str(request["board"])
+        if os.path.basename(fileName) != fileName or fileName.startswith("."):
+            raise ValueError("not a board file: " + fileName)
+        board = cache.load(os.path.join(boardDir, fileName), MAX_FIELDS)
+    else:
+        raise ValueError("new needs a board or generate")
+
+    return proj3.Game(board)
+
+##############################################################################
+# gameInfo()      used to build the reply to a "new" request
+# Input:          game; the proj3.Game started
+# Output:         reply; a dict of the size, the mines left and the status
+def gameInfo(game):
+    state = game.state()
+    return {"rows": game.board.numRows - proj3.END_OF_LINE,
+            "cols": game.board.numCols - proj3.END_OF_LINE,
+            "minesLeft": state.minesLeft,
+            "status": state.status}
+
+##############################################################################
+# playMove()      used to play a "reveal" or "flag" request, noting the
+#                 fields it changes so only they are sent back
+# Input:          game; the proj3.Game being played
+#                 request; the dict sent by the player
+# Output:         reply; a dict of the outcome, the mines left, the status
+#                        and the changed fields
+def playMove(game, request):
+    board = game.board
+    row   = request.get("row")
+    col   = request.get("col")
+    if not (type(row) is int and type(col) is int
+            and 1 <= row <= board.numRows - proj3.END_OF_LINE and 1 <= col <= board.numCols - proj3.END_OF_LINE):
+        raise ValueError("row and col must be on the board")
+    if game.state().status != proj3.PLAYING:
+        raise ValueError("the game is over")
+
+    changes = proj3.FieldChanges()
+    board.changes = changes
+    try:
+        if request["op"] == "flag":
+            result = game.flag(row, col)
+        else:
+            result = game.reveal(row, col)
+    finally:
+        board.changes = None
+
+    numCols = board.numCols
+    cells   = [[index // numCols, index % numCols, chr(board.cells[index])] for index in changes.indices]
+
+    return {"outcome": result.outcome,
+            "minesLeft": result.minesLeft,
+            "status": game.state().status,
+            "cells": cells}
+
+##############################################################################
+# encodeReply()   used to turn a reply into the line sent back
+# Input:          reply; the dict to send back
+# Output:         line; the bytes of the reply, ending with a newline
+def encodeReply(reply):
+    return json.dumps(reply, separators=(",", ":")).encode() + b"\n"
+
+##############################################################################
+# playMoveLine()  used to play a move and encode its reply, which on a big
+#                 board both take long enough to be done in a worker thread
+# Input:          game; the proj3.Game being played
+#                 request; the dict sent by the player
+# Output:         line; the bytes of the reply
+def playMoveLine(game, request):
+    return encodeReply(playMove(game, request))
+
+##############################################################################
+# handleRequest() used to answer one request of a session. New games, and
+#                 moves on big boards, are played in a worker thread, so
+#                 other sessions are answered meanwhile. Only this
+#                 session uses its game until the move is done
+# Input:          session; a dict holding the session's "game", or None
+#                 line; the bytes of the request
+#                 boardDir; the directory board files are loaded from
+#                 cache; the proj3.BoardCache board files are loaded with
+# Output:         line; the bytes of the reply to send back
+async def handleRequest(session, line, boardDir, cache):
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("a request must be a JSON object")
+
+        op = request.get("op")
+        if op == "new":
+            # loading a board file, or generating a board, can take as
+            # long as a big move, so it is done in a worker thread too
+            session["game"] = await asyncio.to_thread(startGame, request, boardDir, cache)
+            return encodeReply(gameInfo(session["game"]))
+
+        game = session.get("game")
+        if game is None:
+            raise ValueError("no game started; send a new request first")
+        if op == "reveal" or op == "flag":
+            if game.board.numRows * game.board.numCols > INLINE_FIELDS:
+                return await asyncio.to_thread(playMoveLine, game, request)
+            return playMoveLine(game, request)
+        if op == "board":
+            board = game.board
+            return encodeReply({"view": [board.getRow(row) for row in range(board.numRows)]})
+
+        raise ValueError("unknown op: " + repr(op))
+    except (ValueError, TypeError, KeyError, OSError) as error:
+        return encodeReply({"error": str(error)})
+
+##############################################################################
+# serveSession()  used to serve one connection until it is closed, as its
+#                 own session with its own game
+# Input:          reader; the asyncio.StreamReader of the connection
+#                 writer; the asyncio.StreamWriter of the connection
+#                 boardDir; the directory board files are loaded from
+#                 cache; the proj3.BoardCache board files are loaded with
+# Output:         None
+async def serveSession(reader, writer, boardDir, cache):
+    session = {}
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                writer.write(b'{"error": "request too long"}\n')
+                break
+            if not line:
+                break
+            if not line.strip():
+                continue
+
+            writer.write(await handleRequest(session, line, boardDir, cache))
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+##############################################################################
+# startServer()   used to start serving games
+# Input:          host; the address to listen on, for TCP
+#                 port; integer port to listen on, for TCP
+#                 path; the path of a Unix socket to listen on instead, or
+#                       None for TCP
+#                 boardDir; the directory board files are loaded from
+#                 cacheBytes; integer number of bytes of boards kept in
+#                             the cache shared by every session
+# Output:         server; the asyncio.Server, already serving
+async def startServer(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, boardDir=".",
+                      cacheBytes=proj3.BOARD_CACHE_BYTES):
+    cache = proj3.BoardCache(cacheBytes)
+
+    async def onConnect(reader, writer):
+        await serveSession(reader, writer, boardDir, cache)
+
+    if path is not None:
+        return await asyncio.start_unix_server(onConnect, path, limit=LINE_LIMIT, backlog=LISTEN_BACKLOG)
+    return await asyncio.start_server(onConnect, host, port, limit=LINE_LIMIT, backlog=LISTEN_BACKLOG)
+
+##############################################################################
+# runServer()     used to serve games until the program is stopped
+# Input:          the same as startServer()
+# Output:         None
+async def runServer(host, port, path, boardDir, cacheBytes):
+    server = await startServer(host, port, path, boardDir, cacheBytes)
+    where  = path if path is not None else host + ":" + str(port)
+    print("\t Serving games on", where, file=sys.stderr)
+
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve many games at once over a local socket.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help="TCP port to listen on")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="listen on a Unix socket at PATH instead of TCP")
+    parser.add_argument("--boards", metavar="DIR", default=".",
+                        help="directory the board files are loaded from")
+    parser.add_argument("--cache-mb", metavar="N", type=int, default=proj3.BOARD_CACHE_BYTES >> 20,
+                        help="megabytes of board files kept loaded for new sessions")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(runServer(args.host, args.port, args.unix, args.boards, args.cache_mb << 20))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
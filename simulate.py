@@ -0,0 +1,176 @@
+# File:         simulate.py
+# Description:  Plays many generated games without any output, spread over
+#               every CPU core, and reports the win rate and how long the
+#               games last
+#
+# Usage:        python simulate.py [--games N] [--size ROWSxCOLS] [--mines N]
+#                                  [--workers N] [--batch N] [--seed S]
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+import proj3
+import solver
+
+# Size and number of mines of the boards played when none are given
+DEFAULT_SIZE    = (16, 30)
+DEFAULT_MINES   = 99
+
+# Number of games each worker plays before sending back its counts
+DEFAULT_BATCH   = 1000
+
+# Totals kept for a batch of games, in this order
+STAT_NAMES      = ["games", "won", "lost", "moves", "guesses"]
+
+# Board reused by every game a worker plays, so a game does not build new
+# grids. Each worker process has its own
+workerBoard     = None
+
+
+##############################################################################
+# playGame()      used to play one game to the end, playing every move the
+#                 solver can deduce and guessing a hidden field at random
+#                 when it can not deduce any
+# Input:          game; the proj3.Game to play
+#                 rng; the random.Random used for the guesses
+#                 fields; a list of every (row, col) field inside the
+#                         border of the board, copied for the game
+# Output:         moves; integer number of moves played
+#                 guesses; integer number of them that were guesses
+def playGame(game, rng, fields):
+    board   = game.board
+    player  = solver.Solver(game)
+    guesses = 0
+
+    # fields that may still be hidden. One found revealed or flagged when
+    # picked is dropped then, so each field is looked at about once a game
+    # rather than once every guess
+    hidden  = list(fields)
+
+    while game.state().status == proj3.PLAYING:
+        # every hidden field left holds a mine
+        if board.hiddenSafe == 0:
+            player.flag([(row, col) for row, col in hidden if board.getCell(row, col) == proj3.UNKNOWN])
+            break
+
+        # pick at random until a field still hidden comes up, dropping the
+        # picked field either way
+        while True:
+            index    = rng.randrange(len(hidden))
+            row, col = hidden[index]
+            hidden[index] = hidden[-1]
+            hidden.pop()
+            if board.getCell(row, col) == proj3.UNKNOWN:
+                break
+
+        game.reveal(row, col)
+        guesses += 1
+        if not game.isDetonated:
+            player.addIsland(row, col)
+            player.solve()
+
+    return player.deductions + guesses, guesses
+
+##############################################################################
+# playBatch()     used by a worker to play a batch of games. Each batch
+#                 has its own seed, so the results do not depend on how
+#                 many workers there are
+# Input:          job; a (batch, games, size, mines, seed) tuple
+# Output:         stats; a list of totals, one for each of STAT_NAMES
+def playBatch(job):
+    global workerBoard
+    batch, games, (numRows, numCols), mines, seed = job
+
+    rng    = random.Random(str(seed) + ":" + str(batch))
+    stats  = [0] * len(STAT_NAMES)
+    fields = [(row, col) for row in range(1, numRows + 1) for col in range(1, numCols + 1)]
+
+    for count in range(games):
+        workerBoard = proj3.generateBoard(numRows, numCols, mines, seed=rng.getrandbits(64), board=workerBoard)
+        game = proj3.Game(workerBoard)
+        moves, guesses = playGame(game, rng, fields)
+
+        stats[0] += 1
+        if game.state().status == proj3.WON:
+            stats[1] += 1
+        else:
+            stats[2] += 1
+        stats[3] += moves
+        stats[4] += guesses
+
+    return stats
+
+##############################################################################
+# simulate()      used to play games over a pool of workers, adding up
+#                 the totals of each batch as it comes back
+# Input:          games; integer number of games to play
+#                 size; (rows, columns) of the boards
+#                 mines; integer number of mines on each board
+#                 workers; integer number of worker processes
+#                 batch; integer number of games in each batch
+#                 seed; integer seed for the whole run
+#                 report; function called with the totals so far after
+#                         each batch, or None
+# Output:         stats; a dict from each of STAT_NAMES to its total
+def simulate(games, size, mines, workers, batch, seed, report=None):
+    jobs = [(index, min(batch, games - start), size, mines, seed)
+            for index, start in enumerate(range(0, games, batch))]
+
+    totals = dict.fromkeys(STAT_NAMES, 0)
+    with multiprocessing.Pool(workers) as pool:
+        for stats in pool.imap_unordered(playBatch, jobs):
+            for name, value in zip(STAT_NAMES, stats):
+                totals[name] += value
+            if report is not None:
+                report(totals)
+
+    return totals
+
+##############################################################################
+# printProgress() used to print the totals so far on one line, over the
+#                 line printed before
+# Input:          totals; a dict from each of STAT_NAMES to its total
+# Output:         None
+def printProgress(totals):
+    sys.stderr.write("\r\t {:,} games, {:.2%} won".format(totals["games"], totals["won"] / totals["games"]))
+    sys.stderr.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many generated games and report the win rate.")
+    parser.add_argument("--games", type=int, default=10000,
+                        help="number of games to play")
+    parser.add_argument("--size", metavar="ROWSxCOLS", type=proj3.readSize, default=DEFAULT_SIZE,
+                        help="size of the boards")
+    parser.add_argument("--mines", type=int, default=DEFAULT_MINES,
+                        help="number of mines on each board")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="number of worker processes (one per core if not given)")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH,
+                        help="number of games each worker plays before reporting")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed for the whole run")
+    args = parser.parse_args()
+
+    if args.games < 1 or args.workers < 1 or args.batch < 1:
+        parser.error("--games, --workers and --batch must be at least 1")
+    if not 0 <= args.mines <= args.size[0] * args.size[1]:
+        parser.error("can not place " + str(args.mines) + " mines on a " + str(args.size[0]) + "x" + str(args.size[1]) + " board")
+
+    start   = time.perf_counter()
+    totals  = simulate(args.games, args.size, args.mines, args.workers, args.batch, args.seed, printProgress)
+    seconds = time.perf_counter() - start
+    sys.stderr.write("\n")
+
+    games = totals["games"]
+    print("\t Played", games, "games on", args.workers, "workers in", "{:.3f}".format(seconds), "seconds",
+          "({:,.0f} games/sec)".format(games / seconds))
+    print("\t Won {:.2%} of the games".format(totals["won"] / games))
+    print("\t Games lasted {:.1f} moves on average, {:.2f} of them guesses".format(totals["moves"] / games,
+                                                                                 totals["guesses"] / games))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,663 @@
+# File:         solver.py
+# Description:  Solves a Minesweeper board as far as deduction allows,
+#               using only what the player can see, and finds the chance
+#               of a mine on each field left hidden
+#
+# Usage:        python solver.py [board | --generate ROWSxCOLS [--density D] [--seed S]] [--start ROW COL] [--print] [--probabilities]
+
+import argparse
+import time
+from collections import deque
+
+import proj3
+
+# Value of each clue char shown on the board
+CLUE_VALUES     = {clue: value for value, clue in enumerate(proj3.CLUES, 1)}
+
+# Most states kept after placing any one field when counting a group of
+# fields next to clues. A group spread over a wide area of the board,
+# such as when clues are revealed all over it, can need far too many
+# states to count exactly, and is refused once it needs more than this
+MAX_STATES      = 1 << 12
+
+
+##############################################################################
+# Solver            plays a Game using only the flag and reveal rules and
+#                   the subset rule, never guessing. It works from a queue
+#                   of revealed clues: a clue is only looked at again when
+#                   a field next to it changes, so the board is never
+#                   scanned again after the first pass
+#
+#                   The trivial rules look at one clue. If its mines are
+#                   all flagged, the rest of its hidden fields are safe,
+#                   and if it has as many hidden fields as mines left,
+#                   they are all mines. The subset rule (such as the 1-2
+#                   pattern) compares two clues that share hidden fields.
+#                   If the hidden fields of one are all next to the
+#                   other, the fields only next to the other hold the
+#                   difference of their mines
+class Solver:
+    __slots__ = ("game", "board", "queue", "queued", "deductions")
+
+    ##########################################################################
+    # __init__()     creates a solver for a game
+    # Input:         game; the proj3.Game to play
+    def __init__(self, game):
+        self.game       = game
+        self.board      = game.board
+        self.queue      = deque()
+        self.queued     = set()
+        self.deductions = 0
+
+    ##########################################################################
+    # addBoard()     used to queue every clue revealed so far
+    # Input:         None
+    # Output:        None
+    def addBoard(self):
+        board = self.board
+        for row in range(1, board.numRows - 1):
+            cells = board.getRow(row)
+            for col in range(1, board.numCols - 1):
+                if cells[col] in CLUE_VALUES:
+                    self.addClue(row, col)
+
+    ##########################################################################
+    # addClue()      used to queue a clue to be looked at
+    # Input:         row; integer row of the clue
+    #                col; integer column of the clue
+    # Output:        None
+    def addClue(self, row, col):
+        index = row * self.board.numCols + col
+        if index not in self.queued:
+            self.queued.add(index)
+            self.queue.append((row, col))
+
+    ##########################################################################
+    # addAround()    used to queue the clues next to a field that changed
+    # Input:         row; integer row of the field
+    #                col; integer column of the field
+    # Output:        None
+    def addAround(self, row, col):
+        getRow = self.board.getRow
+        for nextRow in range(row - 1, row + 2):
+            for nextCol, cell in enumerate(getRow(nextRow, col - 1, col + 2), col - 1):
+                if cell in CLUE_VALUES:
+                    self.addClue(nextRow, nextCol)
+
+    ##########################################################################
+    # addIsland()    used to queue the clues revealed by revealing a field,
+    #                walking the island of empty fields it opened. The
+    #                empty fields revealed before can not touch the new
+    #                ones, so only the new island is walked. The clues
+    #                next to each clue on its edge are queued too, as one
+    #                of their hidden fields may have just been revealed
+    # Input:         row; integer row of the revealed field
+    #                col; integer column of the revealed field
+    # Output:        None
+    def addIsland(self, row, col):
+        getCell = self.board.getCell
+        numCols = self.board.numCols
+
+        toVisit = deque([(row, col)])
+        visited = {row * numCols + col}
+        while toVisit:
+            row, col = toVisit.popleft()
+            if getCell(row, col) != proj3.SPACE:
+                self.addAround(row, col)
+                continue
+
+            # the clues around an empty field are queued, along with the
+            # clues next to it that were already revealed
+            for nextRow in range(row - 1, row + 2):
+                for nextCol in range(col - 1, col + 2):
+                    index = nextRow * numCols + nextCol
+                    if index in visited:
+                        continue
+                    cell = getCell(nextRow, nextCol)
+                    if cell == proj3.SPACE or cell in CLUE_VALUES:
+                        visited.add(index)
+                        toVisit.append((nextRow, nextCol))
+
+    ##########################################################################
+    # hiddenAround() used to find the hidden fields around a clue, and how
+    #                many of them still hold a mine
+    # Input:         row; integer row of the clue
+    #                col; integer column of the clue
+    # Output:        hidden; a frozenset of (row, col) fields
+    #                minesLeft; integer number of mines among them
+    def hiddenAround(self, row, col):
+        getRow    = self.board.getRow
+        minesLeft = CLUE_VALUES[self.board.getCell(row, col)]
+        hidden    = []
+
+        # read the three fields of each row at once, and only look at
+        # them one at a time if one is hidden
+        for nextRow in range(row - 1, row + 2):
+            cells = getRow(nextRow, col - 1, col + 2)
+            if proj3.UNKNOWN not in cells and proj3.FLAG not in cells:
+                continue
+            for nextCol, cell in enumerate(cells, col - 1):
+                if cell == proj3.UNKNOWN:
+                    hidden.append((nextRow, nextCol))
+                elif cell == proj3.FLAG:
+                    minesLeft -= 1
+
+        return frozenset(hidden), minesLeft
+
+    ##########################################################################
+    # reveal(), flag()  used to play a deduced move, and queue the clues
+    #                   around the fields it changed
+    # Input:            fields; iterable of (row, col) fields to play
+    # Output:           None
+    def reveal(self, fields):
+        for row, col in fields:
+            if self.board.getCell(row, col) == proj3.UNKNOWN:
+                self.game.reveal(row, col)
+                self.deductions += 1
+                self.addIsland(row, col)
+
+    def flag(self, fields):
+        for row, col in fields:
+            if self.board.getCell(row, col) == proj3.UNKNOWN:
+                self.game.flag(row, col)
+                self.deductions += 1
+                self.addAround(row, col)
+
+    ##########################################################################
+    # check()        used to apply every rule to a clue
+    # Input:         row; integer row of the clue
+    #                col; integer column of the clue
+    # Output:        None
+    def check(self, row, col):
+        hidden, minesLeft = self.hiddenAround(row, col)
+        if not hidden:
+            return
+
+        if minesLeft == 0:
+            self.reveal(hidden)
+            return
+        if minesLeft == len(hidden):
+            self.flag(hidden)
+            return
+
+        # compare against every clue near enough to share a hidden field,
+        # keeping inside the borders
+        board    = self.board
+        firstCol = max(col - 2, 1)
+        for nextRow in range(max(row - 2, 1), min(row + 3, board.numRows - 1)):
+            cells = board.getRow(nextRow, firstCol, min(col + 3, board.numCols - 1))
+            for nextCol, cell in enumerate(cells, firstCol):
+                if (nextRow == row and nextCol == col) or cell not in CLUE_VALUES:
+                    continue
+
+                otherHidden, otherMines = self.hiddenAround(nextRow, nextCol)
+                if not hidden & otherHidden:
+                    continue
+
+                # the fields only next to the larger clue hold the mines
+                # the smaller clue does not account for
+                if hidden <= otherHidden:
+                    extra, extraMines = otherHidden - hidden, otherMines - minesLeft
+                elif otherHidden <= hidden:
+                    extra, extraMines = hidden - otherHidden, minesLeft - otherMines
+                else:
+                    continue
+
+                if not extra:
+                    continue
+                if extraMines == 0:
+                    self.reveal(extra)
+                elif extraMines == len(extra):
+                    self.flag(extra)
+                else:
+                    continue
+
+                # the hidden fields around this clue may have changed
+                self.addClue(row, col)
+                return
+
+    ##########################################################################
+    # solve()        used to play every move that can be deduced, until
+    #                the queue is empty or the game is over
+    # Input:         None
+    # Output:        deductions; integer number of moves deduced so far
+    def solve(self):
+        queue  = self.queue
+        queued = self.queued
+        game   = self.game
+        numCols = self.board.numCols
+
+        while queue and not game.isDetonated:
+            row, col = queue.popleft()
+            queued.discard(row * numCols + col)
+            self.check(row, col)
+
+        return self.deductions
+
+
+##############################################################################
+# solveGame()     used to solve a game, starting from the clues already
+#                 revealed or from a first field to reveal
+# Input:          game; the proj3.Game to play
+#                 start; a (row, col) field to reveal first, or None to
+#                        start from the clues already on the board
+# Output:         solver; the Solver, holding the number of deductions
+def solveGame(game, start=None):
+    solver = Solver(game)
+    if start is None:
+        solver.addBoard()
+    else:
+        game.reveal(*start)
+        if not game.isDetonated:
+            solver.addIsland(*start)
+
+    solver.solve()
+    return solver
+
+
+##############################################################################
+# frontierConstraints()  used to find what the revealed clues say about the
+#                        hidden fields next to them
+# Input:                 board; the proj3.Board being played
+# Output:                constraints; a list of (fields, mines) tuples, one
+#                                     per clue with hidden fields, where
+#                                     fields is a tuple of (row, col)
+#                                     fields and mines is how many of them
+#                                     hold a mine
+#                        numHidden; integer number of hidden fields on the
+#                                   board, flags not included
+def frontierConstraints(board):
+    constraints = []
+    numHidden   = 0
+
+    for row in range(1, board.numRows - 1):
+        cells = board.getRow(row)
+        numHidden += cells.count(proj3.UNKNOWN)
+
+        for col in range(1, board.numCols - 1):
+            if cells[col] not in CLUE_VALUES:
+                continue
+
+            mines  = CLUE_VALUES[cells[col]]
+            fields = []
+            for nextRow in range(row - 1, row + 2):
+                for nextCol, cell in enumerate(board.getRow(nextRow, col - 1, col + 2), col - 1):
+                    if cell == proj3.UNKNOWN:
+                        fields.append((nextRow, nextCol))
+                    elif cell == proj3.FLAG:
+                        mines -= 1
+            if fields:
+                constraints.append((tuple(fields), mines))
+
+    return constraints, numHidden
+
+##############################################################################
+# splitComponents()  used to split the constraints into groups that share
+#                    no hidden fields, so each group can be counted on its
+#                    own
+# Input:             constraints; a list of (fields, mines) tuples
+# Output:            components; a list of lists of constraints
+def splitComponents(constraints):
+    # each field is joined to the first constraint it was seen in
+    owner  = {}
+    parent = list(range(len(constraints)))
+
+    def findRoot(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for index, (fields, mines) in enumerate(constraints):
+        for field in fields:
+            other = owner.setdefault(field, index)
+            parent[findRoot(other)] = findRoot(index)
+
+    groups = {}
+    for index, constraint in enumerate(constraints):
+        groups.setdefault(findRoot(index), []).append(constraint)
+    return list(groups.values())
+
+##############################################################################
+# countComponent()  used to count every way the mines of one group of
+#                   constraints can be placed, by how many mines are used.
+#                   The fields are placed one at a time, in an order that
+#                   keeps few constraints half filled, and placements that
+#                   leave the same counts on the half filled constraints
+#                   are counted together. Raises ValueError once placing
+#                   a field leaves more than maxStates different counts
+# Input:            constraints; a list of (fields, mines) tuples that
+#                                share hidden fields
+#                   maxStates; integer number of states that can be kept
+# Output:           fields; a list of the (row, col) fields of the group
+#                   ways; a list where ways[k] is the number of placements
+#                         using k mines
+#                   mineWays; a list holding, for each field, a list of
+#                             the number of placements using k mines that
+#                             put a mine on the field
+def countComponent(constraints, maxStates=MAX_STATES):
+    # order the fields by walking from constraint to constraint
+    fields   = []
+    position = {}
+    touching = {}
+    for index, (constraintFields, mines) in enumerate(constraints):
+        for field in constraintFields:
+            touching.setdefault(field, []).append(index)
+
+    toVisit = deque([constraints[0][0][0]])
+    position[toVisit[0]] = 0
+    while toVisit:
+        field = toVisit.popleft()
+        fields.append(field)
+        for index in touching[field]:
+            for other in constraints[index][0]:
+                if other not in position:
+                    position[other] = len(position)
+                    toVisit.append(other)
+
+    numFields = len(fields)
+    last = [max(position[field] for field in constraintFields) for constraintFields, mines in constraints]
+
+    # walking the fields in order, note for each one the constraints it
+    # belongs to, with how many of their fields come after it and how
+    # many mines they need, and the constraints half filled once it is
+    # placed: the ones before it that go on past it, and the ones it
+    # starts that do
+    active = [[]]
+    checks = []
+    numPlaced = [0] * len(constraints)
+    for step, field in enumerate(fields):
+        stepChecks = []
+        starting   = []
+        for index in touching[field]:
+            if numPlaced[index] == 0 and last[index] > step:
+                starting.append(index)
+            numPlaced[index] += 1
+            stepChecks.append((index, len(constraints[index][0]) - numPlaced[index], constraints[index][1]))
+        checks.append(stepChecks)
+        active.append([index for index in active[step] if last[index] > step] + starting)
+
+    ##########################################################################
+    # nextState()   used to find the counts left on the half filled
+    #               constraints after placing a field
+    # Input:        step; integer position of the field
+    #               state; tuple of mines placed on each active constraint
+    #               isMine; integer 1 to place a mine, or 0
+    # Output:       the new tuple, or None if a constraint can not be met
+    def nextState(step, state, isMine):
+        counts = dict(zip(active[step], state))
+        for index, numAfter, needed in checks[step]:
+            placed = counts.get(index, 0) + isMine
+            if placed > needed or placed + numAfter < needed:
+                return None
+            counts[index] = placed
+        return tuple(counts.get(index, 0) for index in active[step + 1])
+
+    # count forward, from the first field, the placements reaching each
+    # state, by number of mines
+    forward = [{(): [1]}]
+    for step in range(numFields):
+        reached = {}
+        for state, counts in forward[step].items():
+            for isMine in (0, 1):
+                newState = nextState(step, state, isMine)
+                if newState is None:
+                    continue
+                total = reached.setdefault(newState, [0] * (step + 2))
+                for mines, count in enumerate(counts):
+                    total[mines + isMine] += count
+        if len(reached) > maxStates:
+            raise ValueError("the frontier is too tangled to count exactly: more than " + str(maxStates)
+                             + " states after " + str(step + 1) + " of its " + str(numFields) + " fields")
+        forward.append(reached)
+
+    # and backward, from the last field, the ways to finish from each
+    # state, by number of mines
+    backward = [None] * numFields + [{(): [1]}]
+    for step in range(numFields - 1, -1, -1):
+        finishing = {}
+        for state in forward[step]:
+            total = [0] * (numFields - step + 1)
+            for isMine in (0, 1):
+                newState = nextState(step, state, isMine)
+                if newState is None or newState not in backward[step + 1]:
+                    continue
+                for mines, count in enumerate(backward[step + 1][newState]):
+                    total[mines + isMine] += count
+            finishing[state] = total
+        backward[step] = finishing
+
+    ways = [0] * (numFields + 1)
+    for mines, count in enumerate(forward[numFields].get((), [])):
+        ways[mines] += count
+
+    # a field holds a mine in the placements that reach it, put a mine on
+    # it, and finish from there
+    mineWays = []
+    for step in range(numFields):
+        withMine = [0] * (numFields + 1)
+        for state, counts in forward[step].items():
+            newState = nextState(step, state, 1)
+            if newState is None or newState not in backward[step + 1]:
+                continue
+            finish = backward[step + 1][newState]
+            for before, countBefore in enumerate(counts):
+                if not countBefore:
+                    continue
+                for mines, countAfter in enumerate(finish):
+                    withMine[before + 1 + mines] += countBefore * countAfter
+        mineWays.append(withMine)
+
+    return fields, ways, mineWays
+
+##############################################################################
+# convolve()      used to combine two lists of counts by number of mines
+# Input:          first, second; lists where entry k counts the ways of
+#                                using k mines
+# Output:         combined; the list of the ways of using k mines in both
+def convolve(first, second):
+    combined = [0] * (len(first) + len(second) - 1)
+    for mines, count in enumerate(first):
+        if count:
+            for otherMines, otherCount in enumerate(second):
+                combined[mines + otherMines] += count * otherCount
+    return combined
+
+##############################################################################
+# deconvolve()    used to undo convolve(), taking one list of counts back
+#                 out of a combined list
+# Input:          combined; a list made by convolve() from divisor and
+#                           another list
+#                 divisor; the list to take out, not all zero
+# Output:         quotient; the other list
+def deconvolve(combined, divisor):
+    low  = next(mines for mines, count in enumerate(divisor) if count)
+    high = max(mines for mines, count in enumerate(divisor) if count)
+
+    # solve for one entry at a time, from the fewest mines up
+    quotient = [0] * (len(combined) - len(divisor) + 1)
+    for mines in range(len(quotient)):
+        count = combined[mines + low]
+        for offset in range(1, min(mines, high - low) + 1):
+            count -= divisor[low + offset] * quotient[mines - offset]
+        quotient[mines] = count // divisor[low]
+    return quotient
+
+##############################################################################
+# spreadWays()    used to find, for each number of mines used next to
+#                 clues, how many ways the rest of the mines can be
+#                 spread over the other hidden fields. The counts are all
+#                 scaled by the same amount to keep them small, since only
+#                 how they compare matters
+# Input:          numFrontier; integer number of hidden fields next to
+#                              clues
+#                 numOther; integer number of other hidden fields
+#                 minesLeft; integer number of mines left to find
+# Output:         ways; a list where ways[k] is proportional to the ways
+#                       of spreading minesLeft - k mines over numOther
+#                       fields
+def spreadWays(numFrontier, numOther, minesLeft):
+    ways = [0] * (numFrontier + 1)
+    fewest = max(0, minesLeft - numOther)
+    most   = min(numFrontier, minesLeft)
+    if fewest > most:
+        return ways
+
+    # going from most to fewest mines next to clues, each step puts one
+    # more mine on the other fields, multiplying the ways by
+    # (numOther - rest) / (rest + 1), where rest is the mines there before
+    rest  = minesLeft - most
+    steps = most - fewest
+    upper = [1] * (steps + 1)
+    lower = [1] * (steps + 1)
+    for step in range(1, steps + 1):
+        upper[step] = upper[step - 1] * (numOther - rest - step + 1)
+    for step in range(steps - 1, -1, -1):
+        lower[step] = lower[step + 1] * (rest + step + 1)
+
+    for step in range(steps + 1):
+        ways[most - step] = upper[step] * lower[step]
+    return ways
+
+##############################################################################
+# mineProbabilities()  used to find the exact chance of each hidden field
+#                      holding a mine, given every revealed clue and the
+#                      number of mines left to find. Each group of fields
+#                      next to clues is counted on its own, then the groups
+#                      are combined, weighting each total number of mines
+#                      by the ways the rest of the mines can be spread
+#                      over the hidden fields next to no clue
+# Input:               game; the proj3.Game being played, whose flags are
+#                            all taken to be on mines
+#                      maxStates; integer number of states each group can
+#                                 be counted with, as for countComponent()
+# Output:              probabilities; a grid of floats indexed by
+#                                     [row][col] like the board, with None
+#                                     for every field that is not hidden
+def mineProbabilities(game, maxStates=MAX_STATES):
+    board = game.board
+    constraints, numHidden = frontierConstraints(board)
+
+    counted = [countComponent(component, maxStates) for component in splitComponents(constraints)]
+    numFrontier = sum(len(fields) for fields, ways, mineWays in counted)
+    numOther    = numHidden - numFrontier
+    minesLeft   = game.minesLeft
+
+    # ways of using k mines next to clues, over every group
+    combined = [1]
+    for fields, ways, mineWays in counted:
+        combined = convolve(combined, ways)
+
+    spread = spreadWays(numFrontier, numOther, minesLeft)
+    total  = sum(count * spread[mines] for mines, count in enumerate(combined))
+    if total == 0:
+        raise ValueError("no placement of the mines left fits the clues and flags")
+
+    probabilities = [[None] * board.numCols for row in range(board.numRows)]
+
+    for fields, ways, mineWays in counted:
+        # the ways of using k mines in a group are weighted by the ways of
+        # placing the rest in the other groups and on the other fields
+        others = deconvolve(combined, ways)
+        weight = [sum(count * spread[mines + otherMines] for otherMines, count in enumerate(others) if count)
+                  for mines in range(len(ways))]
+        for (row, col), withMine in zip(fields, mineWays):
+            probabilities[row][col] = sum(count * weight[mines] for mines, count in enumerate(withMine) if count) / total
+
+    # the rest of the mines are spread evenly over the other fields
+    if numOther:
+        otherMines = sum(count * spread[mines] * (minesLeft - mines)
+                         for mines, count in enumerate(combined)) / (numOther * total)
+        for row in range(1, board.numRows - 1):
+            cells = board.getRow(row)
+            for col in range(1, board.numCols - 1):
+                if cells[col] == proj3.UNKNOWN and probabilities[row][col] is None:
+                    probabilities[row][col] = otherMines
+
+    return probabilities
+
+##############################################################################
+# renderProbabilities()  builds the text printing a grid of probabilities
+#                        under the same labels as the board, with the
+#                        chance of a mine on each hidden field as a percent
+# Input:                 board; the proj3.Board being played
+#                        probabilities; a grid from mineProbabilities()
+# Output:                text; the grid as it is printed
+def renderProbabilities(board, probabilities):
+    labelWidth = proj3.rowLabelWidth(board)
+    lines = [" " * (labelWidth + 2) + "".join("{:5d}".format(col) for col in range(1, board.numCols - 1))]
+
+    for row in range(1, board.numRows - 1):
+        cells  = board.getRow(row)
+        fields = []
+        for col in range(1, board.numCols - 1):
+            chance = probabilities[row][col]
+            fields.append("{:>5s}".format(cells[col]) if chance is None else "{:4.0f}%".format(100 * chance))
+        lines.append("{:{}d}  ".format(row, labelWidth) + "".join(fields))
+
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a Minesweeper board as far as deduction allows.")
+    parser.add_argument("board", nargs="?",
+                        help="file to load the board from")
+    parser.add_argument("--generate", metavar="ROWSxCOLS", type=proj3.readSize,
+                        help="solve a board of random mines instead of a file")
+    parser.add_argument("--density", type=float, default=proj3.DEFAULT_DENSITY,
+                        help="with --generate, the fraction of fields holding a mine")
+    parser.add_argument("--seed", type=int,
+                        help="with --generate, the seed for the random mines")
+    parser.add_argument("--start", metavar=("ROW", "COL"), type=int, nargs=2,
+                        help="first field to reveal (the middle of the board if not given)")
+    parser.add_argument("--print", action="store_true",
+                        help="print the board once solving stops")
+    parser.add_argument("--probabilities", action="store_true",
+                        help="print the chance of a mine on each hidden field once solving stops")
+    args = parser.parse_args()
+
+    if bool(args.board) == bool(args.generate):
+        parser.error("give a board file or --generate")
+
+    if args.generate:
+        board = proj3.generateBoard(args.generate[0], args.generate[1], density=args.density, seed=args.seed)
+    else:
+        board = proj3.loadBoard(args.board)
+
+    start = args.start
+    if start is None:
+        start = ((board.numRows - 1) // 2, (board.numCols - 1) // 2)
+    if not (1 <= start[0] <= board.numRows - 2 and 1 <= start[1] <= board.numCols - 2):
+        parser.error("--start is off the board")
+
+    game    = proj3.Game(board)
+    begin   = time.perf_counter()
+    solver  = solveGame(game, start)
+    seconds = time.perf_counter() - begin
+
+    if args.print:
+        proj3.prettyPrintBoard(board)
+
+    state = game.state()
+    print("\t Game is", state.status)
+    print("\t There are", state.minesLeft, "mines left to find and", state.hiddenSafe, "safe fields left to reveal")
+    print("\t Deduced", solver.deductions, "moves in", "{:.3f}".format(seconds), "seconds", end="")
+    if seconds > 0:
+        print(" ({:,.0f} deductions/sec)".format(solver.deductions / seconds), end="")
+    print()
+
+    if args.probabilities and state.status == proj3.PLAYING:
+        begin = time.perf_counter()
+        try:
+            chances = mineProbabilities(game)
+        except ValueError as error:
+            print("\t Can not find the chance of a mine on each hidden field:", error)
+            return
+        seconds = time.perf_counter() - begin
+
+        print()
+        print(renderProbabilities(board, chances))
+        print("\t Found the chance of a mine on each hidden field in", "{:.3f}".format(seconds), "seconds")
+
+if __name__ == "__main__":
+    main()
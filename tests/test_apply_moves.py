@@ -0,0 +1,98 @@
+# File:         tests/test_apply_moves.py
+# Description:  Checks that moves played in a batch straight on a Board's
+#               grids leave the game exactly as playing them one by one
+#               through Game.flag() and Game.reveal() does
+#
+# Usage:        python -m unittest tests.test_apply_moves
+
+import random
+import unittest
+
+import proj3
+
+# Number of random games played, and the most moves in each
+NUM_GAMES       = 200
+MAX_MOVES       = 400
+
+# Largest number of interior rows and columns of a random board
+MAX_SIZE        = 15
+
+
+##############################################################################
+# randomMoves()      used to pick random moves on a board, mostly flags
+#                    and reveals of hidden fields, with some off the mines
+#                    so games are lost as well as won
+# Input:             board; the Board the moves are played on
+#                    rng; the random.Random used to pick the moves
+# Output:            moves; a list of (row, col, choice) tuples
+def randomMoves(board, rng):
+    numRows = board.numRows - proj3.END_OF_LINE
+    numCols = board.numCols - proj3.END_OF_LINE
+    moves   = []
+    for move in range(rng.randint(1, MAX_MOVES)):
+        row = rng.randint(1, numRows)
+        col = rng.randint(1, numCols)
+        if board.pendingMines is None and board.isMine(row, col):
+            choice = "f" if rng.random() < 0.97 else "r"
+        else:
+            choice = "r" if rng.random() < 0.6 else "f"
+        moves.append((row, col, choice))
+    return moves
+
+
+class ApplyMovesTest(unittest.TestCase):
+
+    ##########################################################################
+    # assertSameGame()   used to check two games are in the same state
+    # Input:             game; the Game played in a batch
+    #                    other; the Game played one move at a time
+    # Output:            None
+    def assertSameGame(self, game, other):
+        self.assertEqual(game.board.cells, other.board.cells)
+        self.assertEqual(game.state(), other.state())
+        self.assertEqual((game.numFlags, game.isDetonated, game.lastMove),
+                         (other.numFlags, other.isDetonated, other.lastMove))
+        for count in ("mineCount", "correctFlags", "wrongFlags", "hiddenSafe"):
+            self.assertEqual(getattr(game.board, count), getattr(other.board, count), count)
+
+    def testSameAsOneMoveAtATime(self):
+        rng = random.Random(8)
+        for gameNumber in range(NUM_GAMES):
+            numRows   = rng.randint(1, MAX_SIZE)
+            numCols   = rng.randint(1, MAX_SIZE)
+            seed      = rng.getrandbits(32)
+            safeStart = rng.random() < 0.3
+            density   = rng.uniform(0, 0.3)
+            boards    = [proj3.generateBoard(numRows, numCols, density=density, seed=seed, safeStart=safeStart)
+                         for copy in range(2)]
+            moves     = randomMoves(boards[0], rng)
+
+            # a game with a history plays every move through flag() and
+            # reveal(); only the game without one plays on the grids
+            game  = proj3.Game(boards[0], proj3.RegionIndex(boards[0]) if rng.random() < 0.3 else None)
+            other = proj3.Game(boards[1], history=proj3.MoveHistory())
+            self.assertEqual(game.applyMoves(moves), other.applyMoves(moves))
+            self.assertSameGame(game, other)
+
+    def testRenderSeesTheCounts(self):
+        board  = proj3.generateBoard(6, 6, density=0.2, seed=3)
+        game   = proj3.Game(board)
+        moves  = [(row, col, "f") for row in range(1, 7) for col in range(1, 7) if board.isMine(row, col)]
+        counts = []
+
+        # the counts kept in local variables are put back before each
+        # print of the board
+        game.applyMoves(moves, 1, lambda board: counts.append((game.numFlags, board.correctFlags)))
+        self.assertEqual(counts, [(flags, flags) for flags in range(1, len(moves) + 1)])
+        self.assertEqual(game.state().status, proj3.WON)
+
+    def testBadMoveKeepsTheCounts(self):
+        board = proj3.generateBoard(5, 5, density=0.2, seed=4)
+        game  = proj3.Game(board)
+        with self.assertRaises(ValueError):
+            game.applyMoves([(1, 1, "f"), (2, 2, "f"), (9, 9, "f")])
+        self.assertEqual(game.numFlags, 2)
+        self.assertEqual(board.correctFlags + board.wrongFlags, 2)
+
+if __name__ == "__main__":
+    unittest.main()
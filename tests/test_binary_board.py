@@ -0,0 +1,131 @@
+# File:         tests/test_binary_board.py
+# Description:  Checks that boards saved in the binary format load back
+#               the same as the boards saved, with every compression and
+#               with or without their clues, that boards with borders
+#               inside them keep them, and that files of a newer version
+#               or cut short are refused
+#
+# Usage:        python -m unittest tests.test_binary_board
+
+import os
+import random
+import tempfile
+import unittest
+
+import proj3
+
+# Number of random boards saved and loaded, and the largest number of
+# interior rows and columns of each
+NUM_BOARDS      = 40
+MAX_SIZE        = 40
+
+# Compressions to check, leaving out lzma when Python is built without it
+COMPRESSIONS    = [name for name in sorted(proj3.BINARY_COMPRESSIONS) if name != "lzma" or proj3.lzma is not None]
+
+
+##############################################################################
+# randomText()       used to build the lines of a text board file with
+#                    borders inside it as well as around it
+# Input:             rng; the random.Random used to pick the fields
+#                    numRows; integer number of rows, borders included
+#                    numCols; integer number of columns, borders included
+# Output:            lines; a list of the rows of the file, as strings
+def randomText(rng, numRows, numCols):
+    lines = [proj3.BORDER * numCols]
+    for row in range(numRows - 2):
+        fields = rng.choices([proj3.BORDER, proj3.MINE, proj3.SPACE], weights=[1, 2, 7], k=numCols - 2)
+        lines.append(proj3.BORDER + "".join(fields) + proj3.BORDER)
+    lines.append(proj3.BORDER * numCols)
+    return lines
+
+
+class BinaryBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName  = os.path.join(self.directory.name, "board.mswb")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    ##########################################################################
+    # assertSameBoard()  used to check a loaded board is the board saved
+    # Input:             board; the Board read back
+    #                    expected; the Board that was saved
+    # Output:            None
+    def assertSameBoard(self, board, expected):
+        self.assertEqual((board.numRows, board.numCols), (expected.numRows, expected.numCols))
+        self.assertEqual(board.mines, expected.mines)
+        self.assertEqual(board.cells, expected.cells)
+        self.assertEqual(board.clues, expected.clues)
+        for count in ("mineCount", "correctFlags", "wrongFlags", "hiddenSafe"):
+            self.assertEqual(getattr(board, count), getattr(expected, count), count)
+
+    def testRoundTrip(self):
+        rng = random.Random(18)
+        for boardNumber in range(NUM_BOARDS):
+            board = proj3.generateBoard(rng.randint(1, MAX_SIZE), rng.randint(1, MAX_SIZE),
+                                        density=rng.uniform(0, 0.4), seed=rng.getrandbits(32))
+            for compression in COMPRESSIONS:
+                for withClues in (True, False):
+                    proj3.writeBinaryBoard(board, self.fileName, compression, withClues)
+                    self.assertSameBoard(proj3.readBinaryBoard(self.fileName), board)
+                    self.assertSameBoard(proj3.loadBoard(self.fileName), board)
+
+    def testBordersInside(self):
+        rng      = random.Random(81)
+        textName = os.path.join(self.directory.name, "board.txt")
+        for boardNumber in range(NUM_BOARDS):
+            lines = randomText(rng, rng.randint(2, MAX_SIZE), rng.randint(2, MAX_SIZE))
+            with open(textName, "w") as textFile:
+                textFile.write("\n".join(lines) + "\n")
+            board = proj3.createBoard(textName)
+
+            for compression in COMPRESSIONS:
+                proj3.writeBinaryBoard(board, self.fileName, compression, withClues=boardNumber % 2 == 0)
+                loaded = proj3.readBinaryBoard(self.fileName)
+                self.assertSameBoard(loaded, board)
+                for row, line in enumerate(lines):
+                    self.assertEqual(loaded.getRow(row), line.replace(proj3.MINE, proj3.UNKNOWN)
+                                                             .replace(proj3.SPACE, proj3.UNKNOWN))
+
+    def testSmallBoards(self):
+        # boards too small to have anything inside their ring of borders
+        for numRows, numCols in ((0, 0), (1, 1), (1, 5), (2, 2), (2, 7), (5, 2)):
+            board = proj3.Board(numRows, numCols)
+            board.cells[:] = proj3.BORDER.encode() * (numRows * numCols)
+            board.recount()
+            for compression in COMPRESSIONS:
+                proj3.writeBinaryBoard(board, self.fileName, compression)
+                self.assertSameBoard(proj3.readBinaryBoard(self.fileName), board)
+
+    def testNewerVersionRefused(self):
+        board = proj3.generateBoard(5, 5, density=0.2, seed=1)
+        data  = bytearray(proj3.packBinaryBoard(board))
+        data[len(proj3.BINARY_MAGIC)] = proj3.BINARY_VERSION + 1
+        with open(self.fileName, "wb") as boardFile:
+            boardFile.write(data)
+
+        with self.assertRaisesRegex(ValueError, "version"):
+            proj3.readBinaryBoard(self.fileName)
+
+        # and an unknown compression is refused too
+        data[len(proj3.BINARY_MAGIC)]     = proj3.BINARY_VERSION
+        data[len(proj3.BINARY_MAGIC) + 1] = max(proj3.BINARY_COMPRESSIONS.values()) + 1
+        with open(self.fileName, "wb") as boardFile:
+            boardFile.write(data)
+        with self.assertRaisesRegex(ValueError, "compression"):
+            proj3.readBinaryBoard(self.fileName)
+
+    def testCutShortRefused(self):
+        board = proj3.generateBoard(20, 30, density=0.2, seed=2)
+        for compression in COMPRESSIONS:
+            data = proj3.packBinaryBoard(board, compression)
+            for size in (len(data) - 1, len(data) // 2, proj3.BINARY_HEADER.size, proj3.BINARY_HEADER.size - 1, 0):
+                with open(self.fileName, "wb") as boardFile:
+                    boardFile.write(data[:size])
+                with self.assertRaises(ValueError, msg=(compression, size)):
+                    proj3.readBinaryBoard(self.fileName)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# File:         tests/test_board_cache.py
+# Description:  Checks that games loaded through a BoardCache share the
+#               mines and clues of one board but not the view, that the
+#               boards used least recently are dropped, and that boards
+#               with too many fields are refused without being kept
+#
+# Usage:        python -m unittest tests.test_board_cache
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import proj3
+
+
+class BoardCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    ##########################################################################
+    # writeBoard()       used to write a generated board to a file
+    # Input:             name; the name of the file in the test directory
+    #                    size; integer number of rows and of columns
+    #                    seed; the seed of the generated board
+    #                    isBinary; a boolean that is True to write the
+    #                              binary format
+    # Output:            fileName; the path of the file written
+    def writeBoard(self, name, size, seed, isBinary=False):
+        board    = proj3.generateBoard(size, size, density=0.2, seed=seed)
+        fileName = os.path.join(self.directory.name, name)
+        if isBinary:
+            proj3.writeBinaryBoard(board, fileName)
+        else:
+            proj3.writeBoard(board, fileName)
+        return fileName
+
+    def testGamesShareTheGrids(self):
+        cache     = proj3.BoardCache()
+        fileName  = self.writeBoard("board.txt", 12, 1)
+        copyName  = self.writeBoard("copy.txt", 12, 1)
+        first     = cache.load(fileName)
+        second    = cache.load(fileName)
+
+        # the same contents are loaded once, whatever the file is called
+        self.assertIs(first.mines, second.mines)
+        self.assertIs(first.clues, second.clues)
+        self.assertIs(cache.load(copyName).mines, first.mines)
+        self.assertEqual(len(cache.boards), 1)
+
+        # each game plays on a view of its own
+        self.assertIsNot(first.cells, second.cells)
+        game = proj3.Game(first)
+        for row in range(1, first.numRows - 1):
+            game.flag(row, 1)
+        self.assertEqual(second.getRow(1)[1], proj3.UNKNOWN)
+        self.assertEqual(cache.load(fileName).getRow(1), proj3.loadBoard(fileName).getRow(1))
+
+    def testChangedFileLoadedAgain(self):
+        cache    = proj3.BoardCache()
+        fileName = self.writeBoard("board.txt", 10, 1)
+        first    = cache.load(fileName)
+
+        # an unchanged file is not read again
+        with mock.patch.object(proj3, "loadBoardFile", side_effect=AssertionError("loaded")):
+            self.assertIs(cache.load(fileName).mines, first.mines)
+
+        proj3.writeBoard(proj3.generateBoard(10, 10, density=0.2, seed=2), fileName)
+        os.utime(fileName, ns=(0, os.stat(fileName).st_mtime_ns + 1))
+        changed = cache.load(fileName)
+        self.assertIsNot(changed.mines, first.mines)
+        self.assertEqual(changed.mines, proj3.loadBoard(fileName).mines)
+
+    def testLeastRecentlyUsedDropped(self):
+        fileNames = [self.writeBoard("board" + str(seed) + ".txt", 20, seed) for seed in range(4)]
+        board     = proj3.loadBoard(fileNames[0])
+        numBytes  = len(board.mines) + len(board.cells) + len(board.clues)
+        cache     = proj3.BoardCache(3 * numBytes)
+
+        for fileName in fileNames[:3]:
+            cache.load(fileName)
+        kept = cache.load(fileNames[0]).mines
+        cache.load(fileNames[3])
+
+        # the second board was used least recently, so it is dropped
+        self.assertEqual(len(cache.boards), 3)
+        self.assertEqual(cache.numBytes, 3 * numBytes)
+        self.assertIs(cache.load(fileNames[0]).mines, kept)
+        with mock.patch.object(proj3, "loadBoardFile", side_effect=AssertionError("loaded")):
+            with self.assertRaises(AssertionError):
+                cache.load(fileNames[1])
+
+    def testBigBoardsRefused(self):
+        for isBinary in (False, True):
+            cache    = proj3.BoardCache()
+            fileName = self.writeBoard("big.board", 30, 1, isBinary)
+
+            # the size is found before the file is loaded, and the board
+            # is not kept
+            with mock.patch.object(proj3, "loadBoardFile", side_effect=AssertionError("loaded")):
+                with self.assertRaises(ValueError):
+                    cache.load(fileName, 32 * 32 - 1)
+            self.assertEqual(len(cache.boards), 0)
+            self.assertEqual(cache.numBytes, 0)
+
+            # it loads once it fits, and is refused from the cache too
+            self.assertEqual(cache.load(fileName, 32 * 32).numRows, 32)
+            with self.assertRaises(ValueError):
+                cache.load(fileName, 32 * 32 - 1)
+
+        # trailing blank lines make a text file look bigger than it is,
+        # but the board is still checked once loaded
+        fileName = self.writeBoard("blank.txt", 30, 1)
+        with open(fileName, "ab") as boardFile:
+            boardFile.write(b"\n" * 40)
+        self.assertEqual(proj3.BoardCache().load(fileName, 33 * 33).numRows, 32)
+        with self.assertRaises(ValueError):
+            proj3.BoardCache().load(fileName, 32 * 32 - 1)
+
+if __name__ == "__main__":
+    unittest.main()
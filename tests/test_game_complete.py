@@ -0,0 +1,165 @@
+# File:         tests/test_game_complete.py
+# Description:  Checks the running counts used to detect a win against a
+#               scan of the whole board, as the game was checked before
+#               the counts were kept, after every move of random games
+#
+# Usage:        python -m unittest tests.test_game_complete
+
+import os
+import random
+import unittest
+
+import proj3
+
+# Number of random games played by each test, and the most moves in each
+NUM_GAMES       = 200
+MAX_MOVES       = 300
+
+# Largest number of interior rows and columns of a random board
+MAX_SIZE        = 12
+
+# Board files next to proj3.py that games are also played on
+BOARD_DIR       = os.path.dirname(os.path.abspath(proj3.__file__))
+BOARD_FILES     = ["board1.txt", "board2.txt", "board3.txt", "board4.txt", "board5.txt"]
+
+
+##############################################################################
+# scanGameComplete() the win check as it was before the board kept running
+#                    counts: every field of the mines and of the player's
+#                    view is looked at
+# Input:             board; the Board that holds the game
+#                    numMines; an integer holding number of mines left
+# Output:            isComplete; a boolean showing if the game is won
+def scanGameComplete(board, numMines):
+    isComplete = True
+
+    # if there are any mines left, then  the game is not over
+    if numMines != 0:
+        isComplete = False
+
+    for row in range(board.numRows):
+        for col in range(board.numCols):
+
+            # if the mine and flag locations do not match then the game
+            # is not over
+            if board.getCell(row, col) == proj3.FLAG:
+                if not board.isMine(row, col):
+                    isComplete = False
+            elif board.isMine(row, col):
+                isComplete = False
+
+    return isComplete
+
+##############################################################################
+# scanHiddenSafe()   used to count the hidden fields without a mine by
+#                    looking at every field
+# Input:             board; the Board that holds the game
+# Output:            count; integer number of those fields
+def scanHiddenSafe(board):
+    count = 0
+    for row in range(board.numRows):
+        for col in range(board.numCols):
+            if board.getCell(row, col) in (proj3.UNKNOWN, proj3.FLAG) and not board.isMine(row, col):
+                count += 1
+    return count
+
+##############################################################################
+# playRandomGame()   used to play random flags, unflags and reveals on a
+#                    game, calling check() after every move. Flags go on
+#                    mines more often than not, so some games are won
+# Input:             game; the Game to play
+#                    rng; the random.Random used to pick the moves
+#                    check; function called with the game after each move
+# Output:            None
+def playRandomGame(game, rng, check):
+    board  = game.board
+    fields = [(row, col) for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)]
+
+    for move in range(MAX_MOVES):
+        if game.state().status != proj3.PLAYING:
+            return
+
+        hidden  = [field for field in fields if board.getCell(*field) == proj3.UNKNOWN]
+        flagged = [field for field in fields if board.getCell(*field) == proj3.FLAG]
+        mines   = [field for field in hidden if board.isMine(*field)]
+        safe    = [field for field in hidden if not board.isMine(*field)]
+        choice  = rng.random()
+
+        if flagged and choice < 0.15:
+            game.flag(*rng.choice(flagged))
+        elif mines and choice < 0.55:
+            game.flag(*rng.choice(mines))
+        elif hidden and choice < 0.65:
+            game.flag(*rng.choice(hidden))
+        elif safe and choice < 0.97:
+            game.reveal(*rng.choice(safe))
+        elif hidden:
+            game.reveal(*rng.choice(hidden))
+        else:
+            # every field is revealed or flagged; moves on them change
+            # nothing, and must not change the counts either
+            game.reveal(*rng.choice(fields))
+
+        check(game)
+
+
+class GameCompleteTest(unittest.TestCase):
+
+    ##########################################################################
+    # checkAgainstScan() used to compare the running counts of a game with
+    #                    a scan of its whole board
+    # Input:             game; the Game being played
+    # Output:            None
+    def checkAgainstScan(self, game):
+        board      = game.board
+        isComplete = scanGameComplete(board, game.minesLeft)
+
+        self.assertEqual(proj3.checkGameComplete(board, game.minesLeft), isComplete)
+        self.assertEqual(board.hiddenSafe, scanHiddenSafe(board))
+
+        state = game.state()
+        if game.isDetonated:
+            self.assertEqual(state.status, proj3.LOST)
+        else:
+            self.assertEqual(state.status, proj3.WON if isComplete else proj3.PLAYING)
+        self.assertEqual(state.hiddenSafe, scanHiddenSafe(board))
+
+    def testGeneratedBoards(self):
+        rng  = random.Random(5)
+        wins = 0
+        for gameNumber in range(NUM_GAMES):
+            numRows = rng.randint(1, MAX_SIZE)
+            numCols = rng.randint(1, MAX_SIZE)
+            board   = proj3.generateBoard(numRows, numCols, density=rng.uniform(0, 0.4), seed=rng.getrandbits(32))
+            game    = proj3.Game(board)
+
+            self.checkAgainstScan(game)
+            playRandomGame(game, rng, self.checkAgainstScan)
+            wins += game.state().status == proj3.WON
+
+        # the random moves must reach a win often enough to test it
+        self.assertGreater(wins, NUM_GAMES // 10)
+
+    def testSafeStartBoards(self):
+        rng = random.Random(7)
+        for gameNumber in range(NUM_GAMES // 4):
+            board = proj3.generateBoard(rng.randint(3, MAX_SIZE), rng.randint(3, MAX_SIZE), density=0.2,
+                                        seed=rng.getrandbits(32), safeStart=True)
+            game  = proj3.Game(board)
+
+            # the mines are only placed by the first reveal, so until
+            # then there is nothing to scan
+            game.reveal(rng.randint(1, board.numRows - 2), rng.randint(1, board.numCols - 2))
+            self.checkAgainstScan(game)
+            playRandomGame(game, rng, self.checkAgainstScan)
+
+    def testBoardFiles(self):
+        rng = random.Random(11)
+        for fileName in BOARD_FILES:
+            for gameNumber in range(NUM_GAMES // 20):
+                game = proj3.Game(proj3.createBoard(os.path.join(BOARD_DIR, fileName)))
+                self.checkAgainstScan(game)
+                playRandomGame(game, rng, self.checkAgainstScan)
+
+if __name__ == "__main__":
+    unittest.main()
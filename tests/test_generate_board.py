@@ -0,0 +1,31 @@
+# File:         tests/test_generate_board.py
+# Description:  Checks that generateBoard() refuses mine counts and
+#               densities it can not place, instead of never returning
+#
+# Usage:        python -m unittest tests.test_generate_board
+
+import unittest
+
+import proj3
+
+
+class GenerateBoardTest(unittest.TestCase):
+
+    def testBadMineCounts(self):
+        for mineCount in (3.5, 3.0, True, "3", -1, 26):
+            with self.assertRaises(ValueError, msg=repr(mineCount)):
+                proj3.generateBoard(5, 5, mineCount)
+
+    def testBadDensities(self):
+        for density in (None, "0.1", True, float("nan"), -0.1, 1.5, [0.1]):
+            with self.assertRaises(ValueError, msg=repr(density)):
+                proj3.generateBoard(5, 5, density=density)
+
+    def testGoodCounts(self):
+        self.assertEqual(proj3.generateBoard(5, 5, 0).mineCount, 0)
+        self.assertEqual(proj3.generateBoard(5, 5, 25).mineCount, 25)
+        self.assertEqual(proj3.generateBoard(5, 5, density=1).mineCount, 25)
+        self.assertEqual(proj3.generateBoard(5, 5, density=0.2, seed=1).mineCount, 5)
+
+if __name__ == "__main__":
+    unittest.main()
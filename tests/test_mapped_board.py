@@ -0,0 +1,129 @@
+# File:         tests/test_mapped_board.py
+# Description:  Checks that a game on a MappedBoard is played the same as
+#               on a loaded Board, and that it is not held up by the mines
+#               of the file being counted in the background
+#
+# Usage:        python -m unittest tests.test_mapped_board
+
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import proj3
+
+# Number of random boards played, and the most moves on each
+NUM_BOARDS      = 30
+MAX_MOVES       = 200
+
+
+class MappedBoardTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    ##########################################################################
+    # writeRandomBoard() used to write a random board file to play on
+    # Input:             rng; the random.Random used to pick the board
+    # Output:            fileName; the name of the file written
+    def writeRandomBoard(self, rng):
+        board    = proj3.generateBoard(rng.randint(1, 20), rng.randint(1, 20), density=rng.uniform(0, 0.3),
+                                       seed=rng.getrandbits(32))
+        fileName = os.path.join(self.directory.name, "board.txt")
+        proj3.writeBoard(board, fileName)
+        return fileName
+
+    def testSameGameAsLoadedBoard(self):
+        rng = random.Random(3)
+        for boardNumber in range(NUM_BOARDS):
+            fileName = self.writeRandomBoard(rng)
+            loaded   = proj3.Game(proj3.createBoard(fileName))
+            mapped   = proj3.Game(proj3.MappedBoard(fileName))
+            board    = loaded.board
+
+            try:
+                for move in range(MAX_MOVES):
+                    row    = rng.randint(1, board.numRows - 2)
+                    col    = rng.randint(1, board.numCols - 2)
+                    action = "flag" if board.isMine(row, col) or rng.random() < 0.2 else "reveal"
+
+                    # the mapped game may not have counted its mines yet
+                    result = getattr(mapped, action)(row, col)
+                    if result.minesLeft is None:
+                        mapped.board.waitForCount()
+                        result = result._replace(minesLeft=mapped.minesLeft)
+                    self.assertEqual(result, getattr(loaded, action)(row, col))
+
+                    mapped.board.waitForCount()
+                    self.assertEqual(mapped.state(), loaded.state())
+                    self.assertEqual(mapped.board.getRow(row), board.getRow(row))
+                    if loaded.state().status != proj3.PLAYING:
+                        break
+            finally:
+                mapped.board.close()
+
+    def testTrailingBlankLines(self):
+        fileName = self.writeRandomBoard(random.Random(5))
+        with open(fileName, "rb") as boardFile:
+            rows = boardFile.read().rstrip(b"\n").split(b"\n")
+
+        for lineEnd in (b"\n", b"\r\n"):
+            for ending in (b"", lineEnd, lineEnd * 3):
+                with open(fileName, "wb") as boardFile:
+                    boardFile.write(lineEnd.join(rows) + ending)
+
+                # the blank lines after the last row are not rows
+                mapped = proj3.MappedBoard(fileName)
+                loaded = proj3.createBoard(fileName)
+                try:
+                    self.assertEqual((mapped.numRows, mapped.numCols), (loaded.numRows, loaded.numCols))
+                    self.assertEqual(mapped.mineCount, loaded.mineCount)
+                    self.assertEqual(mapped.hiddenSafe, loaded.hiddenSafe)
+                    for row in range(loaded.numRows):
+                        self.assertEqual(mapped.getRow(row), loaded.getRow(row))
+                        self.assertEqual(mapped.getMineBits(row), loaded.getMineBits(row))
+                finally:
+                    mapped.close()
+
+        # a short row is still refused
+        with open(fileName, "wb") as boardFile:
+            boardFile.write(b"####\n#  #\n# #\n####\n\n")
+        with self.assertRaises(ValueError):
+            proj3.MappedBoard(fileName)
+
+    def testNotHeldUpByCounting(self):
+        fileName = self.writeRandomBoard(random.Random(4))
+        board    = proj3.MappedBoard(fileName)
+        loaded   = proj3.Game(proj3.createBoard(fileName))
+
+        # while the mines are being counted, starting a game, asking for
+        # its state and playing must not wait for them, as long as more
+        # mines have been counted than are flagged
+        fewestMines = board.numRows * board.numCols
+        with mock.patch.object(proj3.MappedBoard, "isCounted", return_value=False), \
+             mock.patch.object(proj3.MappedBoard, "fewestMines", return_value=fewestMines), \
+             mock.patch.object(proj3.MappedBoard, "waitForCount", side_effect=AssertionError("waited")):
+            game = proj3.Game(board)
+            self.assertEqual(game.state(), proj3.GameState(proj3.PLAYING, None, None))
+
+            for row in range(1, board.numRows - 1):
+                for col in range(1, board.numCols - 1):
+                    if board.isMine(row, col):
+                        self.assertIsNone(game.flag(row, col).minesLeft)
+                        loaded.flag(row, col)
+                    elif (row + col) % 3 == 0:
+                        game.reveal(row, col)
+                        loaded.reveal(row, col)
+            self.assertEqual(game.state().minesLeft, None)
+
+        # once counted, the counts kept while counting add up
+        board.waitForCount()
+        self.assertEqual(game.state(), loaded.state())
+        board.close()
+
+if __name__ == "__main__":
+    unittest.main()
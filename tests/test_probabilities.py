@@ -0,0 +1,143 @@
+# File:         tests/test_probabilities.py
+# Description:  Checks the exact chance of a mine on each hidden field
+#               against counting every placement of the mines left on
+#               small boards, and that boards whose clues are spread all
+#               over them are counted or refused in bounded time
+#
+# Usage:        python -m unittest tests.test_probabilities
+
+import itertools
+import random
+import time
+import unittest
+
+import proj3
+import solver
+
+# Number of random positions checked, and the most hidden fields on each,
+# so every placement of the mines can be counted
+NUM_BOARDS      = 150
+MAX_HIDDEN      = 16
+
+# Size of the boards with a clue on every third field, and the most
+# seconds finding their chances, or refusing to, can take
+WIDE_SIZE       = 60
+WIDE_SECONDS    = 30
+
+
+##############################################################################
+# bruteProbabilities() used to find the chance of a mine on each hidden
+#                      field by trying every placement of the mines left
+#                      on the hidden fields, keeping the ones that fit
+#                      every clue. Flags are taken to be on mines
+# Input:               game; the proj3.Game being played
+# Output:              probabilities; a dict from each hidden (row, col)
+#                                     field to its chance of a mine
+def bruteProbabilities(game):
+    board  = game.board
+    hidden = [(row, col) for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)
+              if board.getCell(row, col) == proj3.UNKNOWN]
+    clues  = [(row, col, solver.CLUE_VALUES[board.getCell(row, col)])
+              for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)
+              if board.getCell(row, col) in solver.CLUE_VALUES]
+
+    total    = 0
+    withMine = dict.fromkeys(hidden, 0)
+    for mines in itertools.combinations(hidden, game.minesLeft):
+        mines = set(mines)
+        if all(sum((nextRow, nextCol) in mines or board.getCell(nextRow, nextCol) == proj3.FLAG
+                   for nextRow in range(row - 1, row + 2) for nextCol in range(col - 1, col + 2)) == clue
+               for row, col, clue in clues):
+            total += 1
+            for field in mines:
+                withMine[field] += 1
+
+    return {field: count / total for field, count in withMine.items()}
+
+##############################################################################
+# showEveryThird()   used to reveal every third field of a board that has
+#                    no mine, spreading clues over the whole board
+# Input:             board; the Board to reveal the fields of
+#                    isDiagonal; a boolean that is True to pick the fields
+#                                along diagonals, and False along columns
+# Output:            None
+def showEveryThird(board, isDiagonal):
+    numCols = board.numCols - proj3.END_OF_LINE
+    for row in range(1, board.numRows - 1):
+        for col in range(1, board.numCols - 1):
+            place = row + col if isDiagonal else row * numCols + col
+            if place % 3 == 0 and not board.isMine(row, col):
+                clue = board.getClue(row, col)
+                board.setCell(row, col, proj3.CLUES[clue - 1] if clue else proj3.SPACE)
+
+
+class ProbabilitiesTest(unittest.TestCase):
+
+    def testSameAsEveryPlacement(self):
+        rng     = random.Random(15)
+        checked = 0
+        while checked < NUM_BOARDS:
+            board = proj3.generateBoard(rng.randint(2, 6), rng.randint(2, 6), density=rng.uniform(0.1, 0.35),
+                                        seed=rng.getrandbits(32))
+            game  = proj3.Game(board)
+
+            # reveal a few safe fields, and flag a few mines
+            fields = [(row, col) for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)]
+            for row, col in rng.sample(fields, rng.randint(1, len(fields))):
+                if not board.isMine(row, col):
+                    game.reveal(row, col)
+                elif rng.random() < 0.3:
+                    game.flag(row, col)
+
+            numHidden = sum(board.getCell(*field) == proj3.UNKNOWN for field in fields)
+            if game.state().status != proj3.PLAYING or numHidden > MAX_HIDDEN:
+                continue
+            checked += 1
+
+            expected = bruteProbabilities(game)
+            found    = solver.mineProbabilities(game)
+            for row, col in fields:
+                if (row, col) in expected:
+                    self.assertAlmostEqual(found[row][col], expected[(row, col)], 12, (row, col))
+                else:
+                    self.assertIsNone(found[row][col], (row, col))
+
+    def testWideFrontier(self):
+        for isDiagonal in (False, True):
+            board = proj3.generateBoard(WIDE_SIZE, WIDE_SIZE, density=0.2, seed=1)
+            game  = proj3.Game(board)
+            showEveryThird(board, isDiagonal)
+
+            # the chances are found, or refused with a ValueError, in
+            # bounded time, however many states an exact count would need
+            start = time.perf_counter()
+            try:
+                chances = solver.mineProbabilities(game)
+            except ValueError as error:
+                self.assertIn("too tangled", str(error))
+                chances = None
+            self.assertLess(time.perf_counter() - start, WIDE_SECONDS)
+
+            # along the columns, the groups of fields next to clues are
+            # narrow enough to count, and the chances add up to the mines
+            # left to find
+            if not isDiagonal:
+                self.assertIsNotNone(chances)
+                hidden = [chance for row in chances for chance in row if chance is not None]
+                self.assertEqual(len(hidden), sum(board.getRow(row).count(proj3.UNKNOWN)
+                                                  for row in range(board.numRows)))
+                self.assertAlmostEqual(sum(hidden), game.minesLeft, 6)
+                self.assertTrue(all(0 <= chance <= 1 for chance in hidden))
+
+    def testStateCap(self):
+        board = proj3.generateBoard(10, 10, density=0.2, seed=2)
+        game  = proj3.Game(board)
+        showEveryThird(board, False)
+
+        # the same board is refused with fewer states to count with
+        self.assertIsNotNone(solver.mineProbabilities(game))
+        with self.assertRaises(ValueError):
+            solver.mineProbabilities(game, maxStates=4)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+# File:         tests/test_profiler.py
+# Description:  Checks that a MoveProfiler passes on one record for each
+#               move, with what the move did, that a render function from
+#               wrapRender() adds the bytes printed to the record of the
+#               last move, and that --profile writes a record for each
+#               move of a game played from a file
+#
+# Usage:        python -m unittest tests.test_profiler
+
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import proj3
+
+# Number of random games played, and the most moves in each
+NUM_GAMES       = 60
+MAX_MOVES       = 100
+
+# Keys of every record
+RECORD_KEYS     = {"move", "row", "col", "action", "outcome", "seconds", "revealed", "clues", "scanned",
+                   "renderSeconds", "renderedBytes"}
+
+
+class ProfilerTest(unittest.TestCase):
+
+    def testRecordEachMove(self):
+        rng = random.Random(24)
+        for gameNumber in range(NUM_GAMES):
+            board    = proj3.generateBoard(rng.randint(1, 20), rng.randint(1, 20), density=rng.uniform(0.05, 0.25),
+                                           seed=rng.getrandbits(32))
+            records  = []
+            profiler = proj3.MoveProfiler(records.append)
+            regions  = proj3.RegionIndex(board) if gameNumber % 2 else None
+            game     = proj3.Game(board, regions, profiler=profiler)
+
+            expected = []
+            for move in range(rng.randint(1, MAX_MOVES)):
+                if game.state().status != proj3.PLAYING:
+                    break
+                row = rng.randint(1, board.numRows - 2)
+                col = rng.randint(1, board.numCols - 2)
+
+                # the record of a move is passed on once the next one
+                # starts
+                self.assertEqual(len(records), max(move - 1, 0))
+                hiddenSafe = board.hiddenSafe
+                if rng.random() < 0.3:
+                    result = game.flag(row, col)
+                    action = "f"
+                else:
+                    result = game.reveal(row, col)
+                    action = "r"
+                revealed = hiddenSafe - board.hiddenSafe + (result.outcome == proj3.DETONATED)
+                expected.append((move + 1, row, col, action, result.outcome, revealed))
+                self.assertEqual(len(records), move)
+            profiler.close()
+
+            self.assertEqual(len(records), len(expected))
+            for record, (move, row, col, action, outcome, revealed) in zip(records, expected):
+                self.assertEqual(set(record), RECORD_KEYS)
+                self.assertEqual((record["move"], record["row"], record["col"], record["action"],
+                                  record["outcome"], record["revealed"]),
+                                 (move, row, col, action, outcome, revealed))
+                self.assertGreaterEqual(record["seconds"], 0)
+                self.assertEqual((record["renderSeconds"], record["renderedBytes"]), (0.0, 0))
+
+                # only a flood fill looks up the clue of each field it
+                # reveals. An island copied from the index looks at its
+                # fields only, unless part of it was revealed already and
+                # it has to be flood filled
+                if outcome != proj3.REVEALED:
+                    self.assertEqual((record["clues"], record["scanned"]), (0, 1))
+                elif regions is None or record["clues"]:
+                    self.assertEqual(record["clues"], revealed)
+                    self.assertGreaterEqual(record["scanned"], 1)
+                else:
+                    self.assertEqual(record["scanned"], max(regions.regionSize(row, col), 1))
+
+    def testWrapRender(self):
+        records  = []
+        profiler = proj3.MoveProfiler(records.append)
+        board    = proj3.generateBoard(8, 8, 0)
+        game     = proj3.Game(board, profiler=profiler)
+        render   = profiler.wrapRender(proj3.prettyPrintBoard)
+
+        # printing before any move is played adds to no record
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            render(board)
+        self.assertEqual(records, [])
+
+        # the board is still printed, and each print after a move adds its
+        # bytes to that move's record
+        game.flag(1, 1)
+        with contextlib.redirect_stdout(output):
+            start = len(output.getvalue().encode())
+            render(board)
+            render(board)
+            printed = len(output.getvalue().encode()) - start
+        expectedBoard = io.StringIO()
+        with contextlib.redirect_stdout(expectedBoard):
+            proj3.prettyPrintBoard(board)
+        self.assertEqual(printed, 2 * len(expectedBoard.getvalue().encode()))
+
+        game.reveal(4, 4)
+        profiler.close()
+        self.assertEqual([record["renderedBytes"] for record in records], [printed, 0])
+        self.assertGreater(records[0]["renderSeconds"], 0)
+        self.assertEqual(records[1]["revealed"], 8 * 8 - 1)
+
+        # a render that fails still puts sys.stdout back
+        failing = profiler.wrapRender(mock.Mock(side_effect=RuntimeError("render")))
+        stdout  = proj3.sys.stdout
+        with self.assertRaises(RuntimeError):
+            failing(board)
+        self.assertIs(proj3.sys.stdout, stdout)
+
+    def testProfileFromCommandLine(self):
+        with tempfile.TemporaryDirectory() as directory:
+            movesName   = os.path.join(directory, "moves.txt")
+            profileName = os.path.join(directory, "profile.jsonl")
+            moves       = [(row, col, "f") for row in range(1, 4) for col in range(1, 4)] + [(5, 5, "r")]
+            with open(movesName, "w") as movesFile:
+                movesFile.write("".join("{} {} {}\n".format(*move) for move in moves))
+
+            argv = ["proj3.py", "--generate", "6x6", "--mines", "0", "--moves", movesName, "--profile", profileName]
+            with mock.patch("sys.argv", argv), contextlib.redirect_stdout(io.StringIO()):
+                proj3.main()
+
+            with open(profileName) as profileFile:
+                records = [json.loads(line) for line in profileFile]
+
+        self.assertEqual([record["move"] for record in records], list(range(1, len(moves) + 1)))
+        self.assertEqual([(record["row"], record["col"], record["action"]) for record in records], moves)
+        self.assertEqual(records[-1]["revealed"], 6 * 6 - 9)
+
+if __name__ == "__main__":
+    unittest.main()
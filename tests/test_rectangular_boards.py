@@ -0,0 +1,176 @@
+# File:         tests/test_rectangular_boards.py
+# Description:  Checks that very wide and very tall boards are validated,
+#               scanned and printed by their own width and height, and
+#               that doing so takes time linear in their number of fields
+#
+# Usage:        python -m unittest tests.test_rectangular_boards
+
+import contextlib
+import io
+import random
+import time
+import unittest
+from unittest import mock
+
+import proj3
+
+# Interior rows and columns of the wide strip and the tall strip
+WIDE_SIZE       = (100, 10000)
+TALL_SIZE       = (10000, 100)
+
+# Smaller strips flood filled field by field, which is much slower than
+# the scans done a whole row at a time
+WIDE_FLOOD_SIZE = (20, 5000)
+TALL_FLOOD_SIZE = (5000, 20)
+
+# Sizes whose clue grids are checked field by field against
+# numOfMinesAround(), which only counts around fields inside the borders
+CLUE_SIZES      = [(3, 2000), (2000, 3), (17, 301), (301, 17), (1, 1), (1, 50), (50, 1)]
+
+# Each scan is timed on a strip and on one 4 times as long, and must take
+# less than LINEAR_RATIO times as long on the longer one. A scan that
+# looks at the fields more than a fixed number of times each would take
+# about 16 times as long
+LINEAR_RATIO    = 8
+TIMING_ROUNDS   = 5
+
+
+##############################################################################
+# CountingBoard      a Board that counts the fields looked at and changed,
+#                    to check the flood fill visits each field a fixed
+#                    number of times
+class CountingBoard(proj3.Board):
+    __slots__ = ("numGets", "numSets")
+
+    def __init__(self, numRows, numCols):
+        super().__init__(numRows, numCols)
+        self.numGets = 0
+        self.numSets = 0
+
+    def getCell(self, row, col):
+        self.numGets += 1
+        return super().getCell(row, col)
+
+    def setCell(self, row, col, value):
+        self.numSets += 1
+        super().setCell(row, col, value)
+
+##############################################################################
+# fastestTime()      used to time a function, keeping the fastest round
+# Input:             function; the function to time, called with nothing
+# Output:            seconds; float - the fastest of TIMING_ROUNDS rounds
+def fastestTime(function):
+    best = None
+    for rounds in range(TIMING_ROUNDS):
+        start = time.perf_counter()
+        function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+class RectangularBoardTest(unittest.TestCase):
+
+    def testValidateColumn(self):
+        for numRows, numCols in (WIDE_SIZE, TALL_SIZE):
+            board = proj3.generateBoard(numRows, numCols, mineCount=0)
+
+            # the last column is board.numCols - 2, the border left out
+            self.assertTrue(proj3.validateColumn(1, board))
+            self.assertTrue(proj3.validateColumn(numCols, board))
+            self.assertTrue(proj3.validateColumn(board.numCols - 2, board))
+            self.assertFalse(proj3.validateColumn(0, board))
+            self.assertFalse(proj3.validateColumn(numCols + 1, board))
+
+            self.assertTrue(proj3.validateRow(numRows, board))
+            self.assertFalse(proj3.validateRow(numRows + 1, board))
+
+    def testGetColumn(self):
+        board   = proj3.generateBoard(*WIDE_SIZE, mineCount=0)
+        answers = [str(WIDE_SIZE[1] + 1), str(WIDE_SIZE[1])]
+
+        # the column past the last is asked for again, and the last taken
+        with mock.patch("builtins.input", side_effect=answers), contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(proj3.getColumn(board), WIDE_SIZE[1])
+        self.assertIn(proj3.ERROR_MSG_POSITION, output.getvalue())
+
+        board = proj3.generateBoard(*TALL_SIZE, mineCount=0)
+        with mock.patch("builtins.input", side_effect=[str(TALL_SIZE[1] + 1), "1"]), \
+             contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(proj3.getColumn(board), 1)
+
+    def testRecount(self):
+        for numRows, numCols in (WIDE_SIZE, TALL_SIZE):
+            board = proj3.generateBoard(numRows, numCols, density=0.15, seed=numRows)
+            counts = (board.mineCount, board.hiddenSafe)
+
+            # every field is counted, whichever side of the board is longer
+            board.recount()
+            self.assertEqual((board.mineCount, board.hiddenSafe), counts)
+            self.assertEqual(board.mineCount + board.hiddenSafe, numRows * numCols)
+            self.assertEqual(board.mineCount, sum(proj3.countBits(board.getMineBits(row)) for row in range(board.numRows)))
+
+    def testCreateClueGrid(self):
+        rng = random.Random(6)
+        for useNumpy in (True, False):
+            if useNumpy and proj3.numpy is None:
+                continue
+            with mock.patch.object(proj3, "numpy", proj3.numpy if useNumpy else None):
+                for numRows, numCols in CLUE_SIZES:
+                    board = proj3.generateBoard(numRows, numCols, density=0.3, seed=rng.getrandbits(32))
+                    for row in range(1, numRows + 1):
+                        for col in range(1, numCols + 1):
+                            self.assertEqual(board.getClue(row, col), proj3.numOfMinesAround(row, col, board),
+                                             (numRows, numCols, row, col))
+
+    def testRevealIsland(self):
+        for numRows, numCols in (WIDE_FLOOD_SIZE, TALL_FLOOD_SIZE):
+            board = CountingBoard(numRows + 2, numCols + 2)
+            proj3.generateBoard(numRows, numCols, mineCount=0, board=board)
+            board.numGets = 0
+
+            # with no mines, one reveal uncovers every field
+            numEmpty = proj3.revealIsland(board, numRows, numCols)
+            self.assertEqual(numEmpty, numRows * numCols)
+            self.assertEqual(board.hiddenSafe, 0)
+            for row in range(1, numRows + 1):
+                self.assertEqual(board.getRow(row, 1, numCols + 1), proj3.SPACE * numCols)
+
+            # each field is shown once, and looked at from itself and its
+            # eight neighbors at most
+            self.assertEqual(board.numSets, numRows * numCols)
+            self.assertLessEqual(board.numGets, 1 + 9 * numRows * numCols)
+
+    def testHeaderPastHundredColumns(self):
+        for numCols in (150, 1234):
+            board = proj3.generateBoard(2, numCols, mineCount=0)
+            lines = proj3.renderBoard(board).split("\n")
+
+            # an empty line, then one line for each digit of the last
+            # column, the highest first
+            numDigits = len(str(numCols))
+            header    = lines[1:1 + numDigits]
+            self.assertTrue(lines[1 + numDigits].lstrip().startswith(proj3.BORDER))
+
+            # reading down the header lines gives each column's number
+            start = proj3.rowLabelWidth(board) + 2
+            for col in range(1, numCols + 1):
+                digits = "".join(line[start + 2 * col] for line in header)
+                self.assertEqual(digits, str(col).rjust(numDigits), col)
+            for line in header:
+                self.assertEqual(line[start], " ")
+                self.assertEqual(len(line.rstrip()), start + 2 * numCols + 1)
+
+    def testScansStayLinear(self):
+        for longSize in (WIDE_SIZE, TALL_SIZE):
+            shortSize = tuple(size // 4 if size == max(longSize) else size for size in longSize)
+            boards    = [proj3.generateBoard(*size, density=0.15, seed=1) for size in (shortSize, longSize)]
+
+            # without NumPy, the clue grid is built row by row in Python
+            with mock.patch.object(proj3, "numpy", None):
+                for scan in (lambda board: board.recount(), proj3.createClueGrid):
+                    shortTime, longTime = [fastestTime(lambda: scan(board)) for board in boards]
+                    self.assertLess(longTime, LINEAR_RATIO * shortTime, (longSize, scan))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+# File:         tests/test_region_index.py
+# Description:  Checks the islands, their sizes and the 3BV a RegionIndex
+#               finds against flood filling each island, and that a game
+#               revealing islands from the index is played the same as one
+#               flood filling them
+#
+# Usage:        python -m unittest tests.test_region_index
+
+import random
+import unittest
+
+import proj3
+
+# Number of random boards checked, and the largest number of interior rows
+# and columns of each
+NUM_BOARDS      = 150
+MAX_SIZE        = 30
+
+# Most moves played on each board
+MAX_MOVES       = 200
+
+
+##############################################################################
+# findIslands()      used to find every island of a board by flood filling
+#                    from each empty field not reached yet
+# Input:             board; the Board to look at
+# Output:            islands; a list of sets of the (row, col) fields of
+#                             each island: its empty fields and the clues
+#                             bordering them
+#                    loneClues; integer number of clues bordering no
+#                               empty field
+def findIslands(board):
+    def isEmpty(row, col):
+        return board.getCell(row, col) != proj3.BORDER and not board.isMine(row, col) \
+               and board.getClue(row, col) == 0
+
+    reached = set()
+    islands = []
+    for row in range(1, board.numRows - 1):
+        for col in range(1, board.numCols - 1):
+            if (row, col) in reached or not isEmpty(row, col):
+                continue
+
+            island  = set()
+            toVisit = [(row, col)]
+            reached.add((row, col))
+            while toVisit:
+                fieldRow, fieldCol = toVisit.pop()
+                island.add((fieldRow, fieldCol))
+                for nextRow in range(fieldRow - 1, fieldRow + 2):
+                    for nextCol in range(fieldCol - 1, fieldCol + 2):
+                        if board.getCell(nextRow, nextCol) == proj3.BORDER or board.isMine(nextRow, nextCol):
+                            continue
+                        if isEmpty(nextRow, nextCol):
+                            if (nextRow, nextCol) not in reached:
+                                reached.add((nextRow, nextCol))
+                                toVisit.append((nextRow, nextCol))
+                        else:
+                            island.add((nextRow, nextCol))
+            islands.append(island)
+
+    bordered  = set().union(*islands)
+    loneClues = sum(1 for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)
+                    if board.getCell(row, col) != proj3.BORDER and not board.isMine(row, col)
+                    and board.getClue(row, col) > 0 and (row, col) not in bordered)
+    return islands, loneClues
+
+
+class RegionIndexTest(unittest.TestCase):
+
+    def testSameAsFloodFill(self):
+        rng = random.Random(17)
+        for boardNumber in range(NUM_BOARDS):
+            board   = proj3.generateBoard(rng.randint(1, MAX_SIZE), rng.randint(1, MAX_SIZE),
+                                          density=rng.uniform(0, 0.3), seed=rng.getrandbits(32))
+            regions = proj3.RegionIndex(board)
+            islands, loneClues = findIslands(board)
+
+            self.assertEqual(regions.regionCount(), len(islands))
+            self.assertEqual(regions.threeBV(), len(islands) + loneClues)
+            for island in islands:
+                for row, col in island:
+                    if board.getClue(row, col) == 0:
+                        self.assertEqual(regions.regionSize(row, col), len(island), (row, col))
+                    else:
+                        self.assertEqual(regions.regionSize(row, col), 0, (row, col))
+
+    def testKnownBoard(self):
+        # one island on the left, the empty first column and the clues
+        # next to it. Every field right of the mines is a clue that
+        # borders no island
+        #
+        #     # # # # # # #
+        #     # . . * . . #
+        #     # . . * . * #
+        #     # . . * . . #
+        #     # # # # # # #
+        board = proj3.generateBoard(3, 5, 0)
+        for row in range(1, 4):
+            board.setMine(row, 3)
+        board.setMine(2, 5)
+        proj3.createClueGrid(board)
+        board.recount()
+
+        regions = proj3.RegionIndex(board)
+        self.assertEqual(regions.regionCount(), 1)
+        self.assertEqual(regions.regionSize(1, 1), 6)
+        self.assertEqual(regions.regionSize(1, 4), 0)
+        self.assertEqual(regions.threeBV(), 1 + 5)
+
+    def testSameGameAsFloodFill(self):
+        rng = random.Random(71)
+        for boardNumber in range(NUM_BOARDS // 3):
+            seed    = rng.getrandbits(32)
+            size    = (rng.randint(1, MAX_SIZE), rng.randint(1, MAX_SIZE))
+            density = rng.uniform(0, 0.2)
+            indexed = proj3.generateBoard(*size, density=density, seed=seed)
+            flooded = proj3.generateBoard(*size, density=density, seed=seed)
+            game    = proj3.Game(indexed, proj3.RegionIndex(indexed))
+            other   = proj3.Game(flooded)
+
+            for move in range(MAX_MOVES):
+                if game.state().status != proj3.PLAYING:
+                    break
+                row = rng.randint(1, size[0])
+                col = rng.randint(1, size[1])
+                if indexed.isMine(row, col) or rng.random() < 0.2:
+                    self.assertEqual(game.flag(row, col), other.flag(row, col))
+                else:
+                    self.assertEqual(game.reveal(row, col), other.reveal(row, col))
+                self.assertEqual(indexed.cells, flooded.cells)
+                self.assertEqual(game.state(), other.state())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# File:         tests/test_safe_start.py
+# Description:  Checks that a board generated with safeStart never puts a
+#               mine on the first field revealed or next to it, that it
+#               places exactly the mines asked for with the right clues
+#               and counts, both when it picks the mines one by one and
+#               when it builds the whole grids, and that flags placed
+#               before the first reveal are counted once the mines are
+#
+# Usage:        python -m unittest tests.test_safe_start
+
+import random
+import unittest
+
+import proj3
+
+# Number of random boards played, and the largest number of interior rows
+# and columns of each
+NUM_BOARDS      = 300
+MAX_SIZE        = 40
+
+
+##############################################################################
+# mineFields()       used to list the mines of a board
+# Input:             board; the Board to look at
+# Output:            mines; a set of the (row, col) fields holding a mine
+def mineFields(board):
+    return {(row, col) for row in range(board.numRows) for col in range(board.numCols) if board.isMine(row, col)}
+
+
+class SafeStartTest(unittest.TestCase):
+
+    ##########################################################################
+    # assertPlacedRight() used to check the mines placed by the first reveal:
+    #                     their number, the clues around them and the
+    #                     running counts
+    # Input:              board; the Board the first field was revealed on
+    #                     mineCount; integer number of mines asked for
+    # Output:             mines; a set of the (row, col) fields of the mines
+    def assertPlacedRight(self, board, mineCount):
+        mines = mineFields(board)
+        self.assertIsNone(board.pendingMines)
+        self.assertEqual(len(mines), mineCount)
+        self.assertEqual(board.mineCount, mineCount)
+        for row, col in mines:
+            self.assertTrue(1 <= row <= board.numRows - 2 and 1 <= col <= board.numCols - 2, (row, col))
+
+        for row in range(1, board.numRows - 1):
+            for col in range(1, board.numCols - 1):
+                self.assertEqual(board.getClue(row, col), proj3.numOfMinesAround(row, col, board), (row, col))
+
+        counted = board.share()
+        counted.recount()
+        for count in ("mineCount", "correctFlags", "wrongFlags", "hiddenSafe"):
+            self.assertEqual(getattr(board, count), getattr(counted, count), count)
+        return mines
+
+    def testNoMineAroundFirstReveal(self):
+        rng = random.Random(25)
+        for boardNumber in range(NUM_BOARDS):
+            numRows = rng.randint(3, MAX_SIZE)
+            numCols = rng.randint(3, MAX_SIZE)
+
+            # boards with few enough mines to pick them one by one need
+            # many fields
+            if boardNumber % 20 == 0:
+                numRows   = rng.randint(proj3.SPARSE_MINE_FIELDS // 16, proj3.SPARSE_MINE_FIELDS // 8)
+                numCols   = rng.randint(proj3.SPARSE_MINE_FIELDS // numRows + 1, 4 * proj3.SPARSE_MINE_FIELDS // numRows)
+                mineCount = rng.randint(1, numRows * numCols // proj3.SPARSE_MINE_FIELDS)
+            else:
+                mineCount = rng.randint(0, numRows * numCols - 9)
+            board = proj3.generateBoard(numRows, numCols, mineCount, seed=rng.getrandbits(32), safeStart=True)
+            game  = proj3.Game(board)
+            row   = rng.randint(1, numRows)
+            col   = rng.randint(1, numCols)
+
+            # the mines are only placed by the first reveal
+            self.assertEqual(mineFields(board), set())
+            self.assertEqual(game.state().minesLeft, mineCount)
+
+            result = game.reveal(row, col)
+            self.assertEqual(result.outcome, proj3.REVEALED)
+            self.assertEqual(board.getCell(row, col), proj3.SPACE)
+            mines = self.assertPlacedRight(board, mineCount)
+            for nextRow in range(row - 1, row + 2):
+                for nextCol in range(col - 1, col + 2):
+                    self.assertNotIn((nextRow, nextCol), mines)
+
+    def testCrowdedBoards(self):
+        rng = random.Random(52)
+        for boardNumber in range(NUM_BOARDS // 3):
+            numRows   = rng.randint(1, 6)
+            numCols   = rng.randint(1, 6)
+            numFields = numRows * numCols
+            row       = rng.randint(1, numRows)
+            col       = rng.randint(1, numCols)
+            around    = (min(row + 1, numRows) - max(row - 1, 1) + 1) * (min(col + 1, numCols) - max(col - 1, 1) + 1)
+
+            # with too many mines to keep every neighbor clear, only the
+            # field revealed is, and with a mine on every field it is not
+            mineCount = rng.randint(max(numFields - around + 1, 0), numFields)
+            board     = proj3.generateBoard(numRows, numCols, mineCount, seed=rng.getrandbits(32), safeStart=True)
+            result    = proj3.Game(board).reveal(row, col)
+
+            mines = self.assertPlacedRight(board, mineCount)
+            if mineCount < numFields:
+                self.assertNotEqual(result.outcome, proj3.DETONATED)
+                self.assertNotIn((row, col), mines)
+            else:
+                self.assertEqual(result.outcome, proj3.DETONATED)
+
+    def testFlagsBeforeFirstReveal(self):
+        rng = random.Random(255)
+        for boardNumber in range(NUM_BOARDS // 3):
+            mineCount = rng.randint(0, 60)
+            board = proj3.generateBoard(10, 10, mineCount, seed=rng.getrandbits(32), safeStart=True)
+            game  = proj3.Game(board)
+            flags = rng.sample([(row, col) for row in range(1, 11) for col in range(1, 11)], rng.randint(0, 20))
+            for row, col in flags:
+                game.flag(row, col)
+
+            # a flag can not be revealed, so reveal the first field left
+            row, col = next((row, col) for row in range(1, 11) for col in range(1, 11) if (row, col) not in flags)
+            game.reveal(row, col)
+            mines = self.assertPlacedRight(board, mineCount)
+            self.assertEqual(board.correctFlags, len(mines & set(flags)))
+            self.assertEqual(board.wrongFlags, len(set(flags) - mines))
+            self.assertEqual(game.numFlags, len(flags))
+
+    def testSameSeedSameMines(self):
+        placed = []
+        for count in range(2):
+            board = proj3.generateBoard(30, 30, 150, seed=7, safeStart=True)
+            proj3.Game(board).reveal(15, 15)
+            placed.append(mineFields(board))
+        self.assertEqual(placed[0], placed[1])
+
+        # and every field away from the first reveal can get a mine
+        reached = set()
+        for seed in range(60):
+            board = proj3.generateBoard(6, 6, 10, seed=seed, safeStart=True)
+            proj3.Game(board).reveal(1, 1)
+            reached |= mineFields(board)
+        fields = {(row, col) for row in range(1, 7) for col in range(1, 7)}
+        self.assertEqual(reached, fields - {(1, 1), (1, 2), (2, 1), (2, 2)})
+
+if __name__ == "__main__":
+    unittest.main()
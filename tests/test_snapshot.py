@@ -0,0 +1,160 @@
+# File:         tests/test_snapshot.py
+# Description:  Checks that a saved game loads back as it was saved, and
+#               that a game kept by a GameJournal resumes as it was after
+#               its last move, whether the move is in the snapshot or in
+#               the journal, and even if the journal was cut short
+#
+# Usage:        python -m unittest tests.test_snapshot
+
+import os
+import random
+import tempfile
+import unittest
+
+import proj3
+
+# Number of random games saved and loaded, the largest number of interior
+# rows and columns of their boards, and the most moves in each
+NUM_GAMES       = 60
+MAX_SIZE        = 25
+MAX_MOVES       = 150
+
+# Moves between the snapshots of the journaled games, so most games take
+# several
+SNAPSHOT_EVERY  = 7
+
+
+##############################################################################
+# playRandomMove()   used to play a random move, mostly flags on mines and
+#                    reveals of fields without one
+# Input:             game; the Game to play on
+#                    rng; the random.Random used to pick the move
+# Output:            move; the (row, col, choice) played
+def playRandomMove(game, rng):
+    board = game.board
+    row   = rng.randint(1, board.numRows - 2)
+    col   = rng.randint(1, board.numCols - 2)
+    if board.isMine(row, col):
+        choice = "f" if rng.random() < 0.95 else "r"
+    else:
+        choice = "r" if rng.random() < 0.8 else "f"
+
+    if choice == "f":
+        game.flag(row, col)
+    else:
+        game.reveal(row, col)
+    return row, col, choice
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.fileName  = os.path.join(self.directory.name, "game.save")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    ##########################################################################
+    # assertSameGame()   used to check a loaded game is the game saved
+    # Input:             game; the Game loaded
+    #                    expected; the Game that was saved
+    # Output:            None
+    def assertSameGame(self, game, expected):
+        self.assertEqual(game.board.cells, expected.board.cells)
+        self.assertEqual(game.board.mines, expected.board.mines)
+        self.assertEqual(game.state(), expected.state())
+        self.assertEqual((game.numFlags, game.isDetonated), (expected.numFlags, expected.isDetonated))
+        for count in ("mineCount", "correctFlags", "wrongFlags", "hiddenSafe"):
+            self.assertEqual(getattr(game.board, count), getattr(expected.board, count), count)
+
+    def testSnapshotRoundTrip(self):
+        rng = random.Random(19)
+        for gameNumber in range(NUM_GAMES):
+            board = proj3.generateBoard(rng.randint(1, MAX_SIZE), rng.randint(1, MAX_SIZE),
+                                        density=rng.uniform(0.05, 0.3), seed=rng.getrandbits(32))
+            game  = proj3.Game(board)
+            for move in range(rng.randint(0, MAX_MOVES)):
+                if game.state().status != proj3.PLAYING:
+                    break
+                playRandomMove(game, rng)
+
+            proj3.writeSnapshot(game, gameNumber, self.fileName)
+            loaded, moveCount = proj3.readSnapshot(self.fileName)
+            self.assertEqual(moveCount, gameNumber)
+            self.assertSameGame(loaded, game)
+            self.assertFalse(os.path.exists(self.fileName + ".tmp"))
+
+    def testPendingMinesNotSaved(self):
+        game = proj3.Game(proj3.generateBoard(5, 5, 3, seed=1, safeStart=True))
+        with self.assertRaises(ValueError):
+            proj3.writeSnapshot(game, 0, self.fileName)
+
+        # once the first reveal has placed them, the game can be saved
+        game.reveal(3, 3)
+        proj3.writeSnapshot(game, 1, self.fileName)
+        self.assertSameGame(proj3.readSnapshot(self.fileName)[0], game)
+
+    def testNewerVersionRefused(self):
+        game = proj3.Game(proj3.generateBoard(5, 5, 3, seed=1))
+        proj3.writeSnapshot(game, 0, self.fileName)
+        with open(self.fileName, "r+b") as snapshotFile:
+            snapshotFile.seek(len(proj3.SNAPSHOT_MAGIC))
+            snapshotFile.write(bytes([proj3.SNAPSHOT_VERSION + 1]))
+
+        with self.assertRaisesRegex(ValueError, "version"):
+            proj3.readSnapshot(self.fileName)
+
+    def testJournalResume(self):
+        rng = random.Random(91)
+        for gameNumber in range(NUM_GAMES // 2):
+            board   = proj3.generateBoard(rng.randint(1, MAX_SIZE), rng.randint(1, MAX_SIZE),
+                                          density=rng.uniform(0.05, 0.3), seed=rng.getrandbits(32))
+            game    = proj3.Game(board)
+            journal = proj3.GameJournal(game, self.fileName, snapshotEvery=SNAPSHOT_EVERY)
+            try:
+                for move in range(rng.randint(0, MAX_MOVES)):
+                    if game.state().status != proj3.PLAYING:
+                        break
+                    journal.record(*playRandomMove(game, rng))
+
+                    # the game resumes as it is now, whether this move was
+                    # saved in a snapshot or added to the journal
+                    resumed, moveCount = proj3.resumeGame(self.fileName)
+                    self.assertEqual(moveCount, move + 1)
+                    self.assertSameGame(resumed, game)
+            finally:
+                journal.close()
+
+    def testJournalCutShort(self):
+        board   = proj3.generateBoard(12, 12, density=0.1, seed=4)
+        game    = proj3.Game(board)
+        journal = proj3.GameJournal(game, self.fileName)
+        for col in range(1, 6):
+            game.flag(1, col)
+            journal.record(1, col, "f")
+        journal.close()
+
+        # a move cut short by a crash is left out, and the moves before it
+        # are played
+        journalName = self.fileName + proj3.JOURNAL_SUFFIX
+        with open(journalName, "r+b") as journalFile:
+            journalFile.truncate(os.path.getsize(journalName) - 1)
+        resumed, moveCount = proj3.resumeGame(self.fileName)
+        self.assertEqual(moveCount, 4)
+        self.assertEqual(resumed.board.getRow(1)[:7], "#FFFF..")
+
+        # a journal left from before the last snapshot is not used
+        proj3.writeSnapshot(game, 5, self.fileName)
+        resumed, moveCount = proj3.resumeGame(self.fileName)
+        self.assertEqual(moveCount, 5)
+        self.assertSameGame(resumed, game)
+
+        # nor is an empty one, or none at all
+        open(journalName, "wb").close()
+        self.assertEqual(proj3.resumeGame(self.fileName)[1], 5)
+        os.remove(journalName)
+        self.assertEqual(proj3.resumeGame(self.fileName)[1], 5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+# File:         tests/test_solver.py
+# Description:  Checks that the solver only plays moves that are certain,
+#               and that it stops only once no rule it knows applies to
+#               any clue on the board
+#
+# Usage:        python -m unittest tests.test_solver
+
+import random
+import unittest
+
+import proj3
+import solver
+
+# Number of random games solved, and the largest number of interior rows
+# and columns of their boards
+NUM_GAMES       = 200
+MAX_SIZE        = 20
+
+
+##############################################################################
+# clueFields()       used to list the clues revealed on a board
+# Input:             board; the Board being played
+# Output:            clues; a list of (row, col) fields showing a clue
+def clueFields(board):
+    return [(row, col) for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)
+            if board.getCell(row, col) in solver.CLUE_VALUES]
+
+
+class SolverTest(unittest.TestCase):
+
+    ##########################################################################
+    # checkNothingLeft() used to check no rule applies to any clue once the
+    #                    solver has stopped: no clue has all of its mines
+    #                    flagged or as many hidden fields as mines left, and
+    #                    no two clues make the subset rule apply
+    # Input:             game; the Game the solver stopped on
+    # Output:            None
+    def checkNothingLeft(self, game):
+        looker = solver.Solver(game)
+        around = {}
+        for row, col in clueFields(game.board):
+            hidden, minesLeft = looker.hiddenAround(row, col)
+            if hidden:
+                self.assertNotIn(minesLeft, (0, len(hidden)), (row, col))
+                around[(row, col)] = (hidden, minesLeft)
+
+        for (row, col), (hidden, minesLeft) in around.items():
+            for (otherRow, otherCol), (otherHidden, otherMines) in around.items():
+                if max(abs(row - otherRow), abs(col - otherCol)) > 2 or not hidden < otherHidden:
+                    continue
+                extra = len(otherHidden - hidden)
+                self.assertNotIn(otherMines - minesLeft, (0, extra), ((row, col), (otherRow, otherCol)))
+
+    def testOnlyCertainMoves(self):
+        rng    = random.Random(14)
+        solved = 0
+        for gameNumber in range(NUM_GAMES):
+            numRows = rng.randint(1, MAX_SIZE)
+            numCols = rng.randint(1, MAX_SIZE)
+            board   = proj3.generateBoard(numRows, numCols, density=rng.uniform(0.05, 0.25),
+                                          seed=rng.getrandbits(32), safeStart=True)
+            game    = proj3.Game(board)
+            start   = (rng.randint(1, numRows), rng.randint(1, numCols))
+            solver.solveGame(game, start)
+
+            # a flag is only ever placed on a mine, and a mine is never
+            # revealed
+            self.assertFalse(game.isDetonated)
+            self.assertEqual(board.wrongFlags, 0)
+            self.checkNothingLeft(game)
+            solved += game.state().status == proj3.WON or board.hiddenSafe == 0
+
+        # the rules are enough to clear some of the boards
+        self.assertGreater(solved, NUM_GAMES // 4)
+
+    def testStartFromTheBoard(self):
+        rng = random.Random(41)
+        for gameNumber in range(NUM_GAMES // 4):
+            board = proj3.generateBoard(rng.randint(3, MAX_SIZE), rng.randint(3, MAX_SIZE), density=0.15,
+                                        seed=rng.getrandbits(32))
+            game  = proj3.Game(board)
+
+            # reveal a few safe fields by hand, then solve from the clues
+            # they show
+            for row, col in rng.sample([(row, col) for row in range(1, board.numRows - 1)
+                                        for col in range(1, board.numCols - 1)], 3):
+                if not board.isMine(row, col):
+                    game.reveal(row, col)
+
+            solver.solveGame(game)
+            self.assertFalse(game.isDetonated)
+            self.assertEqual(board.wrongFlags, 0)
+            self.checkNothingLeft(game)
+
+    def testSubsetRule(self):
+        # a 1 next to a 2 along a wall: the 1's two hidden fields hold
+        # one mine, so the field only next to the 2 holds the other
+        #
+        #     # # # # # #
+        #     # . . . . #
+        #     # 1 2 2 1 #
+        #     #         #
+        board = proj3.Board(5, 6)
+        for row in range(5):
+            for col in range(6):
+                if row in (0, 4) or col in (0, 5):
+                    board.setCell(row, col, proj3.BORDER)
+        board.setMine(1, 2)
+        board.setMine(1, 3)
+        proj3.createClueGrid(board)
+        for col in range(1, 5):
+            board.setCell(2, col, str(board.getClue(2, col)))
+            board.setCell(3, col, proj3.SPACE)
+        self.assertEqual(board.getRow(2), "#1221#")
+
+        game = proj3.Game(board)
+        solver.solveGame(game)
+        self.assertEqual(board.getRow(1), "#1FF1#")
+        self.assertEqual(game.state().status, proj3.WON)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+# File:         tests/test_tiled_board.py
+# Description:  Checks that the chunks of a TiledBoard get the same mines
+#               each time they are built, that different seeds give
+#               different mines, and that the player's changes survive a
+#               chunk being dropped from memory
+#
+# Usage:        python -m unittest tests.test_tiled_board
+
+import unittest
+
+import proj3
+
+# Size of the boards, borders included, spanning several chunks each way
+NUM_ROWS        = 3 * proj3.CHUNK_SIZE + 7
+NUM_COLS        = 2 * proj3.CHUNK_SIZE + 3
+DENSITY         = 0.2
+
+
+##############################################################################
+# mineFields()       used to list the mines of a board
+# Input:             board; the TiledBoard to look at
+# Output:            mines; a set of the (row, col) fields holding a mine
+def mineFields(board):
+    return {(row, col) for row in range(board.numRows) for col in range(board.numCols) if board.isMine(row, col)}
+
+
+class TiledBoardTest(unittest.TestCase):
+
+    def testSameSeedSameMines(self):
+        mines = mineFields(proj3.TiledBoard(NUM_ROWS, NUM_COLS, DENSITY, seed=12))
+
+        # with one chunk kept in memory, each chunk is built many times
+        board = proj3.TiledBoard(NUM_ROWS, NUM_COLS, DENSITY, seed=12, maxChunks=1)
+        self.assertEqual(mineFields(board), mines)
+        self.assertEqual(len(mines), board.mineCount)
+
+        # none of them is on a border
+        for row, col in mines:
+            self.assertTrue(1 <= row <= NUM_ROWS - 2 and 1 <= col <= NUM_COLS - 2)
+
+    def testSeedsGiveDifferentMines(self):
+        seeds = [0, 1, -1, 12, -12, 1 << 64, -(1 << 64), (1 << 64) + 12]
+        mines = [frozenset(mineFields(proj3.TiledBoard(NUM_ROWS, NUM_COLS, DENSITY, seed))) for seed in seeds]
+        self.assertEqual(len(set(mines)), len(seeds))
+
+        # each chunk on its own differs too, the first one included
+        for seed in seeds[1:]:
+            for chunkRow, chunkCol in ((0, 0), (0, 1), (1, 0), (2, 1)):
+                self.assertNotEqual(proj3.TiledBoard(NUM_ROWS, NUM_COLS, 0.5, seed).loadChunk(chunkRow, chunkCol).mines,
+                                    proj3.TiledBoard(NUM_ROWS, NUM_COLS, 0.5, -seed).loadChunk(chunkRow, chunkCol).mines,
+                                    (seed, chunkRow, chunkCol))
+
+        # nor do two chunks of one board get the same mines
+        board  = proj3.TiledBoard(NUM_ROWS, NUM_COLS, 0.5, seed=-3)
+        chunks = set()
+        for chunkRow in range(1, NUM_ROWS // proj3.CHUNK_SIZE):
+            for chunkCol in range(1, NUM_COLS // proj3.CHUNK_SIZE):
+                chunks.add(board.loadChunk(chunkRow, chunkCol).mines)
+        self.assertEqual(len(chunks), (NUM_ROWS // proj3.CHUNK_SIZE - 1) * (NUM_COLS // proj3.CHUNK_SIZE - 1))
+
+    def testChangesSurviveDroppedChunks(self):
+        board = proj3.TiledBoard(NUM_ROWS, NUM_COLS, DENSITY, seed=5, maxChunks=2)
+        game  = proj3.Game(board)
+        flags = [(row, col) for row in range(1, NUM_ROWS - 1, 9) for col in range(1, NUM_COLS - 1, 7)]
+        for row, col in flags:
+            game.flag(row, col)
+
+        try:
+            for row, col in flags:
+                self.assertEqual(board.getCell(row, col), proj3.FLAG, (row, col))
+            self.assertEqual(game.numFlags, len(flags))
+            self.assertEqual(board.correctFlags + board.wrongFlags, len(flags))
+            self.assertEqual(board.correctFlags, sum(board.isMine(row, col) for row, col in flags))
+        finally:
+            board.close()
+
+if __name__ == "__main__":
+    unittest.main()
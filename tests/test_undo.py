@@ -0,0 +1,182 @@
+# File:         tests/test_undo.py
+# Description:  Checks that undoing a move, even a flood fill over most of
+#               a big board, puts the board back exactly and takes no
+#               longer than the move did, that the history drops its
+#               oldest moves past its limits, and that moves can be undone
+#               and redone from the command line with --undo
+#
+# Usage:        python -m unittest tests.test_undo
+
+import contextlib
+import io
+import random
+import time
+import unittest
+from unittest import mock
+
+import proj3
+
+# Size and mine density of the board flood filled
+FLOOD_SIZE      = 300
+FLOOD_DENSITY   = 0.02
+
+# Number of random games played, undone and redone, and the most moves in
+# each
+NUM_GAMES       = 100
+MAX_MOVES       = 60
+
+
+##############################################################################
+# gameState()        used to note everything an undo has to put back
+# Input:             game; the Game being played
+# Output:            state; a tuple of the view, the running counts and
+#                           the game's own fields
+def gameState(game):
+    board = game.board
+    return (bytes(board.cells), board.mineCount, board.correctFlags, board.wrongFlags, board.hiddenSafe,
+            game.numFlags, game.isDetonated, game.lastMove)
+
+##############################################################################
+# firstEmpty()       used to find a field with no mine and no mines around
+# Input:             board; the Board to search
+# Output:            (row, col) of the field
+def firstEmpty(board):
+    return next((row, col) for row in range(1, board.numRows - 1) for col in range(1, board.numCols - 1)
+                if not board.isMine(row, col) and board.getClue(row, col) == 0)
+
+
+class UndoTest(unittest.TestCase):
+
+    ##########################################################################
+    # assertUndone()     used to check a game is back to a state noted by
+    #                    gameState(). Mines placed by the first reveal of a
+    #                    safe start are not taken away again, so the running
+    #                    counts are checked against counting the board
+    #                    again instead
+    # Input:             game; the Game undone or redone
+    #                    state; the state noted by gameState()
+    # Output:            None
+    def assertUndone(self, game, state):
+        now = gameState(game)
+        self.assertEqual((now[0],) + now[5:], (state[0],) + state[5:])
+
+        counted = game.board.share()
+        counted.recount()
+        self.assertEqual(now[1:5], gameState(proj3.Game(counted))[1:5])
+
+    def testUndoLargeFloodFill(self):
+        board  = proj3.generateBoard(FLOOD_SIZE, FLOOD_SIZE, density=FLOOD_DENSITY, seed=20)
+        game   = proj3.Game(board, history=proj3.MoveHistory())
+        start  = firstEmpty(board)
+        before = gameState(game)
+
+        revealSeconds = time.perf_counter()
+        game.reveal(*start)
+        revealSeconds = time.perf_counter() - revealSeconds
+        after = gameState(game)
+
+        # the fill reaches most of the board
+        self.assertGreater(before[4] - after[4], FLOOD_SIZE * FLOOD_SIZE // 2)
+
+        # undoing it writes the old fields straight back, so it is no
+        # slower than the fill
+        undoSeconds = time.perf_counter()
+        self.assertTrue(game.undo())
+        undoSeconds = time.perf_counter() - undoSeconds
+        self.assertEqual(gameState(game), before)
+        self.assertLessEqual(undoSeconds, revealSeconds)
+
+        self.assertTrue(game.redo())
+        self.assertEqual(gameState(game), after)
+        self.assertFalse(game.redo())
+
+    def testUndoEveryMove(self):
+        rng = random.Random(20)
+        for gameNumber in range(NUM_GAMES):
+            board  = proj3.generateBoard(rng.randint(1, 12), rng.randint(1, 12), density=rng.uniform(0.05, 0.3),
+                                         seed=rng.getrandbits(32), safeStart=rng.random() < 0.5)
+            game   = proj3.Game(board, history=proj3.MoveHistory())
+            played = []
+
+            # play until the game is over, noting the state before and
+            # after each move that changed the board
+            for move in range(MAX_MOVES):
+                if game.state().status != proj3.PLAYING:
+                    break
+                row    = rng.randint(1, board.numRows - 2)
+                col    = rng.randint(1, board.numCols - 2)
+                before = gameState(game)
+                if rng.random() < 0.3:
+                    game.flag(row, col)
+                else:
+                    game.reveal(row, col)
+                if gameState(game)[0] != before[0]:
+                    played.append((before, gameState(game)))
+
+            # undo back to the start, then redo up to the end. A redo puts
+            # back the game as it was when the move was undone, the last
+            # move tried included, which is the state before the next
+            # move that changed the board
+            undone = [before for before, after in played[1:]] + [gameState(game)] * bool(played)
+            for before, after in reversed(played):
+                self.assertTrue(game.undo())
+                self.assertUndone(game, before)
+            self.assertFalse(game.undo())
+            for state in undone:
+                self.assertTrue(game.redo())
+                self.assertUndone(game, state)
+            self.assertFalse(game.redo())
+
+    def testOldestMovesDropped(self):
+        board = proj3.generateBoard(10, 10, 0)
+        game  = proj3.Game(board, history=proj3.MoveHistory(maxMoves=3))
+        for col in range(1, 6):
+            game.flag(1, col)
+
+        # only the last three moves can be undone
+        for count in range(3):
+            self.assertTrue(game.undo())
+        self.assertFalse(game.undo())
+        self.assertEqual(board.getRow(1), "#FF........#")
+
+        # a new move can not be redone over
+        self.assertTrue(game.redo())
+        game.flag(2, 1)
+        self.assertFalse(game.redo())
+
+        # past maxFields, the oldest moves are dropped, but the last move
+        # is kept however many fields it changed
+        game = proj3.Game(proj3.generateBoard(10, 10, 0), history=proj3.MoveHistory(maxFields=4))
+        for col in range(1, 4):
+            game.flag(1, col)
+        game.reveal(5, 5)
+        self.assertEqual(game.board.getRow(10), "#          #")
+        self.assertTrue(game.undo())
+        self.assertEqual(game.board.getRow(1), "#FFF.......#")
+        self.assertFalse(game.undo())
+
+    def testUndoFromCommandLine(self):
+        # a 2x2 board with one mine, at 2, 2
+        board = proj3.generateBoard(2, 2, 0)
+        board.setMine(2, 2)
+        proj3.createClueGrid(board)
+        board.recount()
+
+        # nothing to undo, then reveal 1, 1, undo and redo it, then lose
+        answers = ["u", "r", "1", "1", "u", "x", "y", "r", "2", "2"]
+        output  = io.StringIO()
+        with mock.patch("sys.argv", ["proj3.py", "--undo", "--generate", "2x2"]), \
+             mock.patch.object(proj3, "generateBoard", return_value=board), \
+             mock.patch("builtins.input", side_effect=answers), \
+             contextlib.redirect_stdout(output):
+            proj3.main()
+
+        text = output.getvalue()
+        self.assertIn("There is no move to undo", text)
+        self.assertIn(proj3.ERROR_MSG_CHOICE, text)
+        self.assertIn(proj3.LOSE_MSG, text)
+        self.assertEqual(board.getRow(1), "#1.#")
+        self.assertEqual(board.getRow(2), "#.X#")
+
+if __name__ == "__main__":
+    unittest.main()